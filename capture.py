@@ -0,0 +1,389 @@
+# Capture sources for VIPERS: cameras, video files and streams
+
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+import cv2
+
+import config
+
+
+def is_file_source(source):
+    """Local video files are paced at their own fps and can loop"""
+    return isinstance(source, str) and "://" not in source
+
+
+def is_stream_source(source):
+    """IP camera and RTSP URLs"""
+    return isinstance(source, str) and "://" in source
+
+
+def fourcc_to_string(code):
+    code = int(code)
+    if code <= 0:
+        return ""
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def negotiate_camera_mode(cap, width, height, fps, fourcc=None, buffer_size=1,
+                          fallback_resolutions=None):
+    """Apply a capture mode, falling back where the camera refuses, and return what it actually got"""
+    if fallback_resolutions is None:
+        fallback_resolutions = config.CAMERA_FALLBACK_RESOLUTIONS
+
+    # A shallow driver queue keeps frames fresh
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    # The pixel format goes first: drivers list their resolutions per format
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+
+    # Drivers snap unsupported sizes to something nearby; only accept an exact
+    # match, otherwise step down through the standard sizes below the request
+    candidates = [(width, height)] + [r for r in fallback_resolutions if r[0] * r[1] < width * height]
+    for candidate_width, candidate_height in candidates:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, candidate_width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, candidate_height)
+        if (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) == \
+                (candidate_width, candidate_height):
+            break
+    else:
+        # Nothing matched; let the driver pick its nearest mode to the request
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    cap.set(cv2.CAP_PROP_FPS, fps)
+
+    mode = {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': cap.get(cv2.CAP_PROP_FPS),
+        'fourcc': fourcc_to_string(cap.get(cv2.CAP_PROP_FOURCC)),
+        'buffer_size': int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+    mode['matched'] = (mode['width'] == width and mode['height'] == height
+                       and (mode['fps'] <= 0 or abs(mode['fps'] - fps) < 0.5)
+                       and (not fourcc or mode['fourcc'] == fourcc))
+    return mode
+
+
+def describe_camera_mode(mode):
+    fps = f"{mode['fps']:.0f} fps" if mode['fps'] > 0 else "unknown fps"
+    fourcc = f" {mode['fourcc']}" if mode['fourcc'] else ""
+    return f"{mode['width']}x{mode['height']} @ {fps}{fourcc}"
+
+
+# Reader thread for one source with a latest-frame slot
+class CaptureSource(QThread):
+    state_changed = pyqtSignal(str, str)  # source id, state
+
+    def __init__(self, source_id, source, loop=False, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 mode=None, parent=None):
+        super().__init__(parent)
+        self.source_id = source_id
+        self.source = source
+        self.loop = loop
+        self.requested_mode = mode  # width, height, fps, fourcc, buffer_size for cameras
+        self.camera_mode = None
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.running = True
+        self.state = "starting"
+        self.lock = threading.Lock()
+
+        # Latest-frame slot; older unread frames are dropped, never queued
+        self.frame = None
+        self.frame_time = 0.0
+        self.sequence = 0
+        self.consumed_sequence = 0
+        self.frame_size = None
+
+        # Statistics
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.fps = 0.0
+        self._fps_frames = 0
+        self._fps_start = time.monotonic()
+        self._reconnect_requested = False
+
+        # Optional low read rate for idle cameras; changing it wakes the reader
+        self.rate_limit = None
+        self._rate_changed = threading.Event()
+
+    def create_capture(self):
+        return cv2.VideoCapture(self.source)
+
+    def open_capture(self):
+        """Open the underlying capture; subclasses tune it"""
+        cap = self.create_capture()
+        if self.requested_mode is not None and cap.isOpened():
+            self.camera_mode = negotiate_camera_mode(cap, **self.requested_mode)
+        return cap
+
+    def read_frame(self, cap):
+        return cap.read()
+
+    def set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.state_changed.emit(self.source_id, state)
+
+    def run(self):
+        cap = None
+        delay = self.reconnect_delay
+        frame_interval = 0.0
+        next_frame_time = time.monotonic()
+        rewound = False  # a looping file was rewound and has not produced a frame since
+
+        while self.running:
+            if cap is None or self._reconnect_requested:
+                if cap is not None:
+                    cap.release()
+                self._reconnect_requested = False
+                self.set_state("connecting")
+                cap = self.open_capture()
+                if not cap.isOpened():
+                    cap.release()
+                    cap = None
+                    self.set_state("reconnecting")
+                    self.sleep_while_running(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                    self.reconnects += 1
+                    continue
+
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                frame_interval = 1.0 / fps if is_file_source(self.source) and fps > 0 else 0.0
+                next_frame_time = time.monotonic()
+                self.set_state("running")
+
+            ok, frame = self.read_frame(cap)
+            if not ok:
+                # A file that fails again straight after rewinding is unreadable,
+                # so back off like a lost stream instead of spinning on rewinds
+                if self.loop and is_file_source(self.source) and not rewound:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    rewound = True
+                    continue
+                rewound = False
+                cap.release()
+                cap = None
+                self.set_state("reconnecting")
+                self.sleep_while_running(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                self.reconnects += 1
+                continue
+
+            self.publish(frame)
+            # Only a source that delivers frames resets the backoff
+            rewound = False
+            delay = self.reconnect_delay
+
+            if self.rate_limit:
+                self._rate_changed.wait(1.0 / self.rate_limit)
+                self._rate_changed.clear()
+                next_frame_time = time.monotonic()
+            # Files stand in for live cameras, so pace them at their own rate
+            elif frame_interval:
+                next_frame_time += frame_interval
+                wait = next_frame_time - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    next_frame_time = time.monotonic()
+
+        if cap is not None:
+            cap.release()
+        self.set_state("stopped")
+
+    def publish(self, frame):
+        """Put a frame in the latest-frame slot"""
+        now = time.monotonic()
+        with self.lock:
+            if self.frame is not None and self.consumed_sequence != self.sequence:
+                self.frames_dropped += 1
+            self.frame = frame
+            self.frame_time = now
+            self.sequence += 1
+            self.frame_size = (frame.shape[1], frame.shape[0])
+        self.frames_read += 1
+
+        self._fps_frames += 1
+        elapsed = now - self._fps_start
+        if elapsed >= 1.0:
+            self.fps = self._fps_frames / elapsed
+            self._fps_frames = 0
+            self._fps_start = now
+
+    def latest_frame(self):
+        """Return (sequence, frame) of the newest frame; frame is None before the first one"""
+        with self.lock:
+            self.consumed_sequence = self.sequence
+            return self.sequence, self.frame
+
+    def sleep_while_running(self, seconds):
+        end = time.monotonic() + seconds
+        while self.running and time.monotonic() < end:
+            time.sleep(min(0.05, end - time.monotonic()))
+
+    def set_rate_limit(self, fps):
+        """Read at most fps frames per second, or at full rate for None"""
+        self.rate_limit = fps
+        self._rate_changed.set()
+
+    def reconnect(self):
+        """Reopen the source from its own thread"""
+        self._reconnect_requested = True
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'fps': self.fps,
+            'frames': self.frames_read,
+            'dropped': self.frames_dropped,
+            'reconnects': self.reconnects,
+            'frame_size': self.frame_size,
+            'mode': self.camera_mode,
+            'rate_limit': self.rate_limit,
+        }
+
+    def stop(self, wait=True):
+        self.running = False
+        self._rate_changed.set()
+        if wait:
+            self.wait()
+
+
+# Network stream that always serves the newest frame instead of lagging behind
+class NetworkStreamSource(CaptureSource):
+    def __init__(self, source_id, source, loop=False, reconnect_delay=0.5, max_reconnect_delay=30.0,
+                 timeout_ms=5000, backlog_threshold=0.008, max_backlog=120, parent=None):
+        super().__init__(source_id, source, loop=False, reconnect_delay=reconnect_delay,
+                         max_reconnect_delay=max_reconnect_delay, parent=parent)
+        self.timeout_ms = timeout_ms
+        self.backlog_threshold = backlog_threshold
+        self.max_backlog = max_backlog
+        self.backlog_discarded = 0
+        self.stream_lag = 0.0
+        self.frame_age = 0.0
+        self._min_offset = None
+
+    def open_capture(self):
+        # Bounded open/read times so a dead stream is noticed and reconnected
+        params = []
+        if hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
+            params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.timeout_ms,
+                      cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.timeout_ms]
+        cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG, params)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._min_offset = None
+        return cap
+
+    def read_frame(self, cap):
+        """Grab until a frame has to be waited for, then decode only that one"""
+        # A grab that returns at once came out of a buffer, so it is backlog;
+        # the first one that blocks is the frame that just arrived. Every
+        # fast grab before it is discarded; stopping at max_backlog keeps
+        # the last fast one instead.
+        fast = 0
+        while True:
+            start = time.monotonic()
+            if not cap.grab():
+                return False, None
+            if time.monotonic() - start > self.backlog_threshold:
+                skipped = fast
+                break
+            fast += 1
+            if fast >= self.max_backlog:
+                skipped = fast - 1
+                break
+        if skipped:
+            self.backlog_discarded += skipped
+            with self.lock:
+                self.frames_dropped += skipped
+
+        ok, frame = cap.retrieve()
+        if ok:
+            self.update_stream_lag(cap.get(cv2.CAP_PROP_POS_MSEC))
+        return ok, frame
+
+    def update_stream_lag(self, position_ms):
+        """Delay of this frame relative to the least delayed frame seen since connecting"""
+        if position_ms <= 0:
+            return
+        offset = time.monotonic() - position_ms / 1000.0
+        if self._min_offset is None or offset < self._min_offset:
+            self._min_offset = offset
+        self.stream_lag = offset - self._min_offset
+
+    def latest_frame(self):
+        sequence, frame = super().latest_frame()
+        if frame is not None:
+            self.frame_age = time.monotonic() - self.frame_time
+        return sequence, frame
+
+    def stats(self):
+        stats = super().stats()
+        stats['backlog_discarded'] = self.backlog_discarded
+        stats['lag_ms'] = (self.stream_lag + self.frame_age) * 1000.0
+        return stats
+
+
+# Owner of all open capture sources
+class CaptureManager:
+    def __init__(self):
+        self.sources = {}
+        self.stopping = []
+        self._next_id = 1
+
+    def add_source(self, source, source_id=None, loop=None, source_class=None, **kwargs):
+        """Start reading from a camera index, file path or stream URL and return its id"""
+        if source_class is None:
+            source_class = NetworkStreamSource if is_stream_source(source) else CaptureSource
+        if source_id is None:
+            source_id = f"source{self._next_id}"
+            self._next_id += 1
+        if source_id in self.sources:
+            self.remove_source(source_id)
+        if loop is None:
+            loop = is_file_source(source)
+
+        reader = source_class(source_id, source, loop=loop, **kwargs)
+        self.sources[source_id] = reader
+        reader.start()
+        return source_id
+
+    def remove_source(self, source_id):
+        """Stop a source without waiting for its reader to finish"""
+        reader = self.sources.pop(source_id, None)
+        if reader is not None:
+            reader.stop(wait=False)
+            self.stopping.append(reader)
+        self.stopping = [r for r in self.stopping if not r.isFinished()]
+
+    def get(self, source_id):
+        return self.sources.get(source_id)
+
+    def latest_frame(self, source_id):
+        reader = self.sources.get(source_id)
+        if reader is None:
+            return 0, None
+        return reader.latest_frame()
+
+    def reconnect(self, source_id):
+        reader = self.sources.get(source_id)
+        if reader is not None:
+            reader.reconnect()
+
+    def stats(self):
+        return {source_id: reader.stats() for source_id, reader in self.sources.items()}
+
+    def stop_all(self):
+        readers = list(self.sources.values()) + self.stopping
+        for reader in readers:
+            reader.stop(wait=False)
+        for reader in readers:
+            reader.wait()
+        self.sources.clear()
+        self.stopping = []
@@ -5,17 +5,79 @@ VIDEO_WIDTH = 640
 VIDEO_HEIGHT = 480
 FPS = 30
 VIDEO_CODEC = 'MJPG'
+CAMERA_BUFFER_SIZE = 1  # Driver queue depth; deeper queues add latency
+CAMERA_FALLBACK_RESOLUTIONS = [(1920, 1080), (1280, 720), (640, 480), (320, 240)]
 
 # Detection settings
 DETECTION_CONFIDENCE = 0.5
 MAX_DETECTIONS = 1000
+LATENCY_BUDGET_MS = 30  # Detector time allowed per frame before the governor backs off
+DETECTION_SCALES = [1.0, 0.75, 0.5]  # Detection resolutions the governor steps through
+MAX_DETECTION_STRIDE = 6  # Detect at least every Nth frame
+GOVERNOR_WINDOW = 15  # Detector runs averaged before each governor decision
+EVENT_GAP_SECONDS = 2.0  # A label unseen this long ends its detection event
+EVENT_MAX_SECONDS = 300  # Longer events are split so sustained activity still reports
+JOURNAL_FLUSH_INTERVAL = 1.0  # Seconds between fsynced batches of the detection journal
+JOURNAL_MAX_RECORDS = 1000000  # Older detections are dropped when the journal is compacted
+JOURNAL_COMPACT_RECORDS = 100000  # Journal length that triggers folding it into the history snapshot
+DETECTION_LABELS = ['Object', 'Face', 'Drone', 'Person', 'Vehicle']  # Stored as codes; never reorder
+
+# Idle duty cycling
+IDLE_QUIET_SECONDS = 300  # Seconds without motion or detections before a camera idles; 0 never idles
+IDLE_FPS = 2  # Capture and detection rate while idle
+MOTION_WIDTH = 64  # Width of the frames the idle motion check runs on
 
 # UI settings
 DEFAULT_THEME = 'dark'
 ENABLE_GRID = True
 ENABLE_INFO_OVERLAY = True
+DISPLAY_FPS = 30  # Repaint cap for the video views, independent of capture and detection rate
+MOSAIC_DETECTION_STRIDE = 5  # Run detection on every Nth frame of each mosaic source
+THERMAL_FPS = 10  # The false-colour Thermal view updates at this reduced rate
+THERMAL_WIDTH = 320
+THERMAL_COLORMAP = 'INFERNO'
+
+# Playback settings
+PLAYBACK_SPEEDS = [1, 2, 4, 8, 16, 32]
+PLAYBACK_SEEK_SPEED = 8  # At or above this speed, seek instead of grabbing every frame
+DETECTION_SLOWDOWN_TICKS = 2  # Drop to 1x this many display ticks before a detection
+FRAME_CACHE_MB = 256  # Memory cap for decoded frames kept around the playhead
+FRAME_CACHE_BEHIND = 60  # Frames to keep decoded behind the playhead, as far as FRAME_CACHE_MB allows
+FRAME_CACHE_AHEAD = 30  # Frames to keep decoded ahead of the playhead
+
+# Proxy recording settings
+PROXY_ENABLED = True
+PROXY_WIDTH = 320
+PROXY_FPS = 10
+PROXY_MAX_UPSCALE = 4  # Use full resolution once the view is zoomed further than this
+
+# Thumbnail strip settings
+THUMBNAIL_INTERVAL = 2  # Seconds of recording per hover thumbnail
+THUMBNAIL_WIDTH = 160
+
+# Detected-frame store settings
+DETECTED_FRAMES_MEMORY_MB = 64  # JPEG frames kept in memory before spilling to disk
+DETECTED_FRAMES_DISK_MB = 2048
+DETECTED_FRAMES_MAX_AGE_DAYS = 30
+DETECTED_FRAMES_QUALITY = 85
+DETECTION_THUMBNAIL_WIDTH = 96  # Icon width in the detection events list
+
+# Log settings
+LOG_FLUSH_INTERVAL = 0.5  # Seconds between batched writes of the log file
+LOG_MAX_MB = 10  # The day's log file is rotated into a gzip part past this size
+LOG_CONSOLE_PER_SECOND = 20  # Console echo rate; the file always gets every line
+LOG_UI_INTERVAL_MS = 200  # The log viewer is updated in batches at this interval
+LOG_VIEW_LINES = 100000  # Most recent lines kept in the log viewer
+LOG_INDEX_FILE = 'log_index.db'  # Full-text index of the log files, inside the logs directory
+LOG_INDEX_INTERVAL = 10  # Seconds between incremental passes of the log indexer
+LOG_SEARCH_LIMIT = 500  # Most lines a log search returns
 
 # File paths
 LOGS_DIRECTORY = 'logs'
 RECORDINGS_DIRECTORY = 'recordings'
-DETECTION_DATA_FILE = 'detections.json'
\ No newline at end of file
+DETECTION_DATA_FILE = 'detections.json'
+DETECTION_DB_FILE = 'detections.db'
+STORE_FLUSH_TIMEOUT = 0.5  # Longest the UI waits for queued detections before exporting
+DETECTED_FRAMES_DIRECTORY = 'detected_frames'
+DETECTION_PAGE_SIZE = 500  # Events fetched per scroll page of the detections list
+DETECTION_LIST_INTERVAL_MS = 250  # How often new events are added to the detections list
\ No newline at end of file
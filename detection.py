@@ -0,0 +1,237 @@
+# Live detection pipeline helpers for VIPERS
+
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+def scale_detections(detected_objects, factor):
+    """Map boxes found on a scaled frame back to full-resolution pixels"""
+    if factor == 1.0:
+        return detected_objects
+    scaled = []
+    for obj in detected_objects:
+        x, y, w, h = obj['box']
+        scaled.append(dict(obj, box=(int(x * factor), int(y * factor), int(w * factor), int(h * factor))))
+    return scaled
+
+
+# Keeps detector time within a per-frame latency budget by trading
+# detection resolution and stride, judged over a moving window of run times
+class LatencyGovernor:
+    def __init__(self, budget_ms, scales=(1.0, 0.75, 0.5), max_stride=6, window=15):
+        self.budget_ms = budget_ms
+        self.scales = list(scales)
+        self.max_stride = max_stride
+        self.window = window
+        self.run_times = deque(maxlen=window)
+        self.scale_index = 0
+        self.stride = 1
+        self.frame_number = 0
+        self.last_decision = None
+
+    @property
+    def scale(self):
+        return self.scales[self.scale_index]
+
+    def average_ms(self):
+        return sum(self.run_times) / len(self.run_times) if self.run_times else 0.0
+
+    def should_detect(self):
+        """Called once per frame; True when the detector should run on it"""
+        self.frame_number += 1
+        return (self.frame_number - 1) % self.stride == 0
+
+    def record(self, run_ms):
+        """Add a detector run time; returns a description when the settings change"""
+        self.run_times.append(run_ms)
+        if len(self.run_times) < self.window:
+            return None
+
+        average = self.average_ms()
+        decision = None
+        if average > self.budget_ms:
+            # A run over budget delays the frame it runs on, which only a
+            # cheaper resolution fixes; stride is the fallback once at the floor
+            if self.scale_index < len(self.scales) - 1:
+                self.scale_index += 1
+                decision = f"detection resolution lowered to {self.scale:.0%}"
+            elif self.stride < self.max_stride:
+                self.stride += 1
+                decision = f"detecting every {self.stride} frames"
+        elif average < self.budget_ms / 2:
+            # Give back quality in the reverse order, stride first
+            previous_scale = self.scales[self.scale_index - 1] if self.scale_index else None
+            if self.stride > 1:
+                self.stride -= 1
+                decision = f"detecting every {self.stride} frames" if self.stride > 1 else "detecting every frame"
+            elif previous_scale is not None and \
+                    average * (previous_scale / self.scale) ** 2 < self.budget_ms * 0.8:
+                self.scale_index -= 1
+                decision = f"detection resolution raised to {self.scale:.0%}"
+
+        if decision is None:
+            return None
+
+        # Old samples were measured under the old settings
+        self.run_times.clear()
+        self.last_decision = f"{decision} (detector {average:.0f} ms, budget {self.budget_ms} ms)"
+        return self.last_decision
+
+    def reset(self):
+        self.run_times.clear()
+        self.scale_index = 0
+        self.stride = 1
+        self.frame_number = 0
+        self.last_decision = None
+
+    def status(self):
+        stride = "every frame" if self.stride == 1 else f"every {self.stride} frames"
+        return f"Detect {stride} @ {self.scale:.0%} | {self.average_ms():.0f} ms/run"
+
+
+# Cheap motion check on a small frame against a slowly adapting background
+class MotionSensor:
+    def __init__(self, threshold=25, min_fraction=0.01, learning_rate=0.05):
+        self.threshold = threshold
+        self.min_fraction = min_fraction
+        self.learning_rate = learning_rate
+        self.background = None
+        self.level = 0.0
+
+    def update(self, frame):
+        """Feed a frame; True when enough of it changed"""
+        gray = cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return False
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        self.level = np.count_nonzero(diff > self.threshold) / diff.size
+        return self.level >= self.min_fraction
+
+    def reset(self):
+        self.background = None
+        self.level = 0.0
+
+
+# Idle/active state from motion and detections; quiet_seconds of 0 never idles
+class ActivityMonitor:
+    def __init__(self, quiet_seconds):
+        self.quiet_seconds = quiet_seconds
+        self.idle = False
+        self.last_activity = None
+
+    def update(self, active, now):
+        """Returns "idle" or "active" when the state changes, otherwise None"""
+        if self.last_activity is None:
+            self.last_activity = now
+        if active:
+            self.last_activity = now
+            if self.idle:
+                self.idle = False
+                return "active"
+        elif not self.idle and self.quiet_seconds > 0 and now - self.last_activity >= self.quiet_seconds:
+            self.idle = True
+            return "idle"
+        return None
+
+    def reset(self):
+        self.idle = False
+        self.last_activity = None
+
+
+# Consecutive hits of one label merged into a single event
+class DetectionEvent:
+    def __init__(self, label, timestamp, frame_index, key, camera=None, recording=None):
+        self.label = label
+        self.camera = camera
+        self.recording = recording  # Recording the frame indices belong to, if any
+        self.start = self.end = timestamp
+        self.start_frame = self.end_frame = frame_index
+        self.key = key  # Frame store key of the first hit
+        self.hits = 0
+        self.peak_count = 0
+        self.best_score = -1.0
+        self.best_key = key
+        self.best_frame = None
+        self.ended = False
+
+    @property
+    def duration(self):
+        return (self.end - self.start).total_seconds()
+
+    def add(self, timestamp, frame_index, key, count, score, frame):
+        self.end = timestamp
+        self.end_frame = frame_index
+        self.hits += 1
+        self.peak_count = max(self.peak_count, count)
+        if score > self.best_score:
+            self.best_score = score
+            self.best_key = key
+            self.best_frame = frame
+
+
+# Turns per-frame detections into events for the list, log and alerts
+#
+# An event stays open while its label keeps being seen within gap_seconds;
+# sinks are called with ("started", event) and ("ended", event) only.
+class EventCoalescer:
+    def __init__(self, gap_seconds, max_seconds=None):
+        self.gap_seconds = gap_seconds
+        self.max_seconds = max_seconds
+        self.open_events = {}
+        self.sinks = []
+        self.events_started = 0
+        self.hits = 0
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def update(self, timestamp, frame_index, key, detected_objects, frame=None, camera=None, recording=None):
+        """Feed one detector run; an empty list means nothing was seen"""
+        found = {}
+        for obj in detected_objects:
+            count, score = found.get(obj['label'], (0, 0.0))
+            found[obj['label']] = (count + 1, score + obj.get('confidence', 1.0))
+
+        self.expire(timestamp, keep=found)
+        for label, (count, score) in found.items():
+            event = self.open_events.get(label)
+            if event is not None and ((timestamp - event.end).total_seconds() > self.gap_seconds or
+                                      self.max_seconds and
+                                      (timestamp - event.start).total_seconds() >= self.max_seconds):
+                # Back after a gap nobody reported, or in view for hours and still reporting now and then
+                self.close(event)
+                event = None
+            started = event is None
+            if started:
+                event = self.open_events[label] = DetectionEvent(label, timestamp, frame_index, key,
+                                                                 camera, recording)
+                self.events_started += 1
+            event.add(timestamp, frame_index, key, count, score, frame)
+            self.hits += 1
+            if started:
+                self.emit("started", event)
+
+    def expire(self, timestamp, keep=()):
+        """End events whose label has not been seen for gap_seconds"""
+        for label, event in list(self.open_events.items()):
+            if label not in keep and (timestamp - event.end).total_seconds() > self.gap_seconds:
+                self.close(event)
+
+    def flush(self):
+        """End every open event, e.g. when the source stops"""
+        for event in list(self.open_events.values()):
+            self.close(event)
+
+    def close(self, event):
+        del self.open_events[event.label]
+        event.ended = True
+        self.emit("ended", event)
+        event.best_frame = None
+
+    def emit(self, state, event):
+        for sink in self.sinks:
+            sink(state, event)
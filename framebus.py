@@ -0,0 +1,141 @@
+# Frame bus for VIPERS: one decoded frame shared by every consumer
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+# Read-only frame handed to consumers; pooled buffers return to the bus
+# once every consumer has released them
+class SharedFrame:
+    __slots__ = ('data', 'sequence', 'timestamp', 'refs', 'pool')
+
+    def __init__(self, data, sequence, timestamp, pool=None):
+        data.flags.writeable = False
+        self.data = data
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.refs = 0
+        self.pool = pool
+
+    def retain(self):
+        self.refs += 1
+        return self
+
+    def release(self):
+        self.refs -= 1
+        if self.refs == 0 and self.pool is not None:
+            self.pool.recycle(self.data)
+
+
+# Free output buffers of one size, reused for scaled copies
+class BufferPool:
+    def __init__(self, shape, dtype):
+        self.shape = shape
+        self.dtype = dtype
+        self.free = []
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            if self.free:
+                buffer = self.free.pop()
+                buffer.flags.writeable = True
+                return buffer
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def recycle(self, buffer):
+        with self.lock:
+            self.free.append(buffer)
+
+
+# One consumer's declared rate and resolution
+class Subscription:
+    def __init__(self, name, callback, fps=None, width=None):
+        self.name = name
+        self.callback = callback
+        self.fps = fps  # None delivers every frame
+        self.width = width  # None delivers full resolution
+        self.enabled = True
+        self.next_delivery = 0.0
+        self.delivered = 0
+        self.skipped = 0
+
+    def due(self, now):
+        # A quarter interval of slack, so frames polled a little early aren't dropped
+        return self.fps is None or now >= self.next_delivery - 0.25 / self.fps
+
+    def mark_delivered(self, now):
+        """Schedule the next delivery one interval on, restarting from now if far behind"""
+        if self.fps is not None:
+            interval = 1.0 / self.fps
+            self.next_delivery += interval
+            if self.next_delivery < now:
+                self.next_delivery = now + interval
+        self.delivered += 1
+
+
+# Publish/subscribe hub; scaled copies are made once per size per frame
+class FrameBus:
+    def __init__(self):
+        self.subscriptions = []
+        self.pools = {}
+        self.sequence = 0
+
+    def subscribe(self, name, callback, fps=None, width=None):
+        """Register a consumer; it is called with a SharedFrame in subscription order"""
+        subscription = Subscription(name, callback, fps, width)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def publish(self, frame, now=None):
+        """Deliver a frame to every due consumer; the frame becomes read-only"""
+        self.sequence += 1
+        now = time.monotonic() if now is None else now
+        full = SharedFrame(frame, self.sequence, now)
+        scaled = {}
+
+        for subscription in list(self.subscriptions):
+            if not subscription.enabled or not subscription.due(now):
+                subscription.skipped += 1
+                continue
+            shared = self.frame_for(subscription.width, full, scaled)
+
+            # Held for the call; a consumer that keeps the frame retains it
+            shared.retain()
+            try:
+                subscription.callback(shared)
+            finally:
+                shared.release()
+            subscription.mark_delivered(now)
+
+        # The bus's own hold on scaled copies; unkept ones go back to their pool
+        for shared in scaled.values():
+            shared.release()
+        return full
+
+    def frame_for(self, width, full, scaled):
+        height, full_width = full.data.shape[:2]
+        if width is None or width >= full_width:
+            return full
+        if width not in scaled:
+            size = (width, max(1, int(round(height * width / full_width))))
+            shape = (size[1], size[0]) + full.data.shape[2:]
+            pool = self.pools.get(shape)
+            if pool is None:
+                pool = self.pools[shape] = BufferPool(shape, full.data.dtype)
+            buffer = pool.take()
+            cv2.resize(full.data, size, dst=buffer, interpolation=cv2.INTER_AREA)
+            scaled[width] = SharedFrame(buffer, full.sequence, full.timestamp, pool).retain()
+        return scaled[width]
+
+    def stats(self):
+        return {s.name: {'fps': s.fps, 'width': s.width, 'enabled': s.enabled,
+                         'delivered': s.delivered, 'skipped': s.skipped}
+                for s in self.subscriptions}
@@ -0,0 +1,225 @@
+# Full-text index over the VIPERS log files
+
+import datetime
+import glob
+import gzip
+import os
+import queue
+import sqlite3
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from logsink import parse_log_line
+
+LOG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_files (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS log_lines (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    time_ms INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_lines_time ON log_lines (time_ms);
+CREATE INDEX IF NOT EXISTS log_lines_level ON log_lines (level, time_ms);
+CREATE INDEX IF NOT EXISTS log_lines_file ON log_lines (file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS log_text USING fts5(message, content='log_lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS log_lines_insert AFTER INSERT ON log_lines BEGIN
+    INSERT INTO log_text (rowid, message) VALUES (NEW.id, NEW.message);
+END;
+CREATE TRIGGER IF NOT EXISTS log_lines_delete AFTER DELETE ON log_lines BEGIN
+    INSERT INTO log_text (log_text, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+END;
+"""
+
+_STOP = object()
+
+
+def log_file_order(path):
+    """Sort key putting a day's gzip parts in order, then its live file"""
+    name = os.path.basename(path)
+    parts = name.split('.')
+    day = parts[0]
+    part = int(parts[1]) if name.endswith('.log.gz') and parts[1].isdigit() else float('inf')
+    return day, part
+
+
+def fts_query(text):
+    """Match every word of free text, the last one as a prefix"""
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+
+# Incremental SQLite FTS5 index of the log directory
+#
+# Rotated .log.gz parts never change and are indexed once; the live file of
+# the day is read from where the last pass stopped. A live file that shrank
+# or disappeared was rotated, so its rows are dropped and the new gzip part
+# is indexed in their place. Searches run on the caller's own connection.
+class LogIndex(QThread):
+    indexed = pyqtSignal(int)  # lines added by a pass
+
+    def __init__(self, path, directory, interval=30.0, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.directory = directory
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.lines_indexed = 0
+        self.db = self.connect()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(LOG_INDEX_SCHEMA)
+        return db
+
+    def run(self):
+        db = self.connect()
+        while True:
+            try:
+                item = self.queue.get(timeout=self.interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            added = self.update(db)
+            if added:
+                self.indexed.emit(added)
+            if isinstance(item, threading.Event):
+                item.set()
+        db.close()
+
+    def refresh(self, timeout=None):
+        """Index new log lines now; with a timeout, wait for the pass to finish"""
+        done = threading.Event()
+        self.queue.put(done)
+        if timeout is not None:
+            done.wait(timeout)
+
+    def update(self, db):
+        """One incremental pass over the log directory; returns lines added"""
+        paths = glob.glob(os.path.join(self.directory, "vipers_*.log")) + \
+            glob.glob(os.path.join(self.directory, "vipers_*.log.gz"))
+        present = {os.path.basename(path) for path in paths}
+        known = {name: (file_id, size, offset)
+                 for file_id, name, size, offset in db.execute("SELECT id, name, size, offset FROM log_files")}
+
+        # Files that were rotated away or deleted take their rows with them
+        for name, (file_id, size, offset) in known.items():
+            if name not in present:
+                self.forget(db, file_id)
+
+        added = 0
+        for path in sorted(paths, key=log_file_order):
+            name = os.path.basename(path)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            file_id, known_size, offset = known.get(name, (None, 0, 0))
+            if name.endswith('.gz'):
+                if file_id is not None and known_size == size:
+                    continue
+                offset = 0
+            elif file_id is not None and size < offset:
+                # Truncated or recreated after a rotation
+                offset = 0
+            elif file_id is not None and size == offset:
+                continue
+            if file_id is not None and offset == 0:
+                self.forget(db, file_id)
+                file_id = None
+            added += self.index_file(db, path, name, size, file_id, offset)
+        self.lines_indexed += added
+        return added
+
+    def forget(self, db, file_id):
+        with db:
+            db.execute("DELETE FROM log_lines WHERE file_id = ?", (file_id,))
+            db.execute("DELETE FROM log_files WHERE id = ?", (file_id,))
+
+    def index_file(self, db, path, name, size, file_id, offset):
+        try:
+            if name.endswith('.gz'):
+                with gzip.open(path, 'rb') as f:
+                    data = f.read()
+                end = size
+            else:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(size - offset)
+                # Leave a partly written last line for the next pass
+                complete = data.rfind(b'\n') + 1
+                data = data[:complete]
+                end = offset + complete
+        except (OSError, EOFError):
+            return 0
+
+        rows = []
+        for line in data.decode('utf-8', errors='replace').splitlines():
+            parsed = parse_log_line(line)
+            if parsed is not None:
+                timestamp, level, message = parsed
+                rows.append((int(timestamp.timestamp() * 1000), level, message))
+
+        with db:
+            if file_id is None:
+                file_id = db.execute("INSERT INTO log_files (name, size, offset) VALUES (?, ?, ?)",
+                                     (name, size, end)).lastrowid
+            else:
+                db.execute("UPDATE log_files SET size = ?, offset = ? WHERE id = ?", (size, end, file_id))
+            db.executemany("INSERT INTO log_lines (file_id, time_ms, level, message) VALUES (?, ?, ?, ?)",
+                           ((file_id,) + row for row in rows))
+        return len(rows)
+
+    def search(self, text=None, level=None, start=None, end=None, limit=500):
+        """Newest matching lines as (timestamp, level, message); start and end are datetimes"""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("l.time_ms >= ?")
+            params.append(int(start.timestamp() * 1000))
+        if end is not None:
+            conditions.append("l.time_ms < ?")
+            params.append(int(end.timestamp() * 1000))
+        if level:
+            conditions.append("l.level = ?")
+            params.append(level.upper())
+
+        query = fts_query(text or "")
+        if query:
+            # Rows are indexed oldest file first, so newest rowid first is newest first
+            sql = "SELECT l.time_ms, l.level, l.message FROM log_text JOIN log_lines l ON l.id = log_text.rowid"
+            conditions.insert(0, "log_text MATCH ?")
+            params.insert(0, query)
+            order = "log_text.rowid DESC"
+        else:
+            sql = "SELECT l.time_ms, l.level, l.message FROM log_lines l"
+            order = "l.time_ms DESC"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        rows = self.db.execute(sql, params).fetchall()
+        return sorted(((datetime.datetime.fromtimestamp(time_ms / 1000), level, message)
+                       for time_ms, level, message in rows), reverse=True)
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM log_lines").fetchone()[0]
+
+    def close(self):
+        """Stop the indexer and close the search connection"""
+        if self.isRunning():
+            self.queue.put(_STOP)
+            self.wait()
+        self.db.close()
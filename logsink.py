@@ -0,0 +1,213 @@
+# Log sink for VIPERS: file and console output off the UI thread
+
+import datetime
+import glob
+import gzip
+import os
+import queue
+import re
+import shutil
+import time
+
+from PyQt5.QtCore import QThread
+
+LOG_LEVELS = {'info': "INFO", 'warning': "WARNING", 'error': "ERROR", 'detection': "DETECTION"}
+LOG_LINE = re.compile(r'^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (?:([A-Z]+): )?(.*)$')
+
+_FLUSH = object()
+_STOP = object()
+
+
+def log_path_for(directory, date):
+    """The live log file of a date"""
+    return os.path.join(directory, f"vipers_{date:%Y-%m-%d}.log")
+
+
+def format_log_line(timestamp, level, message):
+    return f"[{timestamp:%Y-%m-%d %H:%M:%S}] {LOG_LEVELS.get(level, level.upper())}: {message}\n"
+
+
+def parse_log_line(line):
+    """(timestamp, level, message) of a log file line, or None; lines from
+    before levels were written count as INFO"""
+    match = LOG_LINE.match(line.rstrip('\n'))
+    if match is None:
+        return None
+    timestamp = datetime.datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+    return timestamp, match.group(2) or "INFO", match.group(3)
+
+
+def rotate_log(path):
+    """Compress a log file to the next free vipers_<date>.<n>.log.gz and remove it"""
+    stem = path[:-len(".log")]
+    part = 1
+    while os.path.exists(f"{stem}.{part}.log.gz"):
+        part += 1
+    target = f"{stem}.{part}.log.gz"
+    with open(path, 'rb') as source, gzip.open(target, 'wb') as compressed:
+        shutil.copyfileobj(source, compressed)
+    os.remove(path)
+    return target
+
+
+# Token bucket for console output; what it holds back is counted, not queued
+class RateLimiter:
+    def __init__(self, per_second, burst=None):
+        self.per_second = per_second
+        self.burst = burst or per_second
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self.suppressed = 0
+
+    def allow(self, now=None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.per_second)
+        self.last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+
+# Background writer for the daily log files
+#
+# Messages are queued by log() from any thread and written in batches. The
+# live file of a day is rotated into gzip parts when it grows past max_bytes
+# and when the day ends, so only today's tail is ever uncompressed.
+class LogSink(QThread):
+    def __init__(self, directory, flush_interval=0.5, batch_size=200, max_bytes=10 * 1024 * 1024,
+                 console_per_second=20, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.console = RateLimiter(console_per_second) if console_per_second else None
+        self.queue = queue.Queue()
+        self.file = None
+        self.file_date = None
+        self.lines_written = 0
+        self.batches_written = 0
+        self.rotations = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def log(self, timestamp, level, message):
+        """Queue a message; safe to call from any thread"""
+        self.queue.put((timestamp, level, message))
+
+    def flush(self):
+        self.queue.put(_FLUSH)
+
+    def run(self):
+        self.rotate_stale(datetime.date.today())
+        pending = []
+        last_write = time.monotonic()
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                break
+            if item is not None and item is not _FLUSH:
+                pending.append(item)
+                self.echo(*item)
+
+            if item is _FLUSH or len(pending) >= self.batch_size or \
+                    (pending and time.monotonic() - last_write >= self.flush_interval):
+                self.write_batch(pending)
+                last_write = time.monotonic()
+
+        self.write_batch(pending)
+        self.close_file()
+        self.report_suppressed()
+
+    def echo(self, timestamp, level, message):
+        if self.console is None or not self.console.allow():
+            return
+        self.report_suppressed()
+        print(format_log_line(timestamp, level, message), end='')
+
+    def report_suppressed(self):
+        if self.console is not None and self.console.suppressed:
+            print(f"... {self.console.suppressed} log messages not shown on the console")
+            self.console.suppressed = 0
+
+    def write_batch(self, pending):
+        if not pending:
+            return
+        lines = []
+        for timestamp, level, message in pending:
+            if timestamp.date() != self.file_date:
+                self.write_lines(lines)
+                lines = []
+                self.open_file(timestamp.date())
+            lines.append(format_log_line(timestamp, level, message))
+        self.write_lines(lines)
+        self.batches_written += 1
+        pending.clear()
+
+    def write_lines(self, lines):
+        if not lines or self.file is None:
+            return
+        try:
+            self.file.write(''.join(lines))
+            self.file.flush()
+            self.lines_written += len(lines)
+            if self.file.tell() >= self.max_bytes:
+                # Carry on in a fresh file for the same day
+                date = self.file_date
+                self.close_file(rotate=True)
+                self.open_file(date)
+        except OSError as e:
+            print(f"Error writing to log file: {e}")
+
+    def open_file(self, date):
+        """Switch to the file of date, compressing the previous day's"""
+        previous = self.file_date
+        self.close_file(rotate=previous is not None and previous < date)
+        self.file_date = date
+        try:
+            self.file = open(log_path_for(self.directory, date), 'a', encoding='utf-8')
+        except OSError as e:
+            print(f"Error opening log file: {e}")
+
+    def close_file(self, rotate=False):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if rotate:
+            try:
+                rotate_log(log_path_for(self.directory, self.file_date))
+                self.rotations += 1
+            except OSError as e:
+                print(f"Error rotating log file: {e}")
+
+    def rotate_stale(self, today):
+        """Compress live files of earlier days left by previous sessions"""
+        for path in glob.glob(os.path.join(self.directory, "vipers_*.log")):
+            name = os.path.basename(path)[len("vipers_"):-len(".log")]
+            try:
+                date = datetime.datetime.strptime(name, "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            if date < today:
+                try:
+                    rotate_log(path)
+                    self.rotations += 1
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'lines': self.lines_written,
+                'batches': self.batches_written, 'rotations': self.rotations}
+
+    def close(self):
+        """Write everything queued and stop the writer"""
+        if self.isRunning():
+            self.queue.put(_STOP)
+            self.wait()
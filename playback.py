@@ -0,0 +1,327 @@
+# Playback helpers for VIPERS recordings
+
+from collections import OrderedDict
+import mmap
+import os
+import struct
+import threading
+
+from PyQt5.QtCore import QThread, QMutex, QWaitCondition, pyqtSignal
+import cv2
+
+THUMBNAIL_MAGIC = b'VTHB'
+THUMBNAIL_HEADER = struct.Struct('<4sII')  # magic, thumbnail count, recording frames per thumbnail
+
+
+def proxy_path_for(recording_path):
+    """Location of the low-resolution proxy written next to a recording"""
+    directory, name = os.path.split(recording_path)
+    return os.path.join(directory, "proxies", name)
+
+
+def proxy_frame_size(width, height, proxy_width):
+    """Scale a frame size down to proxy_width, keeping the aspect ratio and even dimensions"""
+    if width <= proxy_width:
+        return width, height
+    proxy_height = int(round(height * proxy_width / width))
+    return proxy_width - proxy_width % 2, max(2, proxy_height - proxy_height % 2)
+
+
+def playback_target(current_frame, speed, total_frames, next_detection=None, slowdown_ticks=2):
+    """Frame to show after current_frame at speed, or None when the next
+    detection is close enough to drop back to 1x"""
+    if speed <= 1:
+        return current_frame
+    if next_detection is not None and next_detection - current_frame <= speed * slowdown_ticks:
+        return None
+    return min(current_frame + speed - 1, total_frames - 1)
+
+
+def thumbnail_path_for(recording_path):
+    """Location of the packed thumbnail strip for a recording"""
+    directory, name = os.path.split(recording_path)
+    return os.path.join(directory, "thumbnails", os.path.splitext(name)[0] + ".thumbs")
+
+
+# Memory-bounded LRU cache of decoded frames keyed by frame index
+class FrameCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, index):
+        with self.lock:
+            return index in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def get(self, index):
+        """Return the cached frame for index, or None"""
+        with self.lock:
+            frame = self.frames.get(index)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(index)
+            self.hits += 1
+            return frame
+
+    def put(self, index, frame):
+        """Store a frame, evicting the least recently used ones over budget"""
+        if frame.nbytes > self.max_bytes:
+            return
+
+        # Cached frames are shared with the display path, never modified
+        frame.flags.writeable = False
+        with self.lock:
+            old = self.frames.pop(index, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self.frames[index] = frame
+            self.current_bytes += frame.nbytes
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss and memory statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'frames': len(self.frames),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Background decoder that fills a FrameCache around the playhead
+#
+# The window is shrunk to what the cache can hold once the frame size is
+# known, the side ahead of the playhead is decoded first, and nothing is
+# done while the playhead is still well inside the window last filled.
+class FramePrefetchThread(QThread):
+    def __init__(self, file_path, cache, behind=60, ahead=30, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cache = cache
+        self.behind = behind
+        self.ahead = ahead
+        self.running = True
+        self.center = None
+        self.filled = None  # (first, last) frame of the window last filled
+        self.mutex = QMutex()
+        self.condition = QWaitCondition()
+
+    def request(self, center):
+        """Ask for the window around center to be decoded"""
+        self.mutex.lock()
+        self.center = center
+        self.condition.wakeOne()
+        self.mutex.unlock()
+
+    def fit_window(self, frame_bytes):
+        """Shrink behind and ahead so the whole window fits in the cache, keeping ahead first"""
+        capacity = max(1, self.cache.max_bytes // max(1, frame_bytes))
+        self.ahead = min(self.ahead, capacity - 1)
+        self.behind = min(self.behind, capacity - 1 - self.ahead)
+
+    def needs_fill(self, center):
+        """False while center is in the last filled window with half the ahead side still to go"""
+        if self.filled is None:
+            return True
+        first, last = self.filled
+        return not first <= center <= last - self.ahead // 2
+
+    def run(self):
+        cap = cv2.VideoCapture(self.file_path)
+        if not cap.isOpened():
+            self.running = False
+            return
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        position = 0
+        fitted = False
+
+        while self.running:
+            self.mutex.lock()
+            if self.center is None:
+                self.condition.wait(self.mutex)
+            center, self.center = self.center, None
+            self.mutex.unlock()
+            if center is None or not self.running or not self.needs_fill(center):
+                continue
+
+            # The playhead frame first, to learn the frame size, then ahead, then behind
+            position, complete = self.decode(cap, position, range(center, center + 1))
+            if not fitted and len(self.cache):
+                self.fit_window(self.cache.current_bytes // len(self.cache))
+                fitted = True
+            start = max(0, center - self.behind)
+            end = min(total_frames, center + self.ahead + 1)
+            if complete:
+                position, complete = self.decode(cap, position, range(center + 1, end))
+            if complete:
+                position, complete = self.decode(cap, position, range(start, center))
+            if complete:
+                self.filled = (start, end - 1)
+
+        cap.release()
+
+    def decode(self, cap, position, indices):
+        """Decode the uncached frames of a range into the cache, seeking once;
+        returns the new read position and whether the range was finished"""
+        missing = [i for i in indices if i not in self.cache]
+        if not missing:
+            return position, True
+
+        # Seek once to the first missing frame (the decoder rewinds to
+        # its nearest keyframe) and decode forward from there
+        first = missing[0]
+        if position != first:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+            position = first
+
+        for index in range(first, missing[-1] + 1):
+            if not self.running or self.center is not None:
+                return position, False
+            if index in self.cache:
+                ok = cap.grab()
+            else:
+                ok, frame = cap.read()
+                if ok:
+                    self.cache.put(index, frame)
+            if not ok:
+                return None, False
+            position = index + 1
+        return position, True
+
+    def stop(self):
+        self.mutex.lock()
+        self.running = False
+        self.condition.wakeOne()
+        self.mutex.unlock()
+        self.wait()
+
+
+# Read-only, memory-mapped view of a packed thumbnail strip
+#
+# Layout: header, then count + 1 little-endian uint64 offsets, then the
+# JPEG images back to back. Thumbnail i spans offsets[i]:offsets[i + 1].
+class ThumbnailStrip:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, self.frame_interval = THUMBNAIL_HEADER.unpack_from(self.data, 0)
+            if magic != THUMBNAIL_MAGIC or self.frame_interval <= 0:
+                raise ValueError(f"Not a thumbnail strip: {file_path}")
+            self.offsets = struct.unpack_from(f'<{self.count + 1}Q', self.data, THUMBNAIL_HEADER.size)
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def thumbnail_for_frame(self, frame_index):
+        """JPEG bytes of the thumbnail covering frame_index, or None"""
+        index = frame_index // self.frame_interval
+        if index < 0 or index >= self.count:
+            return None
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def close(self):
+        if getattr(self, 'data', None) is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+
+# Background generator for a recording's thumbnail strip
+class ThumbnailStripThread(QThread):
+    strip_ready = pyqtSignal(str, str)  # recording path, strip path
+
+    def __init__(self, recording_path, interval_seconds=2, width=160, parent=None):
+        super().__init__(parent)
+        self.recording_path = recording_path
+        self.interval_seconds = interval_seconds
+        self.width = width
+        self.running = True
+
+    def run(self):
+        cap = cv2.VideoCapture(self.recording_path)
+        full_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        if full_frames <= 0:
+            return
+        frame_interval = max(1, int(round(self.interval_seconds * (fps if fps > 0 else 30))))
+
+        # The proxy is much cheaper to decode when there is one
+        source_path = proxy_path_for(self.recording_path)
+        if not os.path.exists(source_path):
+            source_path = self.recording_path
+        cap = cv2.VideoCapture(source_path)
+        source_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if not cap.isOpened() or source_frames <= 0:
+            cap.release()
+            return
+        source_step = frame_interval * source_frames / full_frames
+
+        thumbnails = []
+        next_source_index = 0.0
+        for source_index in range(source_frames):
+            if not self.running:
+                cap.release()
+                return
+            if source_index < int(next_source_index):
+                if not cap.grab():
+                    break
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            height, width = frame.shape[:2]
+            size = proxy_frame_size(width, height, self.width)
+            thumbnail = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            thumbnails.append(cv2.imencode('.jpg', thumbnail, [cv2.IMWRITE_JPEG_QUALITY, 70])[1].tobytes())
+            next_source_index += source_step
+        cap.release()
+
+        strip_path = thumbnail_path_for(self.recording_path)
+        # Another strip thread may be creating the directory at the same time
+        os.makedirs(os.path.dirname(strip_path), exist_ok=True)
+
+        offsets = [THUMBNAIL_HEADER.size + 8 * (len(thumbnails) + 1)]
+        for thumbnail in thumbnails:
+            offsets.append(offsets[-1] + len(thumbnail))
+
+        # Write to a temporary file so readers never see a partial strip
+        temp_path = strip_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(THUMBNAIL_HEADER.pack(THUMBNAIL_MAGIC, len(thumbnails), frame_interval))
+            f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+            for thumbnail in thumbnails:
+                f.write(thumbnail)
+        os.replace(temp_path, strip_path)
+        self.strip_ready.emit(self.recording_path, strip_path)
+
+    def stop(self):
+        self.running = False
+        self.wait()
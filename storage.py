@@ -0,0 +1,914 @@
+# Detection storage for VIPERS
+
+import datetime
+import glob
+import json
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+
+from collections import OrderedDict, namedtuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+import cv2
+import numpy as np
+
+import config
+from detection import EventCoalescer
+
+JOURNAL_MAGIC = b'VDJ2'
+JOURNAL_HEADER = struct.Struct('<4sIQ')  # magic, record size, generation
+# epoch milliseconds, frame index, label code, box relative to the frame
+JOURNAL_RECORD = np.dtype([('time', '<i8'), ('frame', '<u4'), ('label', '<u2'), ('box', '<f4', (4,))])
+
+HISTORY_MAGIC = b'VDH1'
+HISTORY_HEADER = struct.Struct('<4sIQQ')  # magic, version, record count, journal generation folded in
+
+DETECTION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    time_ms INTEGER NOT NULL,
+    camera TEXT,
+    recording TEXT,
+    frame INTEGER,
+    label TEXT,
+    confidence REAL,
+    x REAL, y REAL, w REAL, h REAL
+);
+CREATE INDEX IF NOT EXISTS detections_time ON detections (time_ms);
+CREATE INDEX IF NOT EXISTS detections_label ON detections (label, time_ms);
+CREATE INDEX IF NOT EXISTS detections_recording ON detections (recording, frame);
+CREATE TABLE IF NOT EXISTS detection_day_counts (
+    day TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS detections_count_day AFTER INSERT ON detections BEGIN
+    INSERT INTO detection_day_counts (day, count)
+    VALUES (date(NEW.time_ms / 1000, 'unixepoch', 'localtime'), 1)
+    ON CONFLICT (day) DO UPDATE SET count = count + 1;
+END;
+CREATE TABLE IF NOT EXISTS detection_events (
+    id INTEGER PRIMARY KEY,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    camera TEXT,
+    recording TEXT,
+    start_frame INTEGER,
+    end_frame INTEGER,
+    label TEXT,
+    peak INTEGER,
+    hits INTEGER,
+    best_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS detection_events_time ON detection_events (start_ms);
+CREATE INDEX IF NOT EXISTS detection_events_label ON detection_events (label, start_ms);
+"""
+
+EVENT_INSERT = """
+INSERT INTO detection_events (start_ms, end_ms, camera, recording, start_frame, end_frame, label, peak, hits, best_ms)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# One detection event as listed; best_ms is the frame store key of its best frame
+EventRow = namedtuple('EventRow', 'id start_ms end_ms camera recording start_frame end_frame label peak hits best_ms')
+
+# Day counts for databases written before the summary table existed
+DAY_COUNTS_BACKFILL = """
+INSERT INTO detection_day_counts (day, count)
+SELECT date(time_ms / 1000, 'unixepoch', 'localtime'), COUNT(*) FROM detections GROUP BY 1
+"""
+
+DETECTION_INSERT = """
+INSERT INTO detections (time_ms, camera, recording, frame, label, confidence, x, y, w, h)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_COMPACT = object()
+_FLUSH = object()
+_STOP = object()
+_EVENT = object()
+
+
+def day_bounds_ms(date):
+    """Epoch milliseconds of local midnight at the start and end of a date"""
+    start = datetime.datetime.combine(date, datetime.time())
+    return epoch_ms(start), epoch_ms(start + datetime.timedelta(days=1))
+
+
+def journal_path_for(data_file):
+    """Location of the journal that replaces a legacy JSON detection file"""
+    return os.path.splitext(data_file)[0] + ".journal"
+
+
+def history_path_for(journal_path, generation):
+    """Columnar snapshot holding everything up to a journal generation"""
+    return f"{os.path.splitext(journal_path)[0]}-{generation}.history"
+
+
+def history_snapshots(journal_path):
+    """Existing snapshots for a journal as (generation, path), newest first"""
+    prefix = os.path.basename(os.path.splitext(journal_path)[0]) + "-"
+    directory = os.path.dirname(journal_path) or "."
+    snapshots = []
+    for name in os.listdir(directory):
+        generation = name[len(prefix):-len(".history")]
+        if name.startswith(prefix) and name.endswith(".history") and generation.isdigit():
+            snapshots.append((int(generation), os.path.join(directory, name)))
+    return sorted(snapshots, reverse=True)
+
+
+def epoch_ms(timestamp):
+    return int(timestamp.timestamp() * 1000)
+
+
+def event_row(event, event_id=None):
+    """EventRow of a DetectionEvent; an open event has no end yet"""
+    return EventRow(event_id, epoch_ms(event.start), epoch_ms(event.end) if event.ended else None,
+                    event.camera, event.recording, event.start_frame, event.end_frame, event.label,
+                    event.peak_count, event.hits, event.best_key)
+
+
+def label_code(label):
+    """Stable small integer for a detection label; 0 for anything unknown"""
+    try:
+        return config.DETECTION_LABELS.index(label)
+    except ValueError:
+        return 0
+
+
+def detection_records(timestamp, frame_index, labels, relative_boxes):
+    """One journal record per detected object"""
+    records = np.zeros(len(labels), dtype=JOURNAL_RECORD)
+    records['time'] = epoch_ms(timestamp)
+    records['frame'] = frame_index
+    records['label'] = [label_code(label) for label in labels]
+    if len(labels):
+        records['box'] = relative_boxes
+    return records
+
+
+def read_journal(path):
+    """Return (records, generation, intact); a torn final record is ignored"""
+    if not os.path.exists(path):
+        return np.empty(0, dtype=JOURNAL_RECORD), 0, False
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(JOURNAL_HEADER.size)
+        if len(header) < JOURNAL_HEADER.size:
+            return np.empty(0, dtype=JOURNAL_RECORD), 0, False
+        magic, record_size, generation = JOURNAL_HEADER.unpack(header)
+        if magic != JOURNAL_MAGIC or record_size != JOURNAL_RECORD.itemsize:
+            raise ValueError(f"Not a detection journal: {path}")
+        count = (size - JOURNAL_HEADER.size) // record_size
+        records = np.fromfile(f, dtype=JOURNAL_RECORD, count=count)
+        return records, generation, size == JOURNAL_HEADER.size + count * record_size
+
+
+def write_journal(path, records, generation=1):
+    """Atomically replace a journal with the given records"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_RECORD.itemsize, generation))
+        f.write(np.ascontiguousarray(records, dtype=JOURNAL_RECORD).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def import_legacy_detections(data_file):
+    """Records from the old detections.json format"""
+    with open(data_file, 'r') as f:
+        data = json.load(f)
+    timestamps = data.get('timestamps', [])
+    frames = data.get('frame_indices', [])
+    records = np.zeros(min(len(timestamps), len(frames)), dtype=JOURNAL_RECORD)
+    records['time'] = [epoch_ms(datetime.datetime.fromisoformat(ts)) for ts in timestamps[:len(records)]]
+    records['frame'] = frames[:len(records)]
+    return records
+
+
+def history_offsets(count):
+    """Byte offsets of the time, frame, label and box columns in a snapshot"""
+    offsets = []
+    position = HISTORY_HEADER.size
+    for itemsize in (8, 4, 2, 16):
+        offsets.append(position)
+        position += -(-count * itemsize // 8) * 8  # keep every column 8-byte aligned
+    return offsets, position
+
+
+# Detection history as growable typed columns, about 30 bytes per detection
+#
+# Columns loaded from a snapshot are read-only memory maps; the first append
+# copies them into growable arrays.
+class DetectionHistory:
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._frames = np.empty(capacity, dtype=np.uint32)
+        self._labels = np.empty(capacity, dtype=np.uint16)
+        self._boxes = np.empty((capacity, 4), dtype=np.float32)
+        self._sorted_frames = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def times(self):
+        """Epoch milliseconds, in the order detections happened"""
+        return self._times[:self.count]
+
+    @property
+    def frames(self):
+        return self._frames[:self.count]
+
+    @property
+    def labels(self):
+        return self._labels[:self.count]
+
+    @property
+    def boxes(self):
+        return self._boxes[:self.count]
+
+    def reserve(self, needed):
+        capacity = len(self._times)
+        if needed <= capacity and self._times.flags.writeable:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        for name in ('_times', '_frames', '_labels', '_boxes'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def extend(self, records):
+        """Append journal records"""
+        n = len(records)
+        if not n:
+            return
+        self.reserve(self.count + n)
+        end = self.count + n
+        self._times[self.count:end] = records['time']
+        self._frames[self.count:end] = records['frame']
+        self._labels[self.count:end] = records['label']
+        self._boxes[self.count:end] = records['box']
+        self.count = end
+        self._sorted_frames = None
+
+    def trim(self, keep_last):
+        """Drop all but the newest keep_last detections"""
+        if self.count > keep_last:
+            start = self.count - keep_last
+            for name in ('_times', '_frames', '_labels', '_boxes'):
+                setattr(self, name, getattr(self, name)[start:self.count].copy())
+            self.count = keep_last
+            self._sorted_frames = None
+
+    def records(self):
+        records = np.empty(self.count, dtype=JOURNAL_RECORD)
+        records['time'] = self.times
+        records['frame'] = self.frames
+        records['label'] = self.labels
+        records['box'] = self.boxes
+        return records
+
+    def range(self, start_ms, end_ms):
+        """Slice of the detections with start_ms <= time < end_ms"""
+        times = self.times
+        return slice(int(np.searchsorted(times, start_ms, 'left')), int(np.searchsorted(times, end_ms, 'left')))
+
+    def sorted_frames(self):
+        if self._sorted_frames is None:
+            self._sorted_frames = np.sort(self.frames)
+        return self._sorted_frames
+
+    def contains_frame(self, frame):
+        frames = self.sorted_frames()
+        if frame < 0:
+            return False
+        # Search with the column's own type; a Python int would cast the whole column
+        index = np.searchsorted(frames, np.uint32(frame))
+        return bool(index < len(frames) and frames[index] == frame)
+
+    def next_frame_after(self, frame):
+        """First detection frame after frame, or None"""
+        frames = self.sorted_frames()
+        index = np.searchsorted(frames, np.uint32(frame), 'right') if frame >= 0 else 0
+        return int(frames[index]) if index < len(frames) else None
+
+    def timestamp(self, index):
+        return datetime.datetime.fromtimestamp(self._times[index] / 1000)
+
+    def save(self, path, generation):
+        """Write a columnar snapshot atomically"""
+        offsets, size = history_offsets(self.count)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, 1, self.count, generation))
+            for offset, column in zip(offsets, (self.times, self.frames, self.labels, self.boxes)):
+                f.seek(offset)
+                f.write(np.ascontiguousarray(column).tobytes())
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a snapshot; returns (history, journal generation)"""
+        with open(path, 'rb') as f:
+            magic, version, count, generation = HISTORY_HEADER.unpack(f.read(HISTORY_HEADER.size))
+        if magic != HISTORY_MAGIC or version != 1:
+            raise ValueError(f"Not a detection history: {path}")
+
+        history = cls(capacity=0)
+        history.count = count
+        if count:
+            offsets, _ = history_offsets(count)
+            history._times = np.memmap(path, np.int64, 'r', offsets[0], (count,))
+            history._frames = np.memmap(path, np.uint32, 'r', offsets[1], (count,))
+            history._labels = np.memmap(path, np.uint16, 'r', offsets[2], (count,))
+            history._boxes = np.memmap(path, np.float32, 'r', offsets[3], (count, 4))
+        return history, generation
+
+
+# Append-only detection journal written by a background thread
+#
+# Appends are queued and written in batches; each batch is flushed and
+# fsynced once. Compaction folds the journal into a new columnar snapshot
+# (keeping the newest max_records) and starts the next journal generation.
+# It runs on the same thread so the UI never waits on a rewrite.
+class DetectionJournal(QThread):
+    compacted = pyqtSignal(int)  # records kept
+
+    def __init__(self, path, flush_interval=1.0, batch_size=256, max_records=1000000,
+                 compact_records=100000, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_records = max_records
+        self.compact_records = compact_records
+        self.queue = queue.Queue()
+        self.generation = 1
+        self.journal_count = 0
+        self.batches_written = 0
+        self.file = None
+
+    def load_snapshot(self):
+        snapshots = history_snapshots(self.path)
+        if not snapshots:
+            return DetectionHistory(), 0
+        return DetectionHistory.load(snapshots[0][1])
+
+    def replay(self):
+        """Snapshot plus journal as a DetectionHistory; call before start()"""
+        history, snapshot_generation = self.load_snapshot()
+        records, generation, intact = read_journal(self.path)
+
+        # A journal no newer than the snapshot was already folded into it
+        if generation <= snapshot_generation:
+            records = np.empty(0, dtype=JOURNAL_RECORD)
+            generation, intact = snapshot_generation + 1, False
+        history.extend(records)
+
+        # Drop a torn tail left by a crash before appending after it
+        if not intact:
+            write_journal(self.path, records, generation)
+        self.generation = generation
+        self.journal_count = len(records)
+        return history
+
+    def append(self, records):
+        """Queue detection records; safe to call from any thread"""
+        self.queue.put(records)
+
+    def flush(self):
+        self.queue.put(_FLUSH)
+
+    def compact(self, max_records=None):
+        """Fold the journal into the snapshot, keeping the newest max_records (self.max_records by default)"""
+        self.queue.put((_COMPACT, max_records or self.max_records))
+
+    def run(self):
+        if not os.path.exists(self.path):
+            write_journal(self.path, np.empty(0, dtype=JOURNAL_RECORD), self.generation)
+        self.file = open(self.path, 'ab')
+        pending = []
+        last_write = time.monotonic()
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                break
+            compacting = isinstance(item, tuple) and item[0] is _COMPACT
+            if item is _FLUSH or compacting:
+                self.write_batch(pending)
+                last_write = time.monotonic()
+                if compacting:
+                    self.compact_file(item[1])
+                continue
+            if item is not None:
+                pending.append(item)
+
+            if sum(len(records) for records in pending) >= self.batch_size or \
+                    (pending and time.monotonic() - last_write >= self.flush_interval):
+                self.write_batch(pending)
+                last_write = time.monotonic()
+
+                # Fold a long journal into the snapshot so startup stays a memory map
+                if self.journal_count >= self.compact_records:
+                    self.compact_file()
+
+        self.write_batch(pending)
+        self.file.close()
+        self.file = None
+
+    def write_batch(self, pending):
+        if not pending:
+            return
+        records = np.concatenate(pending)
+        self.file.write(records.tobytes())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.journal_count += len(records)
+        self.batches_written += 1
+        pending.clear()
+
+    def compact_file(self, max_records=None):
+        self.file.close()
+        history, _ = self.load_snapshot()
+        history.extend(read_journal(self.path)[0])
+        history.trim(max_records or self.max_records)
+        history.save(history_path_for(self.path, self.generation), self.generation)
+        kept = len(history)
+        del history
+
+        # The snapshot now covers this generation; a crash from here on
+        # leaves a stale journal, which replay ignores
+        self.generation += 1
+        write_journal(self.path, np.empty(0, dtype=JOURNAL_RECORD), self.generation)
+        self.file = open(self.path, 'ab')
+        self.journal_count = 0
+
+        # Older snapshots may still be mapped elsewhere; retry next time
+        for generation, path in history_snapshots(self.path)[1:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.compacted.emit(kept)
+
+    def close(self):
+        """Write everything queued and stop the writer"""
+        if self.isRunning():
+            self.queue.put(_STOP)
+            self.wait()
+
+
+# SQLite store of every detection, written in batches by a background thread
+#
+# The database runs in WAL mode, so the UI thread's own connection can
+# query while the writer commits.
+class DetectionStore(QThread):
+    events_backfilled = pyqtSignal(int)  # events derived from older detections
+    events_committed = pyqtSignal(list)  # (start_ms, camera, label) of events just written
+
+    def __init__(self, path, flush_interval=0.5, batch_size=500, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.backfill_events = False
+        self.db = self.connect()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        backfill = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'detection_day_counts'").fetchone() is None
+        if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'detection_events'").fetchone() is None:
+            # Coalescing the whole history is slow, so the writer thread does it
+            self.backfill_events = True
+        db.executescript(DETECTION_SCHEMA)
+        if backfill:
+            with db:
+                db.execute(DAY_COUNTS_BACKFILL)
+        return db
+
+    def add_event(self, timestamp, camera, recording, frame, detected_objects, relative_boxes):
+        """Queue one row per detected object; safe to call from any thread"""
+        time_ms = epoch_ms(timestamp)
+        rows = [(time_ms, camera, recording, frame, obj['label'], float(obj.get('confidence', 1.0)),
+                 float(x), float(y), float(w), float(h))
+                for obj, (x, y, w, h) in zip(detected_objects, relative_boxes)]
+        self.queue.put(rows)
+
+    def add_detection_event(self, event):
+        """Queue a finished DetectionEvent for the events table"""
+        self.queue.put((_EVENT, event_row(event)[1:]))
+
+    def import_history(self, history):
+        """Backfill detections known only from the journal; call before start()"""
+        labels = [None] + config.DETECTION_LABELS[1:]
+        rows = ((time_ms, frame, labels[code], *box)
+                for time_ms, frame, code, box in zip(history.times.tolist(), history.frames.tolist(),
+                                                     history.labels.tolist(), history.boxes.tolist()))
+        with self.db:
+            self.db.executemany("INSERT INTO detections (time_ms, frame, label, x, y, w, h) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def wait_for_writes(self, timeout=5.0):
+        """Block until everything queued so far is committed; False if the timeout ran out first"""
+        if not self.isRunning():
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def is_empty(self):
+        return self.db.execute("SELECT 1 FROM detections LIMIT 1").fetchone() is None
+
+    def run(self):
+        db = self.connect()
+        if self.backfill_events:
+            self.events_backfilled.emit(self.derive_events(db))
+            self.backfill_events = False
+        pending = []
+        pending_events = []
+        last_write = time.monotonic()
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if isinstance(item, threading.Event):
+                waiter, item = item, None
+            else:
+                waiter = None
+            if isinstance(item, tuple) and item[0] is _EVENT:
+                pending_events.append(item[1])
+            elif item is not None:
+                pending.extend(item)
+
+            if waiter is not None or len(pending) >= self.batch_size or \
+                    ((pending or pending_events) and time.monotonic() - last_write >= self.flush_interval):
+                self.write_batch(db, pending, pending_events)
+                last_write = time.monotonic()
+            if waiter is not None:
+                waiter.set()
+
+        self.write_batch(db, pending, pending_events)
+        db.close()
+
+    def write_batch(self, db, pending, pending_events):
+        with db:
+            db.executemany(DETECTION_INSERT, pending)
+            db.executemany(EVENT_INSERT, pending_events)
+        if pending_events:
+            self.events_committed.emit([(row[0], row[2], row[6]) for row in pending_events])
+        pending.clear()
+        pending_events.clear()
+
+    def derive_events(self, db):
+        """Coalesce stored detections into events once, for databases older than the events table"""
+        rows = []
+        coalescer = EventCoalescer(config.EVENT_GAP_SECONDS, config.EVENT_MAX_SECONDS)
+        coalescer.add_sink(lambda state, event: rows.append(event_row(event)[1:]) if state == "ended" else None)
+
+        # Rows of one detector run share their time; feed each run whole
+        group_time, objects, source = None, [], None
+        cursor = db.execute("SELECT time_ms, camera, recording, frame, label, confidence "
+                            "FROM detections ORDER BY time_ms")
+        for time_ms, camera, recording, frame, label, confidence in cursor:
+            if time_ms != group_time and objects:
+                coalescer.update(datetime.datetime.fromtimestamp(group_time / 1000), source[2], group_time,
+                                 objects, camera=source[0], recording=source[1])
+                objects = []
+            group_time, source = time_ms, (camera, recording, frame)
+            objects.append({'label': label or "Object", 'confidence': confidence or 1.0})
+        if objects:
+            coalescer.update(datetime.datetime.fromtimestamp(group_time / 1000), source[2], group_time,
+                             objects, camera=source[0], recording=source[1])
+        coalescer.flush()
+
+        with db:
+            db.executemany(EVENT_INSERT, rows)
+        return len(rows)
+
+    def detection_days(self):
+        """Dates with at least one detection"""
+        return sorted(self.detection_day_counts())
+
+    def detection_day_counts(self):
+        """Detections per local date, read from the summary the insert trigger keeps"""
+        return {datetime.date.fromisoformat(day): count
+                for day, count in self.db.execute("SELECT day, count FROM detection_day_counts")}
+
+    def detections_on(self, date, label=None, limit=None):
+        """Rows of one local date in time order: time_ms, camera, recording, frame, label, confidence"""
+        start, end = day_bounds_ms(date)
+        return self.detections_between(start, end, label, limit)
+
+    def detections_between(self, start_ms, end_ms, label=None, limit=None):
+        sql = ("SELECT time_ms, camera, recording, frame, label, confidence FROM detections "
+               "WHERE time_ms >= ? AND time_ms < ?")
+        params = [start_ms, end_ms]
+        if label is not None:
+            sql += " AND label = ?"
+            params.append(label)
+        sql += " ORDER BY time_ms"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def detection_events(self, before=None, label=None, start_ms=None, end_ms=None, limit=500):
+        """A page of EventRows newest first; before is the (start_ms, id) of the last row already shown"""
+        conditions, params = [], []
+        if before is not None:
+            conditions.append("(start_ms, id) < (?, ?)")
+            params.extend(before)
+        if label is not None:
+            conditions.append("label = ?")
+            params.append(label)
+        if start_ms is not None:
+            conditions.append("start_ms >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            conditions.append("start_ms < ?")
+            params.append(end_ms)
+        sql = f"SELECT {', '.join(EventRow._fields)} FROM detection_events"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY start_ms DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [EventRow(*row) for row in self.db.execute(sql, params)]
+
+    def iter_detections(self):
+        """Every row in time order, streamed from the time index"""
+        return self.db.execute(
+            "SELECT time_ms, camera, recording, frame, label, confidence, x, y, w, h "
+            "FROM detections ORDER BY time_ms")
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+
+    def close(self):
+        """Commit everything queued and stop the writer"""
+        if self.isRunning():
+            self.queue.put(_STOP)
+            self.wait()
+        self.db.close()
+
+
+# JSON export of the detection store, written row by row on its own thread
+#
+# It reads through its own connection, so the export is one consistent
+# snapshot while the writer keeps committing.
+class DetectionExportThread(QThread):
+    export_finished = pyqtSignal(str, int)  # file path, detections written
+
+    def __init__(self, db_path, file_path, session_start=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.file_path = file_path
+        self.session_start = session_start
+
+    def run(self):
+        db = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            db.execute("BEGIN")
+            count = db.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+            rows = db.execute(
+                "SELECT time_ms, camera, recording, frame, label, confidence, x, y, w, h "
+                "FROM detections ORDER BY time_ms")
+            with open(self.file_path, 'w') as f:
+                f.write('{\n    "session_start": %s,\n    "detection_count": %d,\n    "detections": ['
+                        % (json.dumps(self.session_start), count))
+                separator = "\n"
+                for time_ms, camera, recording, frame, label, confidence, x, y, w, h in rows:
+                    detection = json.dumps({
+                        "timestamp": datetime.datetime.fromtimestamp(time_ms / 1000).isoformat(),
+                        "camera": camera,
+                        "recording": recording,
+                        "frame_index": frame,
+                        "label": label,
+                        "confidence": confidence,
+                        "box": [x, y, w, h] if x is not None else None
+                    }, indent=4)
+                    f.write(separator + "        " + detection.replace("\n", "\n        "))
+                    separator = ",\n"
+                f.write("\n    ]\n}\n")
+        finally:
+            db.close()
+        self.export_finished.emit(self.file_path, count)
+
+
+# JPEG store of the frames detections were found on, keyed by event time in ms
+#
+# Recent frames are kept compressed in memory under a byte budget; the least
+# recently used spill to one file each in a directory, which is itself bounded
+# by size and age. Frames are encoded on this thread, never the caller's.
+class DetectedFrameStore(QThread):
+    def __init__(self, directory, memory_bytes, disk_bytes, max_age_seconds=None, quality=85,
+                 max_pending=32, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.max_age_seconds = max_age_seconds
+        self.quality = quality
+        self.max_pending = max_pending
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.memory = OrderedDict()
+        self.memory_used = 0
+        self.disk = OrderedDict()
+        self.disk_used = 0
+        self.dropped = 0
+        self.last_expiry = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self.index_directory()
+
+    def index_directory(self):
+        """Pick up frames spilled by earlier sessions, oldest first"""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.jpg")):
+            try:
+                entries.append((int(os.path.splitext(os.path.basename(path))[0]), os.path.getsize(path)))
+            except (ValueError, OSError):
+                continue
+        with self.lock:
+            for key, size in sorted(entries):
+                self.disk[key] = size
+                self.disk_used += size
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.jpg")
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.pending or key in self.memory or key in self.disk
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pending) + len(self.memory) + len(self.disk)
+
+    def put(self, key, frame):
+        """Queue a frame for encoding; the array must not be modified afterwards"""
+        with self.lock:
+            # An encoder that falls behind must not pile up raw frames
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self.pending[key] = frame
+        self.queue.put(key)
+        return True
+
+    def jpeg(self, key):
+        """Encoded bytes of a frame, or None once evicted or still queued"""
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                return data
+            if key not in self.disk:
+                return None
+            self.disk.move_to_end(key)
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def frame(self, key, reduce=1):
+        """Decoded frame, optionally reduced by 2, 4 or 8 while decoding"""
+        with self.lock:
+            frame = self.pending.get(key)
+        if frame is not None:
+            return frame if reduce == 1 else frame[::reduce, ::reduce]
+        data = self.jpeg(key)
+        if data is None:
+            return None
+        flags = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}[reduce]
+        return cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+
+    def thumbnail(self, key, width):
+        """Small copy of a frame for lists, decoded at reduced size"""
+        frame = self.frame(key, reduce=4)
+        if frame is None:
+            return None
+        height = max(1, int(round(frame.shape[0] * width / frame.shape[1])))
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    def run(self):
+        while True:
+            try:
+                key = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                key = None
+            if key is _STOP:
+                break
+            if key is not None:
+                self.encode(key)
+            self.expire()
+        self.spill(0)
+
+    def encode(self, key):
+        with self.lock:
+            frame = self.pending.get(key)
+        if frame is None:
+            return
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        with self.lock:
+            del self.pending[key]
+            if ok:
+                # A new frame under an existing key replaces the old copy wherever it is
+                self.memory_used -= len(self.memory.pop(key, b''))
+                self.memory[key] = buffer.tobytes()
+                self.memory_used += buffer.nbytes
+                replaced = self.disk.pop(key, None)
+                if replaced is not None:
+                    self.disk_used -= replaced
+        if ok and replaced is not None:
+            self.remove_file(key)
+        self.spill(self.memory_bytes)
+
+    def spill(self, budget):
+        """Move the least recently used frames to disk until memory fits the budget"""
+        while True:
+            # Write before unlinking from memory, so readers never miss the frame
+            with self.lock:
+                if self.memory_used <= budget or not self.memory:
+                    break
+                key, data = next(iter(self.memory.items()))
+            try:
+                with open(self.path_for(key), 'wb') as f:
+                    f.write(data)
+                spilled = True
+            except OSError:
+                spilled = False
+            with self.lock:
+                self.memory.pop(key, None)
+                self.memory_used -= len(data)
+                if spilled:
+                    self.disk[key] = len(data)
+                    self.disk_used += len(data)
+        self.trim_disk()
+
+    def trim_disk(self):
+        while True:
+            with self.lock:
+                if self.disk_used <= self.disk_bytes or not self.disk:
+                    break
+                key, size = self.disk.popitem(last=False)
+                self.disk_used -= size
+            self.remove_file(key)
+
+    def expire(self):
+        """Drop frames older than the age limit; checked about once a minute"""
+        now = time.time()
+        if not self.max_age_seconds or now - self.last_expiry < 60:
+            return
+        self.last_expiry = now
+        cutoff = int((now - self.max_age_seconds) * 1000)
+        with self.lock:
+            for key in [key for key in self.memory if key < cutoff]:
+                self.memory_used -= len(self.memory.pop(key))
+            expired = [key for key in self.disk if key < cutoff]
+            for key in expired:
+                self.disk_used -= self.disk.pop(key)
+        for key in expired:
+            self.remove_file(key)
+
+    def remove_file(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def stats(self):
+        with self.lock:
+            return {'pending': len(self.pending), 'memory_frames': len(self.memory),
+                    'memory_bytes': self.memory_used, 'disk_frames': len(self.disk),
+                    'disk_bytes': self.disk_used, 'dropped': self.dropped}
+
+    def close(self):
+        """Encode what is queued and spill memory to disk, so frames outlive the session"""
+        if self.isRunning():
+            self.queue.put(_STOP)
+            self.wait()
@@ -5,8 +5,55 @@ Test script to verify VIPERS improvements
 
 import sys
 import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import config
+import contextlib
+import datetime
+import gzip
+import io
+import json
+import sqlite3
+import numpy as np
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QApplication
-from ui_component import VIPERS_UI
+from ui_component import DetectionCalendar, DetectionEventModel, DetectionSlider, LogModel, MosaicView, VideoFrame, VIPERS_UI
+from capture import CaptureManager, CaptureSource, NetworkStreamSource, negotiate_camera_mode
+from framebus import FrameBus, SharedFrame
+from logindex import LogIndex
+from logsink import LogSink, format_log_line, parse_log_line, rotate_log
+from storage import (DetectedFrameStore, DetectionExportThread, DetectionJournal, DetectionStore,
+    detection_records, epoch_ms, import_legacy_detections)
+from detection import ActivityMonitor, EventCoalescer, LatencyGovernor, MotionSensor
+from playback import (THUMBNAIL_HEADER, THUMBNAIL_MAGIC, FrameCache, FramePrefetchThread, ThumbnailStrip,
+    ThumbnailStripThread, playback_target, proxy_frame_size, proxy_path_for, thumbnail_path_for)
+
+def write_test_video(path, frames=30, size=(160, 120), fps=30):
+    """Write a small MJPG clip to stand in for a camera"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    for i in range(frames):
+        frame = np.full((size[1], size[0], 3), i * 8 % 256, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+@contextlib.contextmanager
+def scratch_ui():
+    """A VIPERS window whose database, journal and logs go to a temporary directory"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        ui = VIPERS_UI()
+        try:
+            yield ui
+        finally:
+            ui.close()
+            app.processEvents()
+            os.chdir(cwd)
 
 def test_improvements():
     """Test the improved VIPERS system"""
@@ -62,5 +109,1123 @@ def test_improvements():
     
     return app.exec_()
 
+def test_playback_target():
+    """Fast playback skips speed - 1 frames a tick and stops short of detections"""
+    assert playback_target(100, 1, 1000) == 100
+    assert playback_target(100, 4, 1000) == 103
+    assert playback_target(100, 32, 1000) == 131
+    assert playback_target(990, 32, 1000) == 999  # Never past the last frame
+    
+    # A detection within slowdown_ticks ticks drops back to 1x; a farther one doesn't
+    assert playback_target(100, 8, 1000, next_detection=116, slowdown_ticks=2) is None
+    assert playback_target(100, 8, 1000, next_detection=117, slowdown_ticks=2) == 107
+    assert playback_target(100, 1, 1000, next_detection=101) == 100
+    print("✓ Fast playback skips frames and slows before detections")
+
+def test_frame_cache():
+    """The frame cache evicts least recently used frames past its byte cap"""
+    frame_bytes = 120 * 160 * 3
+    cache = FrameCache(frame_bytes * 3)
+    for i in range(3):
+        cache.put(i, np.full((120, 160, 3), i, dtype=np.uint8))
+    assert cache.get(0)[0, 0, 0] == 0  # 0 is now the most recently used
+    cache.put(3, np.zeros((120, 160, 3), dtype=np.uint8))
+    assert 1 not in cache and all(i in cache for i in (0, 2, 3))
+    assert cache.get(1) is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'frames': 3,
+                             'bytes': frame_bytes * 3, 'max_bytes': frame_bytes * 3}
+    
+    # Cached frames are shared with the display path, so they are read-only
+    try:
+        cache.get(0)[0, 0, 0] = 1
+        assert False, "cached frame was writable"
+    except ValueError:
+        pass
+    
+    # Replacing a frame doesn't count it twice; one over the whole cap is refused
+    cache.put(3, np.ones((120, 160, 3), dtype=np.uint8))
+    cache.put(4, np.zeros((1000, 1000, 3), dtype=np.uint8))
+    assert len(cache) == 3 and cache.current_bytes == frame_bytes * 3 and 4 not in cache
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['hits'] == 0
+    print("✓ Frame cache keeps recent frames under its byte cap")
+
+def test_frame_prefetch():
+    """The prefetch window shrinks to fit the cache and isn't refilled for small moves"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recording.avi")
+        write_test_video(path, frames=200)
+        cache = FrameCache(120 * 160 * 3 * 25)  # Room for 25 frames
+        prefetch = FramePrefetchThread(path, cache, behind=60, ahead=10)
+        prefetch.start()
+        
+        def wait_for_fill(window):
+            deadline = time.time() + 10
+            while prefetch.filled != window and time.time() < deadline:
+                time.sleep(0.01)
+            assert prefetch.filled == window, prefetch.filled
+        
+        # Ahead is kept and behind gets what is left of the 25 frames
+        prefetch.request(100)
+        wait_for_fill((86, 110))
+        assert (prefetch.ahead, prefetch.behind) == (10, 14)
+        assert len(cache) == 25 and all(i in cache for i in range(86, 111))
+        
+        # Still well inside the window: nothing to do
+        assert not prefetch.needs_fill(104) and prefetch.needs_fill(106) and prefetch.needs_fill(85)
+        prefetch.request(150)
+        wait_for_fill((136, 160))
+        assert len(cache) == 25 and 100 not in cache
+        prefetch.stop()
+    print("✓ Frame prefetch fits its window to the cache")
+
+def test_proxy_layout():
+    """Proxies sit beside their recording, scaled down with even dimensions"""
+    assert proxy_path_for(os.path.join("recordings", "rec.avi")) == os.path.join("recordings", "proxies", "rec.avi")
+    assert proxy_frame_size(1920, 1080, 320) == (320, 180)
+    assert proxy_frame_size(1280, 721, 320) == (320, 180)
+    assert proxy_frame_size(1000, 563, 321) == (320, 180)
+    assert proxy_frame_size(320, 240, 640) == (320, 240)  # Never scaled up
+    assert proxy_frame_size(4000, 2, 320) == (320, 2)
+    print("✓ Proxy paths and sizes")
+
+def test_thumbnail_strip():
+    """A recording's thumbnails are packed into one file and looked up by frame"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recording.avi")
+        write_test_video(path, frames=90, fps=30)
+        
+        # Generated in the calling thread here; one thumbnail per second
+        ThumbnailStripThread(path, interval_seconds=1, width=80).run()
+        strip_path = thumbnail_path_for(path)
+        assert strip_path == os.path.join(tmp, "thumbnails", "recording.thumbs")
+        with open(strip_path, 'rb') as f:
+            assert THUMBNAIL_HEADER.unpack(f.read(THUMBNAIL_HEADER.size)) == (THUMBNAIL_MAGIC, 3, 30)
+        
+        strip = ThumbnailStrip(strip_path)
+        assert len(strip) == 3 and strip.offsets[0] == THUMBNAIL_HEADER.size + 8 * 4
+        assert strip.offsets[-1] == os.path.getsize(strip_path)
+        
+        # Each thumbnail covers frame_interval frames, starting from its first one
+        for frame_index, brightness in ((0, 0), (29, 0), (30, 240), (89, 224)):
+            image = cv2.imdecode(np.frombuffer(strip.thumbnail_for_frame(frame_index), np.uint8),
+                                 cv2.IMREAD_COLOR)
+            assert image.shape == (60, 80, 3) and abs(int(image.mean()) - brightness) <= 4
+        assert strip.thumbnail_for_frame(90) is None and strip.thumbnail_for_frame(-1) is None
+        strip.close()
+        
+        # Anything else is refused
+        with open(strip_path, 'r+b') as f:
+            f.write(b'XXXX')
+        try:
+            ThumbnailStrip(strip_path)
+            assert False, "accepted a file without the strip header"
+        except ValueError:
+            pass
+    print("✓ Thumbnail strips are packed and looked up by frame")
+
+def test_detection_heat_strip():
+    """Slider markers are bucketed into pixel columns and cached until they change"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    slider = DetectionSlider(Qt.Horizontal)
+    slider.resize(100, 20)
+    slider.setMaximum(1000)
+    points = [0, 500, 500, 500, 505, 990]
+    slider.set_detection_points(points)
+    image = slider.detection_marker_image()
+    assert image.width() == 100 and image.height() == 1
+    
+    # Busy columns are more opaque; single hits spread to their neighbours
+    alpha = slider._marker_buffer[0, :, 3]
+    assert alpha[50] == 255 and 110 <= alpha[0] < alpha[50]
+    assert alpha[49] > 0 and alpha[51] > 0 and alpha[98] > 0 and alpha[25] == 0
+    
+    # Cached until the points, the width or the maximum change
+    assert slider.detection_marker_image() is image
+    points.append(250)
+    appended = slider.detection_marker_image()
+    assert appended is not image and slider._marker_buffer[0, 25, 3] > 0
+    slider.resize(200, 20)
+    assert slider.detection_marker_image().width() == 200 and slider._marker_buffer[0, 198, 3] > 0
+    slider.setMaximum(2000)
+    slider.detection_marker_image()
+    assert slider._marker_buffer[0, 198, 3] == 0 and slider._marker_buffer[0, 99, 3] > 0
+    print("✓ Detection markers render as a cached heat strip")
+
+def test_display_buffer():
+    """Frames are resized into one reused display buffer until the display size changes"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    view = VideoFrame()
+    view.resize(640, 480)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    frame[:, :, 2] = 200
+    view.set_frame(frame)
+    buffer, image = view.display_buffer, view.display_image
+    assert buffer.shape == (480, 640, 3) and image.width() == 640
+    assert buffer.ctypes.data == int(image.constBits())  # The image wraps the buffer, no copy
+    
+    # Same display size: the buffer is written in place
+    frame[:, :, 2] = 50
+    view.set_frame(frame)
+    assert view.display_buffer is buffer and view.display_image is image
+    assert 50 in (int(buffer[..., 2].mean()), int(buffer[..., 0].mean()))  # BGR, or RGB before Qt 5.14
+    
+    # A wider frame is letterboxed into a new buffer
+    view.set_frame(np.zeros((100, 400, 3), dtype=np.uint8))
+    assert view.display_buffer is not buffer and view.display_buffer.shape == (160, 640, 3)
+    assert (view.image_rect.x(), view.image_rect.y()) == (0, 160)
+    
+    # So is a resize of the view (a hidden widget gets no resize event, so redraw by hand)
+    wide = view.display_buffer
+    view.resize(800, 480)
+    view.set_frame(view.current_frame)
+    assert view.display_buffer is not wide and view.display_buffer.shape == (200, 800, 3)
+    
+    # A message replaces the video
+    view.setText("No Video Feed")
+    assert view.display_image is None and view.frame_image() is None
+    print("✓ Display buffer is reused until the size changes")
+
+def test_render_gating():
+    """Live frames reach only the visible views, at the display rate"""
+    with scratch_ui() as ui:
+        ui.show()
+        ui.video_tabs.setCurrentWidget(ui.video_frame)
+        ui.display_fps_spinbox.setValue(10)
+        for subscription in ui.frame_bus.subscriptions:
+            subscription.enabled = subscription is ui.display_subscription
+        
+        # Two seconds of a 30 fps camera
+        for i in range(60):
+            ui.frame_bus.publish(np.full((120, 160, 3), i, dtype=np.uint8), now=100.0 + i / 30)
+        assert ui.display_subscription.delivered == 20
+        assert ui.video_frame.current_frame[0, 0, 0] == 57
+        assert ui.detection_view_frame.current_frame is None
+        
+        # A view skipped while hidden catches up when its tab is shown
+        ui.video_tabs.setCurrentWidget(ui.detection_view_frame)
+        assert ui.detection_view_frame.current_frame[0, 0, 0] == 57
+        ui.frame_bus.publish(np.full((120, 160, 3), 99, dtype=np.uint8), now=103.0)
+        assert ui.detection_view_frame.current_frame[0, 0, 0] == 99
+        assert ui.video_frame.current_frame[0, 0, 0] == 57
+    print("✓ Rendering skips hidden views and keeps to the display rate")
+
+def test_overlay_cache():
+    """The grid and REC overlay is cached; boxes are burned into recorded frames only"""
+    with scratch_ui() as ui:
+        view = ui.video_frame
+        view.resize(640, 480)
+        view.recording = False
+        overlay = view.overlay()
+        assert view.overlay() is overlay
+        assert QColor(overlay.toImage().pixel(20, 20)).red() == 0
+        view.recording = True
+        recording = view.overlay()
+        assert recording is not overlay and QColor(recording.toImage().pixel(20, 20)).red() == 255
+        view.resize(800, 600)
+        assert view.overlay() is not recording and view.overlay().width() == 800
+        
+        # A fake detector and recorder around the live pipeline
+        box = {'label': 'Drone', 'box': (40, 40, 30, 30), 'confidence': 0.9}
+        ui.detect_objects = lambda frame, detection_type: ([dict(box)], None)
+        written = []
+        class Recorder:
+            def write(self, frame):
+                written.append(frame)
+        ui.recording = Recorder()
+        ui.recorded_frame_count = 0
+        
+        # Not recording: the shared frame is untouched and boxes travel as metadata
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        ui.process_live_frame(SharedFrame(frame, 1, time.monotonic()))
+        assert not written and not frame.any()
+        assert ui._live_detections[1] == ['Drone']
+        
+        # Recording: the written copy has the box, the shared frame still doesn't
+        ui.is_recording = True
+        ui.process_live_frame(SharedFrame(frame, 2, time.monotonic()))
+        assert len(written) == 1 and written[0] is not frame and not frame.any()
+        assert tuple(written[0][40, 55]) == (0, 0, 255)
+        ui.is_recording = False
+        ui.recording = None
+    print("✓ Overlay is cached and detections are burned in only when recording")
+
+def test_mosaic():
+    """Tiles are composed into one canvas, clicks map to tiles and detection keeps to the budget"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    mosaic = MosaicView()
+    mosaic.resize(400, 300)
+    mosaic.set_sources(["a", "b", "c"])
+    assert (mosaic.columns, mosaic.rows, mosaic.tile_size) == (2, 2, (200, 150))
+    assert mosaic.canvas.shape == (300, 400, 3)
+    mosaic.update_tile(2, np.full((480, 640, 3), 200, dtype=np.uint8), [(0.1, 0.1, 0.2, 0.2)], ["Face"])
+    assert mosaic.canvas[150:, :200].min() == 200 and not mosaic.canvas[:150].any()
+    assert not mosaic.canvas[150:, 200:].any() and mosaic.tile_labels[2] == ["Face"]
+    assert [mosaic.tile_at(x, y) for x, y in ((10, 10), (399, 10), (10, 299), (250, 200), (-1, 5))] == \
+        [0, 1, 2, None, None]
+    
+    with scratch_ui() as ui:
+        ui.show()
+        ui.video_tabs.setCurrentWidget(ui.mosaic_view)
+        
+        # Four tiles due for detection at 30 ms each share a 50 ms budget over two ticks
+        sequences = {}
+        def latest_frame(source_id):
+            sequences[source_id] = sequences.get(source_id, 0) + 1
+            return sequences[source_id], np.zeros((120, 160, 3), dtype=np.uint8)
+        detected = []
+        def detect_objects(frame, detection_type):
+            detected.append(frame)
+            time.sleep(0.03)
+            return [], None
+        ui.capture_manager.latest_frame = latest_frame
+        ui.detect_objects = detect_objects
+        ui.governor.budget_ms = 50
+        ui.mosaic_sources = [{'name': name, 'source_id': name, 'sequence': 0, 'frame_count': 0}
+                             for name in "abcd"]
+        ui.mosaic_view.set_sources("abcd")
+        ui.update_mosaic()
+        assert len(detected) == 2 and ui._mosaic_first == 2
+        ui.update_mosaic()
+        assert len(detected) == 4 and not any(s['detection_due'] for s in ui.mosaic_sources)
+        del ui.capture_manager.latest_frame
+        
+        # A promoted camera and the one it replaces both leave idle duty cycling behind
+        write_test_video("main.avi")
+        write_test_video("tile.avi")
+        ui.start_live_source(os.path.abspath("main.avi"))
+        ui.mosaic_sources = []
+        ui.open_mosaic_source("tile.avi")
+        main_reader = ui.capture_manager.get(ui.live_source_id)
+        tile_id = ui.mosaic_sources[0]['source_id']
+        tile_reader = ui.capture_manager.get(tile_id)
+        main_reader.set_rate_limit(2)
+        tile_reader.set_rate_limit(2)
+        ui.activity_monitor.idle = True
+        ui.promote_mosaic_source(0)
+        assert ui.live_source_id == tile_id and ui.mosaic_sources[0]['name'] == "Main camera"
+        assert tile_reader.rate_limit is None and main_reader.rate_limit is None
+        assert not ui.activity_monitor.idle
+    print("✓ Mosaic composes tiles, maps clicks and budgets detection")
+
+def test_capture_manager():
+    """Looping video files stand in for cameras, offline"""
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "camera.avi")
+        write_test_video(clip, frames=10)
+        
+        manager = CaptureManager()
+        first = manager.add_source(clip)
+        second = manager.add_source(clip)
+        broken = manager.add_source(os.path.join(tmp, "missing.avi"), reconnect_delay=0.05)
+        time.sleep(1.5)
+        
+        stats = manager.stats()
+        # Both files looped past their 10 frames, paced near their 30 fps
+        assert stats[first]['frames'] > 10 and stats[second]['frames'] > 10
+        assert stats[first]['fps'] > 15
+        # Nothing consumed the frames, so all but the newest were dropped
+        assert stats[first]['dropped'] == stats[first]['frames'] - 1
+        # A failing source keeps retrying without holding up the others
+        assert stats[broken]['state'] in ("connecting", "reconnecting")
+        assert stats[broken]['reconnects'] > 0
+        
+        sequence, frame = manager.latest_frame(first)
+        assert sequence > 0 and frame.shape == (120, 160, 3)
+        
+        manager.remove_source(second)
+        assert second not in manager.stats()
+        manager.stop_all()
+        
+        # A looping file that opens but never yields a frame backs off instead of spinning
+        class UnreadableFile:
+            reads = 0
+            def isOpened(self):
+                return True
+            def get(self, prop):
+                return 30.0 if prop == cv2.CAP_PROP_FPS else 0
+            def set(self, prop, value):
+                return True
+            def read(self):
+                UnreadableFile.reads += 1
+                return False, None
+            def release(self):
+                pass
+        
+        class UnreadableSource(CaptureSource):
+            def create_capture(self):
+                return UnreadableFile()
+        
+        manager = CaptureManager()
+        corrupt = manager.add_source(clip, source_class=UnreadableSource, reconnect_delay=0.05)
+        time.sleep(0.5)
+        stats = manager.stats()[corrupt]
+        manager.stop_all()
+        # 0.05 + 0.1 + 0.2 s of backoff leaves room for a handful of reopens only
+        assert stats['state'] == "reconnecting" and 1 <= stats['reconnects'] <= 4
+        assert UnreadableFile.reads <= 2 * (stats['reconnects'] + 1)
+        print("✓ Capture manager reads looping sources independently")
+
+class FakeCamera:
+    """Capture backend that only supports the modes it is given, like a real driver"""
+    def __init__(self, modes):
+        self.modes = modes  # {fourcc: {(width, height): max fps}}
+        self.fourcc = next(iter(modes))
+        self.size = next(iter(modes[self.fourcc]))
+        self.fps = 30.0
+        self.buffer_size = 4
+    
+    def isOpened(self):
+        return True
+    
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FOURCC:
+            fourcc = "".join(chr((int(value) >> (8 * i)) & 0xFF) for i in range(4))
+            if fourcc in self.modes:
+                self.fourcc = fourcc
+        elif prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            # Snap to the nearest supported size
+            wanted = list(self.size)
+            wanted[0 if prop == cv2.CAP_PROP_FRAME_WIDTH else 1] = int(value)
+            self.size = min(self.modes[self.fourcc],
+                            key=lambda s: abs(s[0] - wanted[0]) + abs(s[1] - wanted[1]))
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = min(float(value), self.modes[self.fourcc][self.size])
+        elif prop == cv2.CAP_PROP_BUFFERSIZE:
+            self.buffer_size = int(value)
+        return True
+    
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*self.fourcc),
+            cv2.CAP_PROP_FRAME_WIDTH: self.size[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: self.size[1],
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_BUFFERSIZE: self.buffer_size,
+        }.get(prop, 0)
+    
+    def read(self):
+        return True, np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+    
+    def release(self):
+        pass
+
+def test_camera_mode_negotiation():
+    """Requested modes are applied, verified and fall back on a fake camera"""
+    camera = FakeCamera({'YUYV': {(640, 480): 30, (1280, 720): 10},
+                         'MJPG': {(640, 480): 30, (1280, 720): 30, (1920, 1080): 30}})
+    mode = negotiate_camera_mode(camera, 1280, 720, 30, fourcc='MJPG', buffer_size=1)
+    assert mode['matched']
+    assert (mode['width'], mode['height'], mode['fps'], mode['fourcc'], mode['buffer_size']) == \
+        (1280, 720, 30, 'MJPG', 1)
+    
+    # Without MJPG the camera cannot do 720p at 30 fps; the real mode is reported
+    camera = FakeCamera({'YUYV': {(640, 480): 30, (1280, 720): 10}})
+    mode = negotiate_camera_mode(camera, 1280, 720, 30, fourcc='MJPG')
+    assert not mode['matched']
+    assert (mode['width'], mode['height'], mode['fps'], mode['fourcc']) == (1280, 720, 10, 'YUYV')
+    
+    # An unsupported resolution steps down to the next standard size
+    camera = FakeCamera({'MJPG': {(320, 240): 30, (640, 480): 30, (800, 600): 30}})
+    mode = negotiate_camera_mode(camera, 1920, 1080, 30, fourcc='MJPG')
+    assert (mode['width'], mode['height']) == (640, 480)
+    
+    # Capture sources negotiate whenever they (re)open a camera
+    class FakeCameraSource(CaptureSource):
+        def create_capture(self):
+            return FakeCamera({'MJPG': {(640, 480): 30, (1280, 720): 30}})
+    
+    manager = CaptureManager()
+    source = manager.add_source(0, source_class=FakeCameraSource,
+                                mode={'width': 1280, 'height': 720, 'fps': 30, 'fourcc': 'MJPG'})
+    time.sleep(0.2)
+    stats = manager.stats()[source]
+    manager.stop_all()
+    assert stats['mode']['matched'] and stats['frame_size'] == (1280, 720)
+    print("✓ Camera mode negotiation applies and reports the real mode")
+
+def test_frame_bus():
+    """Consumers share one frame at their own rate and resolution"""
+    bus = FrameBus()
+    received = {'full': [], 'small': [], 'slow': []}
+    kept = []
+    bus.subscribe("full", lambda shared: received['full'].append(shared.data))
+    bus.subscribe("small", lambda shared: received['small'].append(shared.data.shape), width=80)
+    bus.subscribe("slow", lambda shared: kept.append(shared.retain()), fps=1, width=80)
+    
+    frames = [np.full((120, 160, 3), i, dtype=np.uint8) for i in range(5)]
+    for frame in frames:
+        bus.publish(frame)
+    
+    # Full-resolution consumers get the published array itself, read-only
+    assert all(a is b for a, b in zip(received['full'], frames))
+    assert not frames[0].flags.writeable
+    assert received['small'] == [(60, 80, 3)] * 5
+    
+    # The slow consumer got one frame and still holds it; the scaled
+    # buffers nobody kept went back to the pool for reuse
+    assert len(kept) == 1 and kept[0].data[0, 0, 0] == 0
+    pool = bus.pools[(60, 80, 3)]
+    assert len(pool.free) == 1
+    kept[0].release()
+    assert len(pool.free) == 2
+    
+    # A 30 fps cap passes a 30 fps camera polled on a 16 ms timer at full
+    # rate despite the jitter, and halves a 60 fps one
+    for camera_fps, expected in ((30, 30), (60, 30), (15, 15)):
+        bus = FrameBus()
+        delivered = []
+        bus.subscribe("display", lambda shared: delivered.append(shared.timestamp), fps=30)
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        for i in range(camera_fps * 10):
+            polled = np.ceil(i / camera_fps / 0.016) * 0.016
+            bus.publish(frame.copy(), now=100.0 + polled)
+        assert abs(len(delivered) / 10 - expected) <= 1, (camera_fps, len(delivered))
+    print("✓ Frame bus shares frames per consumer rate and resolution")
+
+def test_latency_governor():
+    """The governor trades resolution, then stride, for detector time and gives it back"""
+    governor = LatencyGovernor(budget_ms=30, scales=(1.0, 0.5), max_stride=3, window=5)
+    
+    def run(full_resolution_ms, frames):
+        for _ in range(frames):
+            if governor.should_detect():
+                # Detector cost scales with pixel count
+                governor.record(full_resolution_ms * governor.scale ** 2)
+    
+    run(80, 5)
+    assert governor.scale == 0.5 and governor.stride == 1
+    run(200, 5)
+    assert governor.stride == 2
+    run(200, 20)
+    assert governor.stride == 3  # capped at max_stride
+    run(200, 30)
+    assert governor.stride == 3
+    
+    # A fast detector gets its stride back first, then full resolution
+    run(20, 30)
+    assert governor.stride == 1 and governor.scale == 1.0
+    print("✓ Latency governor keeps the detector within budget")
+
+def test_idle_duty_cycling():
+    """Quiet cameras idle at a low rate and wake on the first moving frame"""
+    sensor = MotionSensor()
+    monitor = ActivityMonitor(quiet_seconds=10)
+    still = np.full((48, 64, 3), 60, dtype=np.uint8)
+    moving = still.copy()
+    moving[10:30, 10:30] = 255
+    
+    assert monitor.update(sensor.update(still), now=0) is None
+    assert monitor.update(sensor.update(still), now=5) is None
+    assert monitor.update(sensor.update(still), now=10) == "idle"
+    assert monitor.update(sensor.update(moving), now=11) == "active"
+    assert not monitor.idle
+    
+    # The reader drops to the idle rate and returns to full rate at once
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "camera.avi")
+        write_test_video(clip, frames=10)
+        manager = CaptureManager()
+        source = manager.add_source(clip)
+        reader = manager.get(source)
+        reader.set_rate_limit(2)
+        time.sleep(0.3)
+        frames = reader.frames_read
+        time.sleep(1.0)
+        assert reader.frames_read - frames <= 3
+        reader.set_rate_limit(None)
+        time.sleep(0.2)
+        assert reader.frames_read - frames >= 4
+        manager.stop_all()
+        
+        # Recording keeps the camera at full rate, so recordings aren't time-compressed
+        with scratch_ui() as ui:
+            ui.start_live_source(clip)
+            reader = ui.capture_manager.get(ui.live_source_id)
+            deadline = time.monotonic() + 5
+            while reader.frame_size is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            ui.activity_monitor.quiet_seconds = 0.05
+            ui.update_activity(False)
+            time.sleep(0.1)
+            ui.update_activity(False)
+            assert ui.activity_monitor.idle and reader.rate_limit == config.IDLE_FPS
+            
+            ui.toggle_recording()
+            assert ui.is_recording
+            assert not ui.activity_monitor.idle and reader.rate_limit is None
+            time.sleep(0.1)
+            ui.update_activity(False)
+            assert not ui.activity_monitor.idle and reader.rate_limit is None
+            ui.toggle_recording()
+    print("✓ Idle cameras duty-cycle and wake on motion")
+
+def test_event_coalescer():
+    """Per-frame hits become one event per label with start, end, peak and best frame"""
+    coalescer = EventCoalescer(gap_seconds=2.0, max_seconds=60)
+    received = []
+    coalescer.add_sink(lambda state, event: received.append((state, event.label)))
+    
+    start = datetime.datetime(2024, 6, 1, 12, 0)
+    face = {'label': 'Face', 'box': (0, 0, 10, 10), 'confidence': 0.6}
+    person = {'label': 'Person', 'box': (0, 0, 20, 40), 'confidence': 0.9}
+    
+    # Ten seconds of a face at 30 fps, with a second face and a person for a while
+    for i in range(300):
+        now = start + datetime.timedelta(seconds=i / 30)
+        objects = [face, face] if 100 <= i < 110 else [face]
+        if 220 <= i < 250:
+            objects = objects + [person]
+        coalescer.update(now, i, i, objects, frame=i)
+    assert received == [("started", "Face"), ("started", "Person")]
+    
+    # A short dropout stays one event; a long one ends it
+    coalescer.update(start + datetime.timedelta(seconds=11), 330, 330, [])
+    assert received[-1] == ("ended", "Person")
+    face_event = coalescer.open_events['Face']
+    coalescer.expire(start + datetime.timedelta(seconds=13))
+    assert received[-1] == ("ended", "Face") and face_event.ended
+    assert face_event.hits == 300 and face_event.peak_count == 2
+    assert face_event.start_frame == 0 and face_event.end_frame == 299
+    assert face_event.best_key == 100 and face_event.best_frame is None
+    assert abs(face_event.duration - 299 / 30) < 1e-6
+    
+    # Something that never leaves is reported again every max_seconds
+    for i in range(150):
+        coalescer.update(start + datetime.timedelta(minutes=1, seconds=i), i, i, [person])
+    assert [state for state, label in received].count("started") == 5
+    coalescer.flush()
+    assert not coalescer.open_events
+    print("✓ Detection hits are coalesced into events")
+
+def test_detection_journal():
+    """Detections append in fsynced batches, replay after a crash and compact"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "detections.journal")
+        start = datetime.datetime(2024, 5, 1, 12, 0, 0)
+        
+        journal = DetectionJournal(path, flush_interval=0.05, batch_size=100, max_records=400)
+        assert len(journal.replay()) == 0
+        journal.start()
+        for i in range(450):
+            journal.append(detection_records(start + datetime.timedelta(seconds=i), i,
+                                             ["Face"], [(0.1, 0.2, 0.3, 0.4)]))
+        journal.close()
+        assert journal.batches_written <= 10
+        
+        # A crash mid-write leaves a partial record, which replay drops
+        with open(path, 'ab') as f:
+            f.write(b'\x01\x02\x03')
+        journal = DetectionJournal(path, flush_interval=0.05, max_records=400)
+        history = journal.replay()
+        assert len(history) == 450 and history.frames[-1] == 449
+        assert history.times[1] - history.times[0] == 1000
+        
+        # Compaction folds the journal into a memory-mapped columnar snapshot
+        journal.start()
+        journal.compact()
+        journal.close()
+        history = DetectionJournal(path).replay()
+        assert len(history) == 400 and history.frames[0] == 50
+        assert isinstance(history._frames, np.memmap)
+        
+        # Appending moves the columns off the read-only map
+        history.extend(detection_records(start + datetime.timedelta(hours=1), 999, ["Person"], [(0, 0, 1, 1)]))
+        assert len(history) == 401 and history.frames.flags.writeable
+        
+        # Range and membership queries use searchsorted
+        window = history.range(epoch_ms(start + datetime.timedelta(seconds=100)),
+                               epoch_ms(start + datetime.timedelta(seconds=110)))
+        assert history.frames[window].tolist() == list(range(100, 110))
+        assert history.contains_frame(999) and not history.contains_frame(10)
+        assert history.next_frame_after(448) == 449
+        assert history.labels[-1] == 3 and np.allclose(history.boxes[0], [0.1, 0.2, 0.3, 0.4])
+        
+        # A smaller limit passed to compact is written to the snapshot
+        journal = DetectionJournal(path, max_records=400)
+        journal.replay()
+        journal.start()
+        journal.compact(100)
+        journal.close()
+        history = DetectionJournal(path).replay()
+        assert len(history) == 100 and history.frames[0] == 350
+        
+        # The old JSON format imports as journal records
+        legacy = os.path.join(tmp, "detections.json")
+        with open(legacy, 'w') as f:
+            json.dump({'timestamps': [start.isoformat()], 'frame_indices': [7]}, f)
+        records = import_legacy_detections(legacy)
+        assert records['frame'].tolist() == [7]
+    print("✓ Detection journal appends, replays and compacts")
+
+def test_detection_store():
+    """Detections are queryable by day straight from the indexes"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DetectionStore(os.path.join(tmp, "detections.db"), flush_interval=0.05)
+        assert store.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        
+        # A month of history, 2000 detections a day
+        start = datetime.datetime(2024, 5, 1)
+        rows = [(epoch_ms(start) + i * 43200, "cam", None, i, "Face", 0.9, 0, 0, 0.1, 0.1)
+                for i in range(60000)]
+        with store.db:
+            store.db.executemany("INSERT INTO detections (time_ms, camera, recording, frame, label, "
+                                 "confidence, x, y, w, h) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        
+        # Live detections arrive through the writer thread
+        store.start()
+        objects = [{'label': 'Person', 'box': (10, 10, 20, 40), 'confidence': 0.8},
+                   {'label': 'Face', 'box': (12, 12, 8, 8), 'confidence': 1.0}]
+        store.add_event(datetime.datetime(2024, 6, 15, 8, 30), "cam", "rec.avi", 42, objects,
+                        [(0.1, 0.1, 0.2, 0.4), (0.12, 0.12, 0.08, 0.08)])
+        assert store.wait_for_writes()
+        
+        days = store.detection_days()
+        assert len(days) == 31 and days[0] == start.date()
+        assert days[-1] == datetime.date(2024, 6, 15)
+        assert len(store.detections_on(datetime.date(2024, 5, 2))) == 2000
+        assert len(store.detections_on(datetime.date(2024, 5, 2), label="Person")) == 0
+        june = store.detections_on(datetime.date(2024, 6, 15))
+        assert [(r[2], r[3], r[4]) for r in june] == [("rec.avi", 42, "Person"), ("rec.avi", 42, "Face")]
+        
+        # Day queries are served by the time index
+        plan = store.db.execute("EXPLAIN QUERY PLAN SELECT * FROM detections "
+                                "WHERE time_ms >= 0 AND time_ms < 1 ORDER BY time_ms").fetchall()
+        assert "detections_time" in str(plan)
+        
+        # Per-day counts come from the summary the insert trigger keeps
+        counts = store.detection_day_counts()
+        assert counts[datetime.date(2024, 5, 2)] == 2000 and counts[datetime.date(2024, 6, 15)] == 2
+        
+        # Exports stream every row to JSON off the caller's thread
+        exported = []
+        export = DetectionExportThread(store.path, os.path.join(tmp, "export.json"), "2024-06-15T08:00:00")
+        export.export_finished.connect(lambda path, count: exported.append(count))
+        export.start()
+        assert export.wait(30000)
+        app.processEvents()
+        assert exported == [60002]
+        with open(os.path.join(tmp, "export.json")) as f:
+            data = json.load(f)
+        assert data['session_start'] == "2024-06-15T08:00:00" and data['detection_count'] == 60002
+        assert len(data['detections']) == 60002
+        assert data['detections'][-1] == {
+            "timestamp": "2024-06-15T08:30:00", "camera": "cam", "recording": "rec.avi", "frame_index": 42,
+            "label": "Face", "confidence": 1.0, "box": [0.12, 0.12, 0.08, 0.08]}
+        store.close()
+        
+        # A database from before the summary existed is backfilled on open
+        with sqlite3.connect(os.path.join(tmp, "detections.db")) as db:
+            db.execute("DROP TRIGGER detections_count_day")
+            db.execute("DROP TABLE detection_day_counts")
+        reopened = DetectionStore(os.path.join(tmp, "detections.db"))
+        assert reopened.detection_day_counts() == counts
+        reopened.close()
+    print("✓ Detection store answers per-date queries from its indexes")
+
+def test_detection_calendar():
+    """Only the month on screen is formatted, with strength by detection count"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    calendar = DetectionCalendar()
+    calendar.setCurrentPage(2024, 6)
+    counts = {datetime.date(2020, 1, 1) + datetime.timedelta(days=i): i % 40 + 1 for i in range(3650)}
+    calendar.set_detection_counts(counts)
+    assert 28 <= len(calendar.marked) <= 50
+    assert all(calendar.visible_range()[0] <= qdate.toPyDate() <= calendar.visible_range()[1]
+               for qdate in calendar.marked)
+    
+    # Busier days get stronger markers
+    quiet, busy = QDate(2024, 6, 3), QDate(2024, 6, 4)
+    assert counts[quiet.toPyDate()] < counts[busy.toPyDate()]
+    assert calendar.marked[quiet][0] < calendar.marked[busy][0]
+    
+    # Live detections update one cell; other months wait until shown
+    calendar.add_detection_date(datetime.date(2024, 6, 3), 5)
+    assert calendar.marked[quiet][1] == counts[quiet.toPyDate()] + 5
+    calendar.add_detection_date(datetime.date(2023, 1, 1))
+    assert QDate(2023, 1, 1) not in calendar.marked
+    calendar.setCurrentPage(2023, 1)
+    assert QDate(2023, 1, 1) in calendar.marked and QDate(2024, 6, 3) not in calendar.marked
+    print("✓ Detection calendar marks only the visible month")
+
+def test_network_stream():
+    """A loopback MJPEG server stands in for an IP camera"""
+    jpegs = [cv2.imencode('.jpg', np.full((120, 160, 3), i * 8 % 256, dtype=np.uint8))[1].tobytes()
+             for i in range(30)]
+    server_state = {'up': True, 'burst': 0}
+    
+    class StreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not server_state['up']:
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+            self.end_headers()
+            i = 0
+            try:
+                while server_state['up']:
+                    # A burst arrives all at once, like a network hiccup clearing
+                    count = max(1, server_state['burst'])
+                    server_state['burst'] = 0
+                    for _ in range(count):
+                        jpeg = jpegs[i % len(jpegs)]
+                        i += 1
+                        self.wfile.write(b'--frame\r\nContent-Type: image/jpeg\r\n'
+                                         b'Content-Length: %d\r\n\r\n' % len(jpeg) + jpeg + b'\r\n')
+                    time.sleep(1 / 30)
+            except OSError:
+                pass
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StreamHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/stream.mjpg"
+    
+    manager = CaptureManager()
+    camera = manager.add_source(url, reconnect_delay=0.1, timeout_ms=1000)
+    try:
+        time.sleep(1.5)
+        stats = manager.stats()[camera]
+        assert stats['state'] == "running" and stats['frames'] > 10
+        assert stats['frame_size'] == (160, 120)
+        
+        # Buffered frames are skipped so the newest one is served
+        server_state['burst'] = 20
+        time.sleep(0.5)
+        manager.latest_frame(camera)
+        stats = manager.stats()[camera]
+        assert stats['backlog_discarded'] > 0
+        assert 0 <= stats['lag_ms'] < 1000
+        
+        # The source reconnects by itself once the camera comes back
+        server_state['up'] = False
+        time.sleep(1.5)
+        assert manager.stats()[camera]['reconnects'] > 0
+        server_state['up'] = True
+        deadline = time.monotonic() + 5
+        while manager.stats()[camera]['state'] != "running" and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert manager.stats()[camera]['state'] == "running"
+        
+        # The window starts stream URLs as network sources, without a camera mode
+        with scratch_ui() as ui:
+            ui.start_live_source(url)
+            reader = ui.capture_manager.get(ui.live_source_id)
+            assert isinstance(reader, NetworkStreamSource) and reader.requested_mode is None
+            deadline = time.monotonic() + 5
+            while reader.frames_read == 0 and time.monotonic() < deadline:
+                time.sleep(0.1)
+            assert reader.frames_read > 0
+            ui.stop_live_source()
+    finally:
+        manager.stop_all()
+        server.shutdown()
+        server.server_close()
+    
+    # Every buffered grab before the blocking one is discarded, and all but
+    # the last when max_backlog stops the loop first
+    class ScriptedCapture:
+        def __init__(self, delays):
+            self.delays = list(delays)
+        def grab(self):
+            time.sleep(self.delays.pop(0))
+            return True
+        def retrieve(self):
+            return True, np.zeros((120, 160, 3), dtype=np.uint8)
+        def get(self, prop):
+            return 0
+    source = NetworkStreamSource(0, "scripted", backlog_threshold=0.02, max_backlog=5)
+    for delays, discarded in (([0.05], 0), ([0, 0.05], 1), ([0, 0, 0, 0.05], 3), ([0] * 5, 4)):
+        before = source.backlog_discarded
+        assert source.read_frame(ScriptedCapture(delays))[0]
+        assert source.backlog_discarded - before == discarded
+    assert source.frames_dropped == source.backlog_discarded == 8
+    print("✓ Network stream skips backlog and reconnects")
+
+def test_detected_frame_store():
+    """Detected frames stay JPEG-compressed within their memory and disk budgets"""
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "frames")
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (240, 320, 3), dtype=np.uint8) for _ in range(4)]
+        frame_bytes = len(cv2.imencode('.jpg', frames[0], [cv2.IMWRITE_JPEG_QUALITY, 85])[1])
+        store = DetectedFrameStore(directory, memory_bytes=frame_bytes * 5, disk_bytes=frame_bytes * 12,
+                                   max_age_seconds=86400)
+        
+        # Queued frames are readable before the encoder gets to them
+        now_ms = epoch_ms(datetime.datetime.now())
+        store.put(now_ms, frames[0])
+        assert store.thumbnail(now_ms, 80).shape[:2] == (60, 80)
+        
+        store.start()
+        for i in range(1, 30):
+            store.put(now_ms + i, frames[i % 4])
+        deadline = time.monotonic() + 5
+        while store.stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        
+        stats = store.stats()
+        assert stats['memory_bytes'] <= frame_bytes * 5 and stats['disk_bytes'] <= frame_bytes * 12
+        assert stats['memory_frames'] > 0 and stats['disk_frames'] > 0
+        
+        # The newest frames are in memory, spilled ones come back from disk, the oldest are gone
+        assert store.frame(now_ms + 29).shape == frames[1].shape
+        spilled = next(iter(store.disk))
+        assert store.frame(spilled) is not None
+        assert store.frame(now_ms) is None
+        store.close()
+        
+        # Memory is spilled on close and a new session finds it
+        reopened = DetectedFrameStore(directory, frame_bytes * 5, frame_bytes * 12, max_age_seconds=86400)
+        assert now_ms + 29 in reopened
+        assert len(os.listdir(directory)) == len(reopened)
+        
+        # A frame stored again under the same key replaces the old copy in the accounting
+        disk_used = reopened.disk_used
+        on_disk = reopened.disk[now_ms + 29]
+        for frame in (frames[0], frames[2]):
+            reopened.put(now_ms + 29, frame)
+            reopened.encode(now_ms + 29)
+        assert reopened.memory_used == len(reopened.memory[now_ms + 29])
+        assert now_ms + 29 not in reopened.disk and reopened.disk_used == disk_used - on_disk
+        assert not os.path.exists(reopened.path_for(now_ms + 29))
+        assert reopened.jpeg(now_ms + 29) == cv2.imencode('.jpg', frames[2], [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+        
+        # Frames past the age limit are removed on the first sweep
+        expired = now_ms - 2 * 86400 * 1000
+        reopened.put(expired, frames[0])
+        reopened.encode(expired)
+        reopened.expire()
+        assert expired not in reopened
+    print("✓ Detected frames are bounded in memory and spill to disk")
+
+def test_log_sink():
+    """Log lines are batched to disk, rotated into gzip parts and rate limited on the console"""
+    with tempfile.TemporaryDirectory() as tmp:
+        today = datetime.date.today()
+        yesterday = today - datetime.timedelta(days=1)
+        
+        # A previous session's file is compressed on start
+        with open(os.path.join(tmp, f"vipers_{today - datetime.timedelta(days=2)}.log"), 'w') as f:
+            f.write("[2024-01-01 10:00:00] Legacy line without a level\n")
+        
+        sink = LogSink(tmp, flush_interval=0.05, max_bytes=20000, console_per_second=5)
+        console = io.StringIO()
+        with contextlib.redirect_stdout(console):
+            sink.start()
+            start = datetime.datetime.combine(yesterday, datetime.time(23, 59, 50))
+            for i in range(1000):
+                sink.log(start + datetime.timedelta(seconds=i // 50), "detection" if i % 2 else "info",
+                         f"message {i}")
+            sink.close()
+        
+        # Every line is on disk, in order, across the day change and size rotations
+        def part_order(name):
+            # Each day's gzip parts in order, then its live file
+            day, part = name.split('.')[:2]
+            return day, int(part) if name.endswith('.gz') else float('inf')
+        lines = []
+        for name in sorted(os.listdir(tmp), key=part_order):
+            path = os.path.join(tmp, name)
+            with (gzip.open(path, 'rt') if name.endswith('.gz') else open(path)) as f:
+                lines.extend(f.readlines())
+        parsed = [parse_log_line(line) for line in lines]
+        assert parsed[0][1:] == ("INFO", "Legacy line without a level")
+        assert [message for _, _, message in parsed[1:]] == [f"message {i}" for i in range(1000)]
+        assert parsed[2][1] == "DETECTION"
+        assert sink.rotations >= 3 and sink.batches_written < 1000
+        assert not os.path.exists(os.path.join(tmp, f"vipers_{yesterday}.log"))
+        assert os.path.exists(os.path.join(tmp, f"vipers_{today}.log"))
+        
+        # The console got a handful of lines and a note about the rest
+        echoed = console.getvalue().splitlines()
+        assert 5 <= len(echoed) < 50 and "not shown on the console" in echoed[-1]
+    print("✓ Log sink batches, rotates and rate limits")
+
+def test_log_model():
+    """The log view model keeps a ring of the newest entries, addressed by row"""
+    model = LogModel(capacity=1000)
+    removed = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    start = datetime.datetime(2024, 6, 1, 12, 0)
+    for batch in range(25):
+        model.append_entries([(start, "detection" if i % 7 == 0 else "info", f"message {batch * 100 + i}",
+                               batch * 100 + i) for i in range(100)])
+    
+    # The oldest rows fell off the front as whole batches
+    assert model.rowCount() == 1000 and removed[0] == (0, 99)
+    assert model.entry(0)[3] == 1500 and model.entry(999)[3] == 2499
+    assert model.index(0).data() == "[2024-06-01 12:00:00] message 1500"
+    assert model.index(1).data() == "[2024-06-01 12:00:00] INFO: message 1501"
+    
+    # A batch larger than the ring keeps only its tail
+    model.append_entries([(start, "info", f"burst {i}", i) for i in range(3000)])
+    assert model.rowCount() == 1000 and model.entry(0)[2] == "burst 2000"
+    model.clear()
+    assert model.rowCount() == 0
+    print("✓ Log model keeps a bounded ring of entries")
+
+def test_log_index():
+    """Rotated and live log files are searchable by text, level and time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # A rotated day in a gzip part and today's live file
+        old_day = datetime.datetime(2024, 3, 1, 8, 0)
+        with gzip.open(os.path.join(tmp, "vipers_2024-03-01.1.log.gz"), 'wt') as f:
+            for i in range(1000):
+                f.write(format_log_line(old_day + datetime.timedelta(seconds=i), "detection" if i % 10 == 0
+                                        else "info", f"Detected Drone near sector {i}"))
+        now = datetime.datetime.now().replace(microsecond=0)
+        live = os.path.join(tmp, f"vipers_{now.date()}.log")
+        with open(live, 'w') as f:
+            f.write(format_log_line(now, "error", "Camera connection lost"))
+            f.write("[2024-01-01 10:00:00] A line from before levels were written\n")
+            f.write("[2024-01-01 10:00:01] INFO: partly writ")
+        
+        index = LogIndex(os.path.join(tmp, "index.db"), tmp)
+        db = index.connect()
+        assert index.update(db) == 1002 and index.update(db) == 0
+        
+        assert len(index.search("drone sector")) == 500  # The default limit
+        assert len(index.search("drone sector", limit=5000)) == 1000
+        assert len(index.search("drone", level="detection")) == 100
+        assert [r[2] for r in index.search("sect", start=old_day + datetime.timedelta(seconds=998))] == \
+            ["Detected Drone near sector 999", "Detected Drone near sector 998"]
+        assert index.search(level="ERROR") == [(now, "ERROR", "Camera connection lost")]
+        assert index.search("before levels")[0][1] == "INFO"
+        assert index.search('"unbalanced (') == []
+        
+        # The live file is read on from where the last pass stopped
+        with open(live, 'a') as f:
+            f.write("ten\n" + format_log_line(now, "warning", "Drone battery low"))
+        assert index.update(db) == 2
+        
+        # Rotating the live file replaces its rows with the gzip part's
+        rotate_log(live)
+        assert index.update(db) == 4 and index.count() == 1004
+        assert len(index.search("drone", limit=5000)) == 1001
+        index.close()
+        db.close()
+    print("✓ Log index searches rotated and live log files")
+
+def test_detection_event_model():
+    """The events list pages through the whole history, filtered, with live events on top"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DetectionStore(os.path.join(tmp, "detections.db"), flush_interval=0.05)
+        frames = DetectedFrameStore(os.path.join(tmp, "frames"), 1024 * 1024, 1024 * 1024)
+        
+        # 100k finished events over about three months
+        start = epoch_ms(datetime.datetime(2024, 3, 1))
+        labels = ["Drone", "Vehicle", "Person", "Face"]
+        rows = [(start + i * 80000, start + i * 80000 + 5000, "cam", "rec.avi", i * 10, i * 10 + 50,
+                 labels[i % 4], 1, 20, None) for i in range(100000)]
+        with store.db:
+            store.db.executemany("INSERT INTO detection_events (start_ms, end_ms, camera, recording, "
+                                 "start_frame, end_frame, label, peak, hits, best_ms) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        
+        model = DetectionEventModel(store, frames, page_size=500)
+        model.set_filter()
+        assert model.rowCount() == 500 and model.event_at(0).start_frame == 999990
+        
+        # Scrolling to the end fetches every page exactly once, in order
+        pages = 1
+        while model.canFetchMore():
+            model.fetchMore()
+            pages += 1
+        assert model.rowCount() == 100000 and pages == 201
+        starts = [row.start_ms for row in model.rows]
+        assert starts == sorted(starts, reverse=True)
+        
+        # Filters are applied in the query
+        model.set_filter("Drone", datetime.date(2024, 3, 2))
+        day_rows = [row for row in rows if row[6] == "Drone" and
+                    datetime.datetime.fromtimestamp(row[0] / 1000).date() == datetime.date(2024, 3, 2)]
+        assert model.rowCount() == len(day_rows) and not model.canFetchMore()
+        assert model.event_at(0).start_frame == day_rows[-1][4]
+        
+        # Live events are inserted in one batch and completed in place
+        model.set_filter()
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        coalescer = EventCoalescer(gap_seconds=1.0)
+        coalescer.add_sink(model.add_live_event)
+        coalescer.add_sink(lambda state, event: store.add_detection_event(event) if state == "ended" else None)
+        now = datetime.datetime(2024, 7, 1, 12, 0)
+        objects = [{'label': 'Drone', 'box': (0, 0, 10, 10)}, {'label': 'Person', 'box': (0, 0, 10, 10)}]
+        coalescer.update(now, 7, epoch_ms(now), objects, camera="cam", recording="live.avi")
+        assert model.rowCount() == 500
+        model.flush_pending()
+        assert inserted == [(0, 1)] and model.event_at(0).end_ms is None
+        assert "(ongoing)" in model.index(0).data()
+        coalescer.flush()
+        assert model.event_at(0).end_ms is not None and model.event_at(0).recording == "live.avi"
+        assert {model.event_at(0).label, model.event_at(1).label} == {"Drone", "Person"}
+        
+        # Refiltering doesn't wait for the writer; ended events it hasn't
+        # committed yet are still listed from memory
+        model.set_filter()
+        assert [row.label for row in model.rows[:3]] in (["Drone", "Person", "Face"],
+                                                         ["Person", "Drone", "Face"])
+        
+        # Once committed they are paged like the rest, and listed once
+        store.start()
+        store.wait_for_writes()
+        model.set_filter("Drone")
+        assert [row.start_frame for row in model.rows[:2]] == [7, 999960]
+        app.processEvents()
+        assert model.unsaved == {}
+        model.set_filter("Drone")
+        assert [row.start_frame for row in model.rows[:2]] == [7, 999960] and model.rows[0].id is not None
+        store.close()
+        
+        # A database from before events were stored derives them from its detections
+        with sqlite3.connect(os.path.join(tmp, "detections.db")) as db:
+            db.execute("DROP TABLE detection_events")
+            db.executemany("INSERT INTO detections (time_ms, camera, recording, frame, label) "
+                           "VALUES (?, 'cam', NULL, ?, 'Drone')",
+                           [(start + i * 100, i) for i in range(50)] +
+                           [(start + 60000 + i * 100, 50 + i) for i in range(50)])
+        reopened = DetectionStore(os.path.join(tmp, "detections.db"))
+        backfilled = []
+        reopened.events_backfilled.connect(backfilled.append, Qt.DirectConnection)
+        reopened.start()
+        reopened.wait_for_writes()
+        events = reopened.detection_events()
+        assert backfilled == [2] and [(row.start_frame, row.end_frame, row.hits) for row in events] == \
+            [(50, 99, 50), (0, 49, 50)]
+        reopened.close()
+    print("✓ Detection event model pages the full history")
+
 if __name__ == "__main__":
+    test_playback_target()
+    test_frame_cache()
+    test_frame_prefetch()
+    test_proxy_layout()
+    test_thumbnail_strip()
+    test_detection_heat_strip()
+    test_display_buffer()
+    test_render_gating()
+    test_overlay_cache()
+    test_mosaic()
+    test_capture_manager()
+    test_camera_mode_negotiation()
+    test_frame_bus()
+    test_latency_governor()
+    test_idle_duty_cycling()
+    test_event_coalescer()
+    test_detection_journal()
+    test_detection_store()
+    test_detection_calendar()
+    test_network_stream()
+    test_detected_frame_store()
+    test_log_sink()
+    test_log_model()
+    test_log_index()
+    test_detection_event_model()
     test_improvements() 
\ No newline at end of file
@@ -4,15 +4,33 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
     QRadioButton, QGridLayout, QListWidget, QListWidgetItem, QFileDialog, QMessageBox,
     QTabWidget, QFrame, QSplitter, QProgressBar, QDateEdit, QTimeEdit,
     QSpinBox, QCheckBox, QGroupBox, QScrollArea, QMainWindow, QStatusBar,
-    QToolBar, QAction, QMenu, QMenuBar, QDockWidget, QSizePolicy, QDialog)
-from PyQt5.QtCore import Qt, QDate, QTime, QDateTime, QTimer, QSize, QRect, QPoint, pyqtSignal, QThread, QByteArray
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QPen, QFont, QIcon, QBrush, QCursor, QPolygon
+    QToolBar, QAction, QMenu, QMenuBar, QDockWidget, QSizePolicy, QDialog, QTableView, QHeaderView,
+    QAbstractItemView, QLineEdit)
+from PyQt5.QtCore import (Qt, QDate, QTime, QDateTime, QTimer, QSize, QRect, QPoint, pyqtSignal, QThread,
+    QByteArray, QAbstractListModel, QModelIndex)
+from PyQt5.QtGui import (QImage, QPixmap, QPainter, QColor, QPen, QFont, QIcon, QBrush, QCursor, QPolygon,
+    QRegion, QTextCharFormat)
+from collections import OrderedDict
 import cv2
 import datetime
 import json
+import math
 import os
 import numpy as np
 import random
+import sqlite3
+import time
+import config
+from capture import CaptureManager, describe_camera_mode
+from framebus import FrameBus
+from logindex import LogIndex
+from logsink import LogSink
+from storage import (DetectedFrameStore, DetectionExportThread, DetectionHistory, DetectionJournal,
+    DetectionStore, day_bounds_ms, detection_records, epoch_ms, event_row, import_legacy_detections, journal_path_for,
+    write_journal)
+from detection import ActivityMonitor, EventCoalescer, LatencyGovernor, MotionSensor, scale_detections
+from playback import (FrameCache, FramePrefetchThread, ThumbnailStrip, ThumbnailStripThread,
+    playback_target, proxy_path_for, proxy_frame_size, thumbnail_path_for)
 
 # Video processing thread for better performance
 class VideoProcessingThread(QThread):
@@ -54,6 +72,13 @@ class DetectionSlider(QSlider):
     def __init__(self, orientation, parent=None):
         super().__init__(orientation, parent)
         self.detection_points = []
+        self._marker_image = None
+        self._marker_key = None
+        self.thumbnail_strip = None
+        self.thumbnail_pixmaps = {}
+        self.preview_label = QLabel(None, Qt.ToolTip)
+        self.preview_label.setStyleSheet("border: 1px solid #16a085; background: #000000;")
+        self.setMouseTracking(True)
         self.setStyleSheet("""
             QSlider::groove:horizontal {
                 border: 1px solid #999999;
@@ -72,27 +97,134 @@ class DetectionSlider(QSlider):
         
     def set_detection_points(self, points):
         self.detection_points = points
+        self._marker_key = None
         self.update()
         
+    def detection_marker_image(self):
+        """Detection density per pixel column as a one pixel high heat strip"""
+        width = max(1, self.width())
+        key = (width, self.maximum(), len(self.detection_points))
+        if self._marker_key == key:
+            return self._marker_image
+            
+        # Bucket every detection frame into its pixel column in one pass
+        points = np.asarray(self.detection_points, dtype=np.int64)
+        maximum = max(1, self.maximum())
+        columns = np.clip(points * width // maximum, 0, width - 1)
+        counts = np.bincount(columns, minlength=width)
+        
+        # Widen each marker to its neighbours so single hits stay visible
+        counts[1:] = np.maximum(counts[1:], counts[:-1])
+        counts[:-1] = np.maximum(counts[:-1], counts[1:])
+        
+        # Red with alpha scaled logarithmically by density
+        strip = np.zeros((1, width, 4), dtype=np.uint8)
+        strip[..., 0] = 255
+        hit = counts > 0
+        if hit.any():
+            scale = np.log1p(counts[hit]) / np.log1p(counts.max())
+            strip[0, hit, 3] = (110 + 145 * scale).astype(np.uint8)
+            
+        self._marker_buffer = strip
+        self._marker_image = QImage(strip.data, width, 1, width * 4, QImage.Format_RGBA8888)
+        self._marker_key = key
+        return self._marker_image
+        
     def paintEvent(self, event):
         super().paintEvent(event)
-        if not self.detection_points:
+        if len(self.detection_points) == 0:
             return
             
         painter = QPainter(self)
-        painter.setPen(QPen(QColor(255, 0, 0), 3))
+        painter.drawImage(QRect(0, 0, self.width(), self.height()), self.detection_marker_image())
+        
+    def set_thumbnail_strip(self, strip):
+        self.thumbnail_strip = strip
+        self.thumbnail_pixmaps = {}
+        self.preview_label.hide()
+        
+    def value_at(self, x):
+        return self.minimum() + ((self.maximum() - self.minimum()) * x) // max(1, self.width())
         
-        for point in self.detection_points:
-            # Convert detection frame index to slider position
-            x_pos = int((point / self.maximum() if self.maximum() > 0 else 0) * self.width())
-            painter.drawLine(x_pos, 0, x_pos, self.height())
-            
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            value = self.minimum() + ((self.maximum() - self.minimum()) * event.x()) // self.width()
+            value = self.value_at(event.x())
             self.setValue(value)
             self.clicked.emit(value)
         super().mousePressEvent(event)
+        
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        self.show_thumbnail_preview(event.x())
+        
+    def leaveEvent(self, event):
+        self.preview_label.hide()
+        super().leaveEvent(event)
+        
+    def show_thumbnail_preview(self, x):
+        """Show the precomputed thumbnail under the cursor above the slider"""
+        if self.thumbnail_strip is None or not self.isEnabled():
+            return
+            
+        frame_index = self.value_at(min(max(x, 0), self.width()))
+        index = frame_index // self.thumbnail_strip.frame_interval
+        pixmap = self.thumbnail_pixmaps.get(index)
+        if pixmap is None:
+            data = self.thumbnail_strip.thumbnail_for_frame(frame_index)
+            if data is None:
+                self.preview_label.hide()
+                return
+            pixmap = QPixmap()
+            pixmap.loadFromData(data, "JPG")
+            if len(self.thumbnail_pixmaps) > 256:
+                self.thumbnail_pixmaps.clear()
+            self.thumbnail_pixmaps[index] = pixmap
+            
+        self.preview_label.setPixmap(pixmap)
+        self.preview_label.adjustSize()
+        self.preview_label.move(self.mapToGlobal(QPoint(x - self.preview_label.width() // 2,
+                                                        -self.preview_label.height() - 4)))
+        self.preview_label.show()
+
+# BGR colours used when detections are burned into recorded frames
+DETECTION_COLORS = {
+    'Face': (0, 255, 0),
+    'Drone': (0, 0, 255),
+    'Person': (255, 0, 0),
+    'Vehicle': (255, 255, 0),
+}
+
+def draw_detections(frame, detected_objects):
+    """Burn detection boxes and labels into a frame"""
+    for obj in detected_objects:
+        x, y, w, h = obj['box']
+        color = DETECTION_COLORS.get(obj['label'], (0, 0, 255))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, obj['label'], (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    return frame
+
+def relative_boxes(detected_objects, frame_shape):
+    """Convert detections to boxes relative to the frame size, plus their labels"""
+    frame_h, frame_w = frame_shape[:2]
+    boxes = []
+    labels = []
+    for obj in detected_objects:
+        x, y, w, h = obj['box']
+        boxes.append((x / frame_w, y / frame_h, w / frame_w, h / frame_h))
+        labels.append(obj['label'])
+    return boxes, labels
+
+# False-colour lookup table for the Thermal view, built once
+THERMAL_LUT = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1),
+                                getattr(cv2, 'COLORMAP_' + config.THERMAL_COLORMAP))
+
+def thermal_image(frame):
+    """Map frame intensity through the thermal colour table"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.applyColorMap(gray, THERMAL_LUT)
+
+# BGR frames can be shown without a colour conversion on Qt 5.14+
+DISPLAY_IMAGE_FORMAT = getattr(QImage, 'Format_BGR888', QImage.Format_RGB888)
 
 # Custom video frame with overlay capabilities
 class VideoFrame(QLabel):
@@ -110,19 +242,93 @@ class VideoFrame(QLabel):
         self.setMinimumSize(640, 480)
         self.current_frame = None
         
+        # Reused display buffer and the QImage wrapping it
+        self.display_buffer = None
+        self.display_image = None
+        self.image_rect = QRect()
+        
+        # Overlay resources, created once instead of on every repaint
+        self.box_pen = QPen(QColor(255, 0, 0), 2)
+        self.label_pen = QPen(QColor(255, 255, 0))
+        self.label_font = QFont("Arial", 10, QFont.Bold)
+        self.overlay_pixmap = None
+        self.overlay_key = None
+        
     def set_detection_boxes(self, boxes, labels):
+        # Only repaint where boxes were or now are
+        dirty = self.box_region()
         self.detection_boxes = boxes
         self.detection_labels = labels
-        self.update()
+        self.update(dirty.united(self.box_region()))
+        
+    def box_rects(self):
+        """Detection boxes in widget coordinates, over the displayed image"""
+        area = self.image_rect if self.display_image is not None else self.rect()
+        return [QRect(area.x() + int(x * area.width()), area.y() + int(y * area.height()),
+                      int(w * area.width()), int(h * area.height()))
+                for x, y, w, h in self.detection_boxes]
+        
+    def box_region(self):
+        """Area covered by the boxes, their pen and their labels"""
+        region = QRegion()
+        for rect in self.box_rects():
+            region += QRect(rect.x() - 2, rect.y() - 20, max(rect.width(), 100) + 4, rect.height() + 22)
+        return region
         
     def set_frame(self, frame):
         """Set the current frame for display"""
         self.current_frame = frame
-        self.update()
         
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        painter = QPainter(self)
+        # Fit the frame inside the widget, keeping its aspect ratio
+        frame_h, frame_w = frame.shape[:2]
+        scale = min(self.width() / frame_w, self.height() / frame_h)
+        target_w, target_h = max(1, int(frame_w * scale)), max(1, int(frame_h * scale))
+        
+        # Only reallocate when the display size changes
+        if self.display_buffer is None or self.display_buffer.shape[:2] != (target_h, target_w):
+            self.display_buffer = np.empty((target_h, target_w, 3), dtype=np.uint8)
+            self.display_image = QImage(self.display_buffer.data, target_w, target_h,
+                                        target_w * 3, DISPLAY_IMAGE_FORMAT)
+        self.image_rect = QRect((self.width() - target_w) // 2, (self.height() - target_h) // 2,
+                                target_w, target_h)
+        
+        # Resize straight into the display buffer
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        cv2.resize(frame, (target_w, target_h), dst=self.display_buffer, interpolation=interpolation)
+        if DISPLAY_IMAGE_FORMAT == QImage.Format_RGB888:
+            # Qt before 5.14 has no BGR format, convert in place instead
+            cv2.cvtColor(self.display_buffer, cv2.COLOR_BGR2RGB, dst=self.display_buffer)
+        
+        if self.text():
+            super().setText("")
+            self.update()
+        else:
+            self.update(self.image_rect)
+        
+    def setText(self, text):
+        # Showing a message replaces the video
+        self.current_frame = None
+        self.display_image = None
+        super().setText(text)
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.current_frame is not None:
+            self.set_frame(self.current_frame)
+            
+    def frame_image(self):
+        """Copy of the currently displayed image, or None"""
+        return self.display_image.copy() if self.display_image is not None else None
+        
+    def overlay(self):
+        """Grid and REC indicator, cached until the size or their settings change"""
+        key = (self.width(), self.height(), self.grid_enabled, self.recording)
+        if self.overlay_key == key:
+            return self.overlay_pixmap
+            
+        self.overlay_pixmap = QPixmap(self.size())
+        self.overlay_pixmap.fill(Qt.transparent)
+        painter = QPainter(self.overlay_pixmap)
         
         # Draw grid if enabled
         if self.grid_enabled:
@@ -138,24 +344,6 @@ class VideoFrame(QLabel):
                 y = int(self.height() * i / 3)
                 painter.drawLine(0, y, self.width(), y)
         
-        # Draw detection boxes
-        for i, (x, y, w, h) in enumerate(self.detection_boxes):
-            # Scale coordinates to widget size
-            x_scaled = int(x * self.width())
-            y_scaled = int(y * self.height())
-            w_scaled = int(w * self.width())
-            h_scaled = int(h * self.height())
-            
-            # Draw rectangle
-            painter.setPen(QPen(QColor(255, 0, 0), 2))
-            painter.drawRect(x_scaled, y_scaled, w_scaled, h_scaled)
-            
-            # Draw label if available
-            if i < len(self.detection_labels):
-                painter.setPen(QColor(255, 255, 0))
-                painter.setFont(QFont("Arial", 10, QFont.Bold))
-                painter.drawText(x_scaled, y_scaled - 5, self.detection_labels[i])
-        
         # Draw recording indicator
         if self.recording:
             painter.setPen(QPen(QColor(255, 0, 0), 3))
@@ -165,6 +353,145 @@ class VideoFrame(QLabel):
             painter.setFont(QFont("Arial", 8, QFont.Bold))
             painter.drawText(35, 20, "REC")
         
+        painter.end()
+        self.overlay_key = key
+        return self.overlay_pixmap
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        painter = QPainter(self)
+        
+        if self.display_image is not None:
+            painter.drawImage(self.image_rect.topLeft(), self.display_image)
+        
+        painter.drawPixmap(0, 0, self.overlay())
+        
+        # Draw detection boxes in one batch, then their labels
+        if self.detection_boxes:
+            rects = self.box_rects()
+            painter.setPen(self.box_pen)
+            painter.drawRects(rects)
+            
+            painter.setPen(self.label_pen)
+            painter.setFont(self.label_font)
+            for rect, label in zip(rects, self.detection_labels):
+                painter.drawText(rect.x(), rect.y() - 5, label)
+
+
+# Grid of several camera sources composed into a single canvas
+class MosaicView(QLabel):
+    tile_clicked = pyqtSignal(int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("background-color: #000000; border: 2px solid #2c3e50; border-radius: 5px;")
+        self.setAlignment(Qt.AlignCenter)
+        self.setText("No Mosaic Sources - use File > Add Camera to Mosaic")
+        self.setFont(QFont("Arial", 14))
+        self.source_names = []
+        self.tile_boxes = []
+        self.tile_labels = []
+        self.columns = 1
+        self.rows = 1
+        self.tile_size = (0, 0)
+        self.canvas = None
+        self.canvas_image = None
+        self.box_pen = QPen(QColor(255, 0, 0), 2)
+        self.label_pen = QPen(QColor(255, 255, 0))
+        self.name_pen = QPen(QColor(255, 255, 255))
+        self.label_font = QFont("Arial", 9, QFont.Bold)
+        
+    def set_sources(self, names):
+        """Lay out one tile per source name"""
+        self.source_names = list(names)
+        self.tile_boxes = [[] for _ in self.source_names]
+        self.tile_labels = [[] for _ in self.source_names]
+        self.columns = max(1, int(np.ceil(np.sqrt(len(self.source_names)))))
+        self.rows = max(1, int(np.ceil(len(self.source_names) / self.columns)))
+        self.allocate_canvas()
+        super().setText("" if self.source_names else "No Mosaic Sources - use File > Add Camera to Mosaic")
+        self.update()
+        
+    def allocate_canvas(self):
+        """One preallocated canvas for all tiles, wrapped once in a QImage"""
+        tile_w = max(1, self.width() // self.columns)
+        tile_h = max(1, self.height() // self.rows)
+        self.tile_size = (tile_w, tile_h)
+        if not self.source_names:
+            self.canvas = None
+            self.canvas_image = None
+            return
+        self.canvas = np.zeros((tile_h * self.rows, tile_w * self.columns, 3), dtype=np.uint8)
+        height, width = self.canvas.shape[:2]
+        self.canvas_image = QImage(self.canvas.data, width, height, width * 3, DISPLAY_IMAGE_FORMAT)
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.source_names:
+            self.allocate_canvas()
+            
+    def tile_rect(self, index):
+        tile_w, tile_h = self.tile_size
+        row, column = divmod(index, self.columns)
+        return QRect(column * tile_w, row * tile_h, tile_w, tile_h)
+        
+    def update_tile(self, index, frame, boxes, labels):
+        """Downscale a frame into its tile; the caller repaints once per tick"""
+        if self.canvas is None or index >= len(self.source_names):
+            return
+        rect = self.tile_rect(index)
+        tile = self.canvas[rect.y():rect.y() + rect.height(), rect.x():rect.x() + rect.width()]
+        cv2.resize(frame, (rect.width(), rect.height()), dst=tile, interpolation=cv2.INTER_AREA)
+        if DISPLAY_IMAGE_FORMAT == QImage.Format_RGB888:
+            cv2.cvtColor(tile, cv2.COLOR_BGR2RGB, dst=tile)
+        self.tile_boxes[index] = boxes
+        self.tile_labels[index] = labels
+        
+    def tile_at(self, x, y):
+        """Index of the tile under a point, or None outside every tile"""
+        tile_w, tile_h = self.tile_size
+        if not self.source_names or x < 0 or y < 0 or x >= tile_w * self.columns:
+            return None
+        index = (y // tile_h) * self.columns + x // tile_w
+        return index if index < len(self.source_names) else None
+        
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            index = self.tile_at(event.x(), event.y())
+            if index is not None:
+                self.tile_clicked.emit(index)
+        super().mousePressEvent(event)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.canvas_image is None:
+            return
+            
+        painter = QPainter(self)
+        painter.drawImage(0, 0, self.canvas_image)
+        
+        # Overlays come from detection metadata, not from the pixels
+        rects = []
+        labels = []
+        for index, boxes in enumerate(self.tile_boxes):
+            tile = self.tile_rect(index)
+            for (x, y, w, h), label in zip(boxes, self.tile_labels[index]):
+                rects.append(QRect(tile.x() + int(x * tile.width()), tile.y() + int(y * tile.height()),
+                                   int(w * tile.width()), int(h * tile.height())))
+                labels.append(label)
+        
+        painter.setFont(self.label_font)
+        if rects:
+            painter.setPen(self.box_pen)
+            painter.drawRects(rects)
+            painter.setPen(self.label_pen)
+            for rect, label in zip(rects, labels):
+                painter.drawText(rect.x(), rect.y() - 4, label)
+        
+        painter.setPen(self.name_pen)
+        for index, name in enumerate(self.source_names):
+            tile = self.tile_rect(index)
+            painter.drawText(tile.x() + 6, tile.y() + 16, name)
 
 
 # Alert widget with priority levels
@@ -212,13 +539,243 @@ class AlertWidget(QListWidget):
         if self.count() > 100:
             self.takeItem(self.count() - 1)
 
+# Log entries for the log view, kept in a fixed-size ring
+#
+# Rows map to ring slots arithmetically, so the view and click handling
+# never walk the log; the oldest entries fall off once the ring is full.
+class LogModel(QAbstractListModel):
+    LEVEL_COLORS = {'error': QColor(231, 76, 60), 'warning': QColor(243, 156, 18),
+                    'detection': QColor(26, 188, 156)}
+    DEFAULT_COLOR = QColor(189, 195, 199)
+    
+    def __init__(self, capacity, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.entries = [None] * capacity
+        self.start = 0
+        self.count = 0
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+        
+    def entry(self, row):
+        """(timestamp, level, message, frame_index) of a row"""
+        return self.entries[(self.start + row) % self.capacity]
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        timestamp, level, message, frame_index = self.entry(index.row())
+        if role == Qt.DisplayRole:
+            prefix = "" if level == "detection" else f"{level.upper()}: "
+            return f"[{timestamp:%Y-%m-%d %H:%M:%S}] {prefix}{message}"
+        if role == Qt.ForegroundRole:
+            return self.LEVEL_COLORS.get(level, self.DEFAULT_COLOR)
+        if role == Qt.ToolTipRole and frame_index is not None and is_detection_log(level, message):
+            return f"Click to seek to frame {frame_index}"
+        return None
+        
+    def append_entries(self, entries):
+        """Add a batch at the end, dropping the oldest rows past capacity"""
+        entries = entries[-self.capacity:]
+        overflow = self.count + len(entries) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self.start = (self.start + overflow) % self.capacity
+            self.count -= overflow
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), self.count, self.count + len(entries) - 1)
+        for entry in entries:
+            self.entries[(self.start + self.count) % self.capacity] = entry
+            self.count += 1
+        self.endInsertRows()
+        
+    def clear(self):
+        self.beginResetModel()
+        self.entries = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+        self.endResetModel()
+
+def live_key(row):
+    return row.start_ms, row.camera, row.label
+
+# Detection events for the events list, paged from the store on demand
+#
+# Rows are fetched newest first a page at a time as the view scrolls, keyed
+# on the last row shown. Live events are queued and inserted at the top in
+# one batch per UI tick; thumbnails are decoded only for rows on screen.
+class DetectionEventModel(QAbstractListModel):
+    def __init__(self, store, frames, page_size=500, thumbnail_width=96, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.frames = frames
+        self.page_size = page_size
+        self.thumbnail_width = thumbnail_width
+        self.rows = []
+        self.exhausted = False
+        self.label = None
+        self.day = None
+        self.live = {}  # DetectionEvent -> row shown for it
+        self.unsaved = {}  # live_key -> row of ended events the store hasn't committed yet
+        self.shown_live = set()  # events shown before the store had them
+        self.pending = []
+        self.thumbnails = OrderedDict()
+        store.events_committed.connect(self.events_committed)
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+        
+    def event_at(self, row):
+        return self.rows[row]
+        
+    def set_filter(self, label=None, day=None):
+        """Show only one label and/or one date; None shows all"""
+        self.beginResetModel()
+        self.label, self.day = label, day
+        
+        # Events the store can't return yet are kept in memory until it can
+        unstored = list(self.live.values()) + list(self.unsaved.values())
+        self.rows = sorted((row for row in unstored if self.matches(row)),
+                           key=lambda row: row.start_ms, reverse=True)
+        self.shown_live = {live_key(row) for row in self.rows}
+        self.pending = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+        
+    def day_bounds(self):
+        if self.day is None:
+            return None, None
+        return day_bounds_ms(self.day)
+        
+    def matches(self, row):
+        start_ms, end_ms = self.day_bounds()
+        return (self.label is None or row.label == self.label) and \
+            (start_ms is None or start_ms <= row.start_ms < end_ms)
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        stored = [row for row in self.rows if row.id is not None]
+        before = (stored[-1].start_ms, stored[-1].id) if stored else None
+        start_ms, end_ms = self.day_bounds()
+        page = self.store.detection_events(before, self.label, start_ms, end_ms, self.page_size)
+        self.exhausted = len(page) < self.page_size
+        page = [row for row in page if live_key(row) not in self.shown_live]
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+            
+    def add_live_event(self, state, event):
+        """Event sink: queue new events and complete ended ones in place"""
+        old = self.live.get(event)
+        row = event_row(event)
+        if state == "started":
+            self.live[event] = row
+            self.pending.append(row)
+            return
+        self.live.pop(event, None)
+        self.unsaved[live_key(row)] = row
+        if old in self.pending:
+            self.pending[self.pending.index(old)] = row
+            return
+        for index, shown in enumerate(self.rows):
+            if shown is old:
+                self.rows[index] = row
+                model_index = self.index(index)
+                self.dataChanged.emit(model_index, model_index)
+                break
+                
+    def events_committed(self, keys):
+        """The store has written these events, so paging will find them"""
+        for key in keys:
+            self.unsaved.pop(key, None)
+            
+    def flush_pending(self):
+        """Insert the events queued since the last tick at the top, in one batch"""
+        if not self.pending:
+            return
+        rows = [row for row in reversed(self.pending) if self.matches(row)]
+        self.pending = []
+        self.shown_live.update(live_key(row) for row in rows)
+        if rows:
+            self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+            self.rows[:0] = rows
+            self.endInsertRows()
+            
+    def thumbnail(self, key):
+        if key in self.thumbnails:
+            self.thumbnails.move_to_end(key)
+            return self.thumbnails[key]
+        image = self.frames.thumbnail(key, self.thumbnail_width)
+        pixmap = None
+        if image is not None:
+            rgb = np.ascontiguousarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            pixmap = QPixmap.fromImage(QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.shape[1] * 3,
+                                              QImage.Format_RGB888))
+        self.thumbnails[key] = pixmap
+        if len(self.thumbnails) > 256:
+            self.thumbnails.popitem(last=False)
+        return pixmap
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        start = datetime.datetime.fromtimestamp(row.start_ms / 1000)
+        if role == Qt.DisplayRole:
+            if row.end_ms is None:
+                return f"{start:%Y-%m-%d %H:%M:%S} - {row.peak} {row.label} (ongoing)"
+            end = datetime.datetime.fromtimestamp(row.end_ms / 1000)
+            return f"{start:%Y-%m-%d %H:%M:%S}-{end:%H:%M:%S} - {row.peak} {row.label}"
+        if role == Qt.ToolTipRole:
+            source = os.path.basename(row.recording) if row.recording else row.camera or "unknown source"
+            return (f"Frames: {row.start_frame}-{row.end_frame}, Label: {row.label}, Peak: {row.peak}, "
+                    f"Hits: {row.hits}, Source: {source}")
+        if role == Qt.DecorationRole and row.best_ms is not None:
+            return self.thumbnail(row.best_ms)
+        return None
+
+def table_list_view(model, row_height=None):
+    """One-column table for a list model with fixed row heights, since a
+    QListView lays out every row again whenever rows are added"""
+    view = QTableView()
+    view.setObjectName("list_view")
+    view.setModel(model)
+    view.verticalHeader().hide()
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(row_height or view.fontMetrics().height() + 4)
+    view.horizontalHeader().hide()
+    view.horizontalHeader().setStretchLastSection(True)
+    view.setShowGrid(False)
+    view.setWordWrap(False)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SingleSelection)
+    return view
+
+def is_detection_log(level, message):
+    """Detection-related log lines can be clicked to seek to their frame"""
+    message = message.lower()
+    return level == "detection" or "detection" in message or "detected" in message
+
 # Enhanced calendar with detection markers
+#
+# Detections per day are kept in a dict, and only the page on screen is
+# formatted: a new date or page touches a few cells, never the whole history.
+# Marker strength grows with the day's detection count.
 class DetectionCalendar(QCalendarWidget):
     date_clicked = pyqtSignal(QDate)
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.detection_dates = set()
+        self.day_counts = {}
+        self.scale_count = 0  # Count that gets the strongest marker
+        self.marked = {}  # QDate -> (alpha, count) currently applied
         self.setGridVisible(True)
         self.setVerticalHeaderFormat(QCalendarWidget.NoVerticalHeader)
         self.setStyleSheet("""
@@ -248,21 +805,63 @@ class DetectionCalendar(QCalendarWidget):
             }
         """)
         self.clicked.connect(self.date_clicked.emit)
+        self.currentPageChanged.connect(lambda year, month: self.update_detection_markers())
         
-    def add_detection_date(self, date):
-        if isinstance(date, datetime.date):
-            qdate = QDate(date.year, date.month, date.day)
-        else:
-            qdate = date
-            
-        self.detection_dates.add(qdate)
+    @property
+    def detection_dates(self):
+        return self.day_counts.keys()
+        
+    def set_detection_counts(self, day_counts):
+        """Replace the per-day detection counts, e.g. from the store's day index"""
+        self.day_counts = dict(day_counts)
+        self.scale_count = max(self.day_counts.values(), default=0)
         self.update_detection_markers()
         
+    def add_detection_date(self, date, count=1):
+        if isinstance(date, QDate):
+            date = date.toPyDate()
+            
+        total = self.day_counts.get(date, 0) + count
+        self.day_counts[date] = total
+        if total > self.scale_count * 1.25:
+            # Markers are relative to the busiest day; rescale in steps, not per detection
+            self.scale_count = total
+            self.update_detection_markers()
+        else:
+            self.mark_date(date)
+        
+    def visible_range(self):
+        """First and last date the month grid can show, including spill-over weeks"""
+        first = datetime.date(self.yearShown(), self.monthShown(), 1)
+        return first - datetime.timedelta(days=7), first + datetime.timedelta(days=42)
+        
     def update_detection_markers(self):
-        for date in self.detection_dates:
-            format = self.dateTextFormat(date)
-            format.setBackground(QColor(231, 76, 60, 100))
-            self.setDateTextFormat(date, format)
+        """Re-mark the page on screen; cost is bounded by the grid, not the history"""
+        for qdate in list(self.marked):
+            self.setDateTextFormat(qdate, QTextCharFormat())
+        self.marked.clear()
+        
+        start, end = self.visible_range()
+        date = start
+        while date <= end:
+            if date in self.day_counts:
+                self.mark_date(date)
+            date += datetime.timedelta(days=1)
+            
+    def mark_date(self, date):
+        start, end = self.visible_range()
+        if not start <= date <= end:
+            return
+        qdate = QDate(date.year, date.month, date.day)
+        count = self.day_counts[date]
+        alpha = 60 + int(180 * min(1.0, math.log1p(count) / math.log1p(max(self.scale_count, 1))))
+        if self.marked.get(qdate) == (alpha, count):
+            return
+        format = QTextCharFormat()
+        format.setBackground(QColor(231, 76, 60, alpha))
+        format.setToolTip(f"{count} detection{'s' if count != 1 else ''}")
+        self.setDateTextFormat(qdate, format)
+        self.marked[qdate] = (alpha, count)
 
 # Main VIPERS UI Class
 class VIPERS_UI(QMainWindow):
@@ -321,7 +920,7 @@ class VIPERS_UI(QMainWindow):
                 color: #232526;
                 border-bottom: 4px solid #16a085;
             }
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QTableView#list_view {
                 background: #232526;
                 color: #ecf0f1;
                 border: 1.5px solid #16a085;
@@ -438,6 +1037,8 @@ class VIPERS_UI(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("System Ready")
+        self.governor_label = QLabel("")
+        self.statusBar.addPermanentWidget(self.governor_label)
         
         # Create header with title and mode selection
         header_layout = QHBoxLayout()
@@ -491,22 +1092,26 @@ class VIPERS_UI(QMainWindow):
         
         # Video display with tabs for different views
         video_tabs = QTabWidget()
+        self.video_tabs = video_tabs
         
         # Main camera view
         self.video_frame = VideoFrame()
         video_tabs.addTab(self.video_frame, "Main Camera")
         
-        # Thermal view (placeholder)
-        thermal_frame = QLabel("Thermal View Not Available")
-        thermal_frame.setStyleSheet("background-color: #000000; color: #ecf0f1;")
-        thermal_frame.setAlignment(Qt.AlignCenter)
-        video_tabs.addTab(thermal_frame, "Thermal")
+        # Thermal view (false colour of the live frames)
+        self.thermal_frame = VideoFrame()
+        self.thermal_frame.setText("Thermal View - Shows false-colour intensity of live frames")
+        video_tabs.addTab(self.thermal_frame, "Thermal")
         
         # Detection view (processed)
         self.detection_view_frame = VideoFrame()
         self.detection_view_frame.setText("Detection View - Shows processed frames with detections")
         video_tabs.addTab(self.detection_view_frame, "Detection View")
         
+        # Mosaic of additional camera sources
+        self.mosaic_view = MosaicView()
+        video_tabs.addTab(self.mosaic_view, "Mosaic")
+        
         left_layout.addWidget(video_tabs)
         
         # Video controls
@@ -549,6 +1154,11 @@ class VIPERS_UI(QMainWindow):
         self.stop_button.setEnabled(False)
         playback_layout.addWidget(self.stop_button)
         
+        self.speed_combo = QComboBox()
+        self.speed_combo.addItems([f"{speed}x" for speed in config.PLAYBACK_SPEEDS])
+        playback_layout.addWidget(QLabel("Speed:"))
+        playback_layout.addWidget(self.speed_combo)
+        
         controls_layout.addLayout(playback_layout)
         
         # Detection settings
@@ -612,7 +1222,18 @@ class VIPERS_UI(QMainWindow):
         detection_list_group = QGroupBox("Detection Events")
         detection_list_layout = QVBoxLayout(detection_list_group)
         detection_list_layout.setSpacing(8)
-        self.detection_list = QListWidget()
+        detection_filter_layout = QHBoxLayout()
+        self.detection_label_filter = QComboBox()
+        self.detection_label_filter.addItems(["All labels"] + config.DETECTION_LABELS[1:])
+        self.detection_all_dates_button = QPushButton("All Dates")
+        self.detection_filter_status = QLabel("All dates")
+        detection_filter_layout.addWidget(self.detection_label_filter)
+        detection_filter_layout.addWidget(self.detection_all_dates_button)
+        detection_filter_layout.addWidget(self.detection_filter_status, 1)
+        detection_list_layout.addLayout(detection_filter_layout)
+        thumbnail_height = config.DETECTION_THUMBNAIL_WIDTH * 9 // 16
+        self.detection_list = table_list_view(None, thumbnail_height + 4)
+        self.detection_list.setIconSize(QSize(config.DETECTION_THUMBNAIL_WIDTH, thumbnail_height))
         detection_list_layout.addWidget(self.detection_list)
         detections_layout.addWidget(detection_list_group)
         
@@ -624,16 +1245,44 @@ class VIPERS_UI(QMainWindow):
         logs_layout.setContentsMargins(10, 10, 10, 10)
         logs_layout.setSpacing(10)
         
-        # Log viewer
-        self.log_viewer = QTextEdit()
-        self.log_viewer.setReadOnly(True)
+        # Log viewer; only the rows on screen are ever laid out
+        self.log_model = LogModel(config.LOG_VIEW_LINES)
+        self.log_viewer = table_list_view(self.log_model)
         logs_layout.addWidget(QLabel("System Logs"))
-        logs_layout.addWidget(self.log_viewer)
+        logs_layout.addWidget(self.log_viewer, 3)
         # Add Clear Logs button
         self.clear_logs_button = QPushButton("Clear Logs")
         self.clear_logs_button.clicked.connect(self.clear_logs)
         logs_layout.addWidget(self.clear_logs_button)
         
+        # Search over every indexed log file, not just this session
+        log_search_group = QGroupBox("Search Log History")
+        log_search_layout = QGridLayout(log_search_group)
+        self.log_search_text = QLineEdit()
+        self.log_search_text.setPlaceholderText("Words to find")
+        self.log_search_text.returnPressed.connect(self.search_logs)
+        log_search_layout.addWidget(self.log_search_text, 0, 0, 1, 3)
+        self.log_search_level = QComboBox()
+        self.log_search_level.addItems(["All levels", "INFO", "WARNING", "ERROR", "DETECTION"])
+        log_search_layout.addWidget(self.log_search_level, 0, 3)
+        self.log_search_from = QDateEdit(QDate.currentDate().addDays(-30))
+        self.log_search_from.setCalendarPopup(True)
+        self.log_search_to = QDateEdit(QDate.currentDate())
+        self.log_search_to.setCalendarPopup(True)
+        log_search_layout.addWidget(QLabel("From:"), 1, 0)
+        log_search_layout.addWidget(self.log_search_from, 1, 1)
+        log_search_layout.addWidget(QLabel("To:"), 1, 2)
+        log_search_layout.addWidget(self.log_search_to, 1, 3)
+        self.log_search_button = QPushButton("Search")
+        self.log_search_button.clicked.connect(self.search_logs)
+        log_search_layout.addWidget(self.log_search_button, 2, 3)
+        self.log_search_status = QLabel("")
+        log_search_layout.addWidget(self.log_search_status, 2, 0, 1, 3)
+        self.log_search_model = LogModel(config.LOG_SEARCH_LIMIT)
+        self.log_search_results = table_list_view(self.log_search_model)
+        log_search_layout.addWidget(self.log_search_results, 3, 0, 1, 4)
+        logs_layout.addWidget(log_search_group, 2)
+        
         right_panel.addTab(logs_tab, "Logs")
         
         # Alerts tab
@@ -671,14 +1320,30 @@ class VIPERS_UI(QMainWindow):
         camera_settings_layout.addWidget(QLabel("Resolution:"), 1, 0)
         self.resolution_combo = QComboBox()
         self.resolution_combo.addItems(["640x480", "1280x720", "1920x1080"])
+        self.resolution_combo.setCurrentText(f"{config.VIDEO_WIDTH}x{config.VIDEO_HEIGHT}")
         camera_settings_layout.addWidget(self.resolution_combo, 1, 1)
         
         camera_settings_layout.addWidget(QLabel("Frame Rate:"), 2, 0)
         self.fps_spinbox = QSpinBox()
         self.fps_spinbox.setRange(1, 60)
-        self.fps_spinbox.setValue(30)
+        self.fps_spinbox.setValue(config.FPS)
         camera_settings_layout.addWidget(self.fps_spinbox, 2, 1)
         
+        camera_settings_layout.addWidget(QLabel("Display Rate:"), 3, 0)
+        self.display_fps_spinbox = QSpinBox()
+        self.display_fps_spinbox.setRange(1, 60)
+        self.display_fps_spinbox.setValue(config.DISPLAY_FPS)
+        self.display_fps_spinbox.setSuffix(" fps")
+        camera_settings_layout.addWidget(self.display_fps_spinbox, 3, 1)
+        
+        camera_settings_layout.addWidget(QLabel("Idle After:"), 4, 0)
+        self.idle_spinbox = QSpinBox()
+        self.idle_spinbox.setRange(0, 3600)
+        self.idle_spinbox.setValue(config.IDLE_QUIET_SECONDS)
+        self.idle_spinbox.setSuffix(" s quiet")
+        self.idle_spinbox.setSpecialValueText("Never")
+        camera_settings_layout.addWidget(self.idle_spinbox, 4, 1)
+        
         settings_layout.addWidget(camera_settings_group)
         
         # Detection settings
@@ -704,6 +1369,13 @@ class VIPERS_UI(QMainWindow):
         self.nms_slider.setValue(50)
         detection_settings_layout.addWidget(self.nms_slider, 2, 1)
         
+        detection_settings_layout.addWidget(QLabel("Latency Budget:"), 3, 0)
+        self.latency_budget_spinbox = QSpinBox()
+        self.latency_budget_spinbox.setRange(5, 1000)
+        self.latency_budget_spinbox.setValue(config.LATENCY_BUDGET_MS)
+        self.latency_budget_spinbox.setSuffix(" ms")
+        detection_settings_layout.addWidget(self.latency_budget_spinbox, 3, 1)
+        
         settings_layout.addWidget(detection_settings_group)
         
         # Storage settings
@@ -727,6 +1399,10 @@ class VIPERS_UI(QMainWindow):
         storage_settings_layout.addWidget(self.auto_delete_days, 1, 1)
         storage_settings_layout.addWidget(QLabel("days"), 1, 2)
         
+        self.proxy_checkbox = QCheckBox("Write low-resolution proxy")
+        self.proxy_checkbox.setChecked(config.PROXY_ENABLED)
+        storage_settings_layout.addWidget(self.proxy_checkbox, 2, 0, 1, 3)
+        
         settings_layout.addWidget(storage_settings_group)
         
         right_panel.addTab(settings_tab, "Settings")
@@ -756,6 +1432,17 @@ class VIPERS_UI(QMainWindow):
         self.logs_dir = "logs"
         if not os.path.exists(self.logs_dir):
             os.makedirs(self.logs_dir)
+        self.log_sink = LogSink(self.logs_dir, config.LOG_FLUSH_INTERVAL,
+                                max_bytes=config.LOG_MAX_MB * 1024 * 1024,
+                                console_per_second=config.LOG_CONSOLE_PER_SECOND)
+        self.log_sink.start()
+        self.log_index = LogIndex(os.path.join(self.logs_dir, config.LOG_INDEX_FILE), self.logs_dir,
+                                  config.LOG_INDEX_INTERVAL)
+        self.log_index.start()
+        self._pending_log = []
+        self.log_timer = QTimer()
+        self.log_timer.timeout.connect(self.flush_log_view)
+        self.log_timer.start(config.LOG_UI_INTERVAL_MS)
             
         # Create recordings directory if it doesn't exist
         self.recordings_dir = "recordings"
@@ -763,17 +1450,79 @@ class VIPERS_UI(QMainWindow):
             os.makedirs(self.recordings_dir)
             
         # Detection data
-        self.detected_frames = []
-        self.detection_frame_indices = []
-        self.detection_timestamps = []
+        self.detected_frames = DetectedFrameStore(config.DETECTED_FRAMES_DIRECTORY,
+                                                  config.DETECTED_FRAMES_MEMORY_MB * 1024 * 1024,
+                                                  config.DETECTED_FRAMES_DISK_MB * 1024 * 1024,
+                                                  config.DETECTED_FRAMES_MAX_AGE_DAYS * 86400,
+                                                  config.DETECTED_FRAMES_QUALITY)
+        self.detection_history = DetectionHistory()
         self.detection_video = 'detections.avi'
         self.detections_data_file = 'detections.json'
+        self.detection_journal = DetectionJournal(journal_path_for(self.detections_data_file),
+                                                  config.JOURNAL_FLUSH_INTERVAL,
+                                                  max_records=config.JOURNAL_MAX_RECORDS,
+                                                  compact_records=config.JOURNAL_COMPACT_RECORDS)
+        self.detection_store = DetectionStore(config.DETECTION_DB_FILE)
+        self.detection_model = DetectionEventModel(self.detection_store, self.detected_frames,
+                                                   config.DETECTION_PAGE_SIZE,
+                                                   config.DETECTION_THUMBNAIL_WIDTH)
+        self.detection_list.setModel(self.detection_model)
+        self.detection_list_timer = QTimer()
+        self.detection_list_timer.timeout.connect(self.detection_model.flush_pending)
+        self.detection_list_timer.start(config.DETECTION_LIST_INTERVAL_MS)
         self.playback_mode = False
         self.recording = None
         self.is_recording = False
         self.frame_count = 0
         self.current_recording_file = None
         self.total_frames = 0
+        self.playback_speed = 1
+        self.playback_position = 0
+        self._cap_position = None
+        self.frame_cache = FrameCache(config.FRAME_CACHE_MB * 1024 * 1024)
+        self.frame_prefetcher = None
+        self.proxy_recording = None
+        self.proxy_cap = None
+        self._proxy_position = None
+        self._proxy_frame = None  # (proxy index, frame) last read from the proxy
+        self._showing_proxy = False
+        self.thumbnail_strip = None
+        self.thumbnail_threads = []
+        self.export_thread = None
+        self._last_render = None
+        self._live_detections = ([], [])
+        self._live_capture_time = 0.0
+        self._last_detected_objects = []
+        self._governor_label_time = 0.0
+        self.governor = LatencyGovernor(self.latency_budget_spinbox.value(), config.DETECTION_SCALES,
+                                        config.MAX_DETECTION_STRIDE, config.GOVERNOR_WINDOW)
+        self.motion_sensor = MotionSensor()
+        self.activity_monitor = ActivityMonitor(self.idle_spinbox.value())
+        
+        # Sinks see detection events, not every frame with a box
+        self.event_coalescer = EventCoalescer(config.EVENT_GAP_SECONDS, config.EVENT_MAX_SECONDS)
+        self.event_coalescer.add_sink(self.store_event_frame)
+        self.event_coalescer.add_sink(self.store_detection_event)
+        self.event_coalescer.add_sink(self.detection_model.add_live_event)
+        self.event_coalescer.add_sink(self.log_detection_event)
+        self.event_coalescer.add_sink(self.alert_detection_event)
+        self.capture_manager = CaptureManager()
+        self.live_source_id = None
+        self.live_source = 0  # camera index or stream URL used by Start Detection
+        self._live_sequence = 0
+        self.mosaic_sources = []
+        self._mosaic_first = 0  # Tile whose detection goes first next tick
+        self.mosaic_timer = QTimer()
+        self.mosaic_timer.timeout.connect(self.update_mosaic)
+        
+        # Every live frame is decoded once and shared by these consumers
+        self.frame_bus = FrameBus()
+        self.frame_bus.subscribe("motion", self.sense_motion, width=config.MOTION_WIDTH)
+        self.frame_bus.subscribe("detection", self.process_live_frame)
+        self.display_subscription = self.frame_bus.subscribe(
+            "display", self.render_live_frame, fps=self.display_fps_spinbox.value())
+        self.thermal_subscription = self.frame_bus.subscribe(
+            "thermal", self.render_thermal_frame, fps=config.THERMAL_FPS, width=config.THERMAL_WIDTH)
         
         # Load existing detection data
         self.load_detection_data()
@@ -796,9 +1545,27 @@ class VIPERS_UI(QMainWindow):
     
     def on_close(self, event):
         """Handle application close event"""
-        self.save_detection_data()
+        self.stop_frame_prefetch()
+        self.mosaic_timer.stop()
+        self.capture_manager.stop_all()
+        for thread in list(self.thumbnail_threads):
+            thread.stop()
+        if self.export_thread is not None:
+            self.export_thread.export_finished.disconnect(self.detection_export_finished)
+            self.export_thread.wait()
+        self.event_coalescer.flush()
+        self.detection_journal.close()
+        
+        # Nothing may page the events list from the store once it is closed
+        self.detection_store.events_backfilled.disconnect(self.detection_events_backfilled)
+        self.detection_list.setModel(None)
+        self.detection_store.close()
+        self.detected_frames.close()
         self.cache_ui_state()
         self.log_message("Application closing - data saved")
+        self.log_timer.stop()
+        self.log_sink.close()
+        self.log_index.close()
         event.accept()
         
     def create_menu_bar(self):
@@ -819,6 +1586,10 @@ class VIPERS_UI(QMainWindow):
         export_action.triggered.connect(self.export_detections)
         file_menu.addAction(export_action)
         
+        add_mosaic_action = QAction("Add Camera to Mosaic", self)
+        add_mosaic_action.triggered.connect(self.add_mosaic_source)
+        file_menu.addAction(add_mosaic_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("Exit", self)
@@ -828,6 +1599,29 @@ class VIPERS_UI(QMainWindow):
         # View menu
         view_menu = menubar.addMenu("View")
         
+        capture_stats_action = QAction("Capture Statistics", self)
+        capture_stats_action.triggered.connect(self.show_capture_stats)
+        view_menu.addAction(capture_stats_action)
+        
+        # Playback menu
+        playback_menu = menubar.addMenu("Playback")
+        
+        step_forward_action = QAction("Step Forward", self)
+        step_forward_action.setShortcut(".")
+        step_forward_action.triggered.connect(lambda: self.step_frame(1))
+        playback_menu.addAction(step_forward_action)
+        
+        step_backward_action = QAction("Step Backward", self)
+        step_backward_action.setShortcut(",")
+        step_backward_action.triggered.connect(lambda: self.step_frame(-1))
+        playback_menu.addAction(step_backward_action)
+        
+        playback_menu.addSeparator()
+        
+        cache_stats_action = QAction("Frame Cache Stats", self)
+        cache_stats_action.triggered.connect(self.show_frame_cache_stats)
+        playback_menu.addAction(cache_stats_action)
+        
         # Tools menu
         tools_menu = menubar.addMenu("Tools")
         
@@ -868,9 +1662,15 @@ class VIPERS_UI(QMainWindow):
         self.stop_button.clicked.connect(self.stop_video)
         self.video_slider.sliderMoved.connect(self.seek_video)
         self.video_slider.clicked.connect(self.seek_video)
+        self.speed_combo.currentIndexChanged.connect(self.playback_speed_changed)
+        self.video_tabs.currentChanged.connect(self.video_tab_changed)
+        self.display_fps_spinbox.valueChanged.connect(self.display_fps_changed)
+        self.latency_budget_spinbox.valueChanged.connect(self.latency_budget_changed)
+        self.idle_spinbox.valueChanged.connect(self.idle_period_changed)
+        self.mosaic_view.tile_clicked.connect(self.promote_mosaic_source)
         
         # Connect log viewer to click handler
-        self.log_viewer.mousePressEvent = self.log_viewer_clicked
+        self.log_viewer.clicked.connect(self.log_viewer_clicked)
         
         # Connect checkboxes
         self.grid_checkbox.stateChanged.connect(self.toggle_grid)
@@ -885,7 +1685,10 @@ class VIPERS_UI(QMainWindow):
         self.calendar.date_clicked.connect(self.load_date_detections)
         
         # Connect detection list
-        self.detection_list.itemClicked.connect(self.jump_to_detection)
+        self.detection_list.clicked.connect(self.jump_to_detection)
+        self.detection_label_filter.currentIndexChanged.connect(self.filter_detection_list)
+        self.detection_all_dates_button.clicked.connect(lambda: self.filter_detection_list(day=None))
+        self.detection_store.events_backfilled.connect(self.detection_events_backfilled)
         
         # Connect camera source combo
         self.camera_source.currentIndexChanged.connect(self.camera_source_changed)
@@ -894,11 +1697,9 @@ class VIPERS_UI(QMainWindow):
         self.browse_button.clicked.connect(self.browse_storage_path)
         
     def start_detection(self):
-        if self.cap is not None and self.cap.isOpened():
+        if self.live_source_id is not None:
             # Stop current capture
-            self.timer.stop()
-            self.cap.release()
-            self.cap = None
+            self.stop_live_source()
             self.start_stop_button.setText("Start Detection")
             self.log_message("Detection stopped")
             return
@@ -906,23 +1707,27 @@ class VIPERS_UI(QMainWindow):
         # Initialize video processing if not already done
         self.initialize_video_processing()
         
-        # Start new capture
-        self.cap = cv2.VideoCapture(0)  # Use default camera
-        if not self.cap.isOpened():
-            self.log_message("Error: Could not open camera", "error")
-            self.alert_panel.add_alert("Failed to open camera", "critical")
-            return
+        # Release any recording opened for playback
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        
+        # Start new capture on its own reader thread
+        self.start_live_source(self.live_source)
             
         # Reset detection data
-        self.detected_frames = []
-        self.detection_frame_indices = []
-        self.detection_timestamps = []
+        self.detection_history = DetectionHistory()
         self.start_time = datetime.datetime.now()
         self.frame_count = 0
         
-        # Start timer for frame updates - adjust based on performance
-        frame_interval = max(33, 1000 // self.fps_spinbox.value())  # Ensure minimum 30fps
-        self.timer.start(frame_interval)  # Update every frame_interval ms
+        self.governor.reset()
+        self._last_detected_objects = []
+        self.motion_sensor.reset()
+        self.activity_monitor.reset()
+        
+        self.timer.timeout.disconnect()
+        self.timer.timeout.connect(self.update_frame)
+        self.timer.start(self.live_poll_interval())
         self.start_stop_button.setText("Stop Detection")
         
         # Update UI
@@ -935,8 +1740,74 @@ class VIPERS_UI(QMainWindow):
         self.alert_panel.add_alert("Detection started - Monitoring for objects", "info")
         self.statusBar.showMessage("Live Detection Active")
         
+    def requested_camera_mode(self):
+        """Capture mode from the camera settings, applied when a camera is opened"""
+        width, height = (int(v) for v in self.resolution_combo.currentText().split("x"))
+        return {
+            'width': width,
+            'height': height,
+            'fps': self.fps_spinbox.value(),
+            'fourcc': config.VIDEO_CODEC,
+            'buffer_size': config.CAMERA_BUFFER_SIZE,
+        }
+        
+    def live_poll_interval(self):
+        """Timer interval for the live pipeline"""
+        # Twice the capture rate, so timer jitter never makes a frame wait a whole extra interval
+        fps = config.IDLE_FPS if self.activity_monitor.idle else self.fps_spinbox.value()
+        return max(1, 500 // fps)
+        
+    def start_live_source(self, source):
+        """Make a capture manager source the one the live pipeline reads from"""
+        # Only cameras negotiate a mode; files and streams don't take one
+        options = {'mode': self.requested_camera_mode()} if isinstance(source, int) else {}
+        self.live_source_id = self.capture_manager.add_source(source, **options)
+        self.capture_manager.get(self.live_source_id).state_changed.connect(self.capture_state_changed)
+        self._live_sequence = 0
+        
+    def stop_live_source(self):
+        self.timer.stop()
+        self.event_coalescer.flush()
+        if self.live_source_id is not None:
+            self.capture_manager.remove_source(self.live_source_id)
+            self.live_source_id = None
+            
+    def capture_state_changed(self, source_id, state):
+        reader = self.capture_manager.get(source_id)
+        if reader is None:
+            return
+        if state == "reconnecting":
+            if reader.frames_read == 0 and reader.reconnects == 0:
+                self.log_message(f"Error: Could not open capture source {reader.source}", "error")
+                self.alert_panel.add_alert("Failed to open camera", "critical")
+            elif reader.reconnects == 0:
+                self.log_message(f"Capture source {reader.source} lost - reconnecting", "warning")
+                self.alert_panel.add_alert("Camera connection lost", "warning")
+        elif state == "running" and reader.reconnects > 0:
+            self.log_message(f"Capture source {reader.source} reconnected")
+        elif state == "running" and reader.camera_mode is not None:
+            mode = describe_camera_mode(reader.camera_mode)
+            if reader.camera_mode['matched']:
+                self.log_message(f"Camera mode: {mode}")
+            else:
+                requested = describe_camera_mode(reader.requested_mode)
+                self.log_message(f"Camera mode: {mode} (requested {requested})", "warning")
+            
+    def show_capture_stats(self):
+        for source_id, stats in self.capture_manager.stats().items():
+            role = "live" if source_id == self.live_source_id else "mosaic"
+            self.log_message(f"{source_id} ({role}): {stats['state']}, {stats['fps']:.1f} fps, "
+                             f"{stats['frames']} frames, {stats['dropped']} dropped, "
+                             f"{stats['reconnects']} reconnects")
+            if stats['mode'] is not None:
+                self.log_message(f"{source_id}: camera mode {describe_camera_mode(stats['mode'])}")
+            if 'lag_ms' in stats:
+                self.log_message(f"{source_id}: {stats['lag_ms']:.0f} ms behind live, "
+                                 f"{stats['backlog_discarded']} buffered frames skipped")
+            
     def toggle_recording(self):
-        if not self.cap or not self.cap.isOpened():
+        live_source = self.capture_manager.get(self.live_source_id) if self.live_source_id else None
+        if not self.is_recording and (live_source is None or live_source.frame_size is None):
             self.log_message("Cannot record: No active camera")
             return
             
@@ -945,6 +1816,9 @@ class VIPERS_UI(QMainWindow):
             if self.recording:
                 self.recording.release()
                 self.recording = None
+            if self.proxy_recording:
+                self.proxy_recording.release()
+                self.proxy_recording = None
             self.is_recording = False
             self.record_button.setText("Record")
             self.log_message("Recording stopped")
@@ -956,10 +1830,10 @@ class VIPERS_UI(QMainWindow):
             if self.current_recording_file and os.path.exists(self.current_recording_file):
                 self.play_button.setEnabled(True)
                 self.log_message("Recording saved successfully")
+                self.generate_thumbnail_strip(self.current_recording_file)
         else:
             # Start recording
-            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            width, height = live_source.frame_size
             
             # Generate filename with timestamp
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -980,101 +1854,125 @@ class VIPERS_UI(QMainWindow):
                 self.log_message("Error: Could not initialize video writer", "error")
                 return
             
+            # Low-resolution, low-fps proxy for remote review and scrubbing
+            self.recorded_frame_count = 0
+            if self.proxy_checkbox.isChecked():
+                self.open_proxy_writer(fourcc, fps, width, height)
+            
             self.is_recording = True
+            if self.activity_monitor.idle:
+                self.update_activity(True)
             self.record_button.setText("Stop Recording")
             self.log_message(f"Started recording to {self.current_recording_file}")
             self.alert_panel.add_alert("Recording started", "info")
             self.video_frame.recording = True
             self.video_frame.update()
             
+    def open_proxy_writer(self, fourcc, fps, width, height):
+        """Start the proxy writer that runs alongside the current recording"""
+        proxy_file = proxy_path_for(self.current_recording_file)
+        os.makedirs(os.path.dirname(proxy_file), exist_ok=True)
+            
+        # Keep every Nth frame so proxy frames line up with recorded ones
+        self.proxy_frame_step = max(1, round(fps / config.PROXY_FPS))
+        self.proxy_size = proxy_frame_size(width, height, config.PROXY_WIDTH)
+        self.proxy_recording = cv2.VideoWriter(proxy_file, fourcc, fps / self.proxy_frame_step, self.proxy_size)
+        
+        if not self.proxy_recording.isOpened():
+            self.log_message("Warning: Could not initialize proxy writer", "warning")
+            self.proxy_recording = None
+            
     def update_frame(self):
-        if not self.cap or not self.cap.isOpened():
+        if self.live_source_id is None:
             return
             
-        ret, frame = self.cap.read()
-        if not ret:
-            self.log_message("Error: Failed to capture frame", "error")
-            self.timer.stop()
+        # Take the newest frame; the reader thread reconnects on its own
+        sequence, frame = self.capture_manager.latest_frame(self.live_source_id)
+        if frame is None or sequence == self._live_sequence:
             return
-            
+        self._live_sequence = sequence
+        self._live_capture_time = self.capture_manager.get(self.live_source_id).frame_time
+        
+        # Consumers that are not on screen are skipped before any scaling
+        self.thermal_subscription.enabled = self.view_is_visible(self.thermal_frame)
+        self.frame_bus.publish(frame)
+        
+    def process_live_frame(self, shared):
+        """Frame bus consumer: detection, storage and recording at full rate"""
+        frame = shared.data
+        
         # Increment frame counter
         self.frame_count += 1
         
         # Get detection type from combo box
         detection_type = self.detection_combo.currentText()
         
-        # Initialize detection boxes and labels
-        detection_boxes = []
-        detection_labels = []
-        
-        # Process frame based on detection type
-        if detection_type == "Face Detection":
-            detected_objects, processed_frame = self.detect_faces(frame.copy())
-        elif detection_type == "Drone Detection":
-            detected_objects, processed_frame = self.detect_drones(frame.copy())
-        elif detection_type == "Person Detection":
-            detected_objects, processed_frame = self.detect_persons(frame.copy())
-        elif detection_type == "Vehicle Detection":
-            detected_objects, processed_frame = self.detect_vehicles(frame.copy())
-        else:  # All Objects
-            detected_objects, processed_frame = self.detect_all_objects(frame.copy())
+        # The governor decides whether this frame is detected, and at what resolution
+        new_detections = self.governor.should_detect()
+        if new_detections:
+            start = time.perf_counter()
+            scale = self.governor.scale
+            detect_frame = frame if scale == 1.0 else cv2.resize(frame, None, fx=scale, fy=scale,
+                                                                 interpolation=cv2.INTER_AREA)
+            detected_objects, _ = self.detect_objects(detect_frame, detection_type)
+            detected_objects = scale_detections(detected_objects, 1.0 / scale)
+            decision = self.governor.record((time.perf_counter() - start) * 1000)
+            if decision:
+                self.log_message(f"Detection governor: {decision}")
+            self._last_detected_objects = detected_objects
+        else:
+            # Frames between detector runs keep the last boxes
+            detected_objects = self._last_detected_objects
+        processed_frame = frame
         
         # Convert detections to relative coordinates for display
-        for obj in detected_objects:
-            x, y, w, h = obj['box']
-            rel_x = x / frame.shape[1]
-            rel_y = y / frame.shape[0]
-            rel_w = w / frame.shape[1]
-            rel_h = h / frame.shape[0]
-            
-            detection_boxes.append((rel_x, rel_y, rel_w, rel_h))
-            detection_labels.append(obj['label'])
-        
-        # If we have detections, store this frame and update calendar
-        if detection_boxes:
-            # Store detection data
-            self.detected_frames.append(frame.copy())
-            self.detection_frame_indices.append(self.frame_count)
-            self.detection_timestamps.append(datetime.datetime.now())
+        detection_boxes, detection_labels = relative_boxes(detected_objects, frame.shape)
+        
+        if new_detections and detection_boxes:
+            self.update_activity(True)
+        
+        # Rows and events carry the recording frame when recording, for seeking back to them
+        if self.is_recording and self.recording:
+            recording, frame_index = self.current_recording_file, self.recorded_frame_count
+        else:
+            recording, frame_index = None, self.frame_count
+            
+        # Per-frame hits are merged into events before they reach the list, log and alerts
+        timestamp = datetime.datetime.now()
+        if new_detections:
+            # Published frames are read-only and full-size ones are never pooled,
+            # so an event can hold on to its best frame
+            self.event_coalescer.update(timestamp, frame_index, epoch_ms(timestamp),
+                                        detected_objects if detection_boxes else [], frame,
+                                        str(self.live_source), recording)
+        else:
+            self.event_coalescer.expire(timestamp)
+        
+        # If we have detections, store them and update calendar
+        if detection_boxes and new_detections:
+            records = detection_records(timestamp, self.frame_count, detection_labels, detection_boxes)
+            self.detection_history.extend(records)
+            self.detection_journal.append(records)
+            self.detection_store.add_event(timestamp, str(self.live_source), recording, frame_index,
+                                           detected_objects, detection_boxes)
             
             # Add to calendar
-            current_date = datetime.datetime.now().date()
-            self.calendar.add_detection_date(current_date)
-            
-            # Update detection list
-            self.add_detection_to_list(detection_boxes, detection_labels)
+            self.calendar.add_detection_date(timestamp.date(), len(detection_boxes))
             
             # Update the slider with detection points if in playback mode
             if self.playback_mode and hasattr(self, 'video_slider'):
-                self.video_slider.set_detection_points(self.detection_frame_indices)
-            
-            # Log detection
-            detection_msg = f"Detected {len(detection_boxes)} {detection_type.lower()}(s)"
-            self.log_message(detection_msg, "detection")
-            
-            # Show alert
-            self.alert_panel.add_alert(f"Detection: {len(detection_boxes)} objects found", "warning")
+                self.video_slider.set_detection_points(self.detection_history.frames)
         
-        # Save frame to recording if active
+        # Save frame to recording if active, with the detections burned in
         if self.is_recording and self.recording:
-            self.recording.write(processed_frame)
+            recorded_frame = draw_detections(processed_frame.copy(), detected_objects)
+            self.recording.write(recorded_frame)
+            if self.proxy_recording and self.recorded_frame_count % self.proxy_frame_step == 0:
+                self.proxy_recording.write(cv2.resize(recorded_frame, self.proxy_size,
+                                                      interpolation=cv2.INTER_AREA))
+            self.recorded_frame_count += 1
             
-        # Update detection boxes in video frame
-        self.video_frame.set_detection_boxes(detection_boxes, detection_labels)
-        
-        # Convert frame to QImage and display (use processed frame for better visualization)
-        rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        image = QImage(rgb_frame.data, w, h, w * ch, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(image)
-        
-        # Scale pixmap to fit the video frame while maintaining aspect ratio
-        scaled_pixmap = pixmap.scaled(self.video_frame.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.video_frame.setPixmap(scaled_pixmap)
-        
-        # Also update detection view frame
-        self.detection_view_frame.setPixmap(scaled_pixmap)
-        self.detection_view_frame.set_detection_boxes(detection_boxes, detection_labels)
+        self._live_detections = (detection_boxes, detection_labels)
         
         # Update time display
         if hasattr(self, 'start_time'):
@@ -1083,6 +1981,90 @@ class VIPERS_UI(QMainWindow):
             minutes, seconds = divmod(remainder, 60)
             self.time_label.setText(f"{hours:02}:{minutes:02}:{seconds:02}")
         
+    def view_is_visible(self, view):
+        """Hidden tabs and minimized windows don't need rendering"""
+        return not self.isMinimized() and view.isVisible() and not view.visibleRegion().isEmpty()
+        
+    def sense_motion(self, shared):
+        """Frame bus consumer on a tiny copy of every frame, running even when idle"""
+        self.update_activity(self.motion_sensor.update(shared.data))
+        
+    def update_activity(self, active):
+        # Recordings must keep the real frame rate, so recording counts as activity
+        change = self.activity_monitor.update(active or self.is_recording, time.monotonic())
+        if change == "idle":
+            self.set_live_idle(True)
+            self.log_message(f"No activity for {self.activity_monitor.quiet_seconds} s - "
+                             f"camera idling at {config.IDLE_FPS} fps")
+        elif change == "active":
+            self.set_live_idle(False)
+            self.log_message("Activity detected - camera back to full rate")
+            
+    def set_live_idle(self, idle):
+        """Drop capture, detection and polling to the idle rate, or restore them"""
+        reader = self.capture_manager.get(self.live_source_id) if self.live_source_id else None
+        if reader is not None:
+            reader.set_rate_limit(config.IDLE_FPS if idle else None)
+        if self.timer.isActive() and not self.playback_mode:
+            self.timer.setInterval(self.live_poll_interval())
+            
+    def idle_period_changed(self, seconds):
+        self.activity_monitor.quiet_seconds = seconds
+        if seconds == 0 and self.activity_monitor.idle:
+            self.update_activity(True)
+            
+    def render_live_frame(self, shared):
+        """Frame bus consumer at the display rate"""
+        self.render_views(shared.data, *self._live_detections)
+        
+        # Governor state and the resulting capture-to-display latency, twice a second
+        now = time.monotonic()
+        if now - self._governor_label_time >= 0.5:
+            self._governor_label_time = now
+            latency = (now - self._live_capture_time) * 1000
+            idle = "Idle | " if self.activity_monitor.idle else ""
+            self.governor_label.setText(f"{idle}{self.governor.status()} | {latency:.0f} ms latency")
+        
+    def render_thermal_frame(self, shared):
+        """Frame bus consumer at reduced rate and resolution"""
+        self.thermal_frame.set_detection_boxes(*self._live_detections)
+        self.thermal_frame.set_frame(thermal_image(shared.data))
+        
+    def display_fps_changed(self, fps):
+        self.display_subscription.fps = fps
+        
+    def latency_budget_changed(self, budget_ms):
+        self.governor.budget_ms = budget_ms
+        
+    def render_views(self, frame, detection_boxes, detection_labels):
+        """Push a processed frame to the visible views"""
+        self._last_render = (frame, detection_boxes, detection_labels)
+        for view in (self.video_frame, self.detection_view_frame):
+            if self.view_is_visible(view):
+                view.set_detection_boxes(detection_boxes, detection_labels)
+                view.set_frame(frame)
+                
+    def video_tab_changed(self, index):
+        # A view that was skipped while hidden shows the latest frame right away
+        view = self.video_tabs.widget(index)
+        if self._last_render and view in (self.video_frame, self.detection_view_frame) and not self.playback_mode:
+            frame, detection_boxes, detection_labels = self._last_render
+            view.set_detection_boxes(detection_boxes, detection_labels)
+            view.set_frame(frame)
+            
+    def detect_objects(self, frame, detection_type):
+        """Run the detector matching a Detection Type entry"""
+        if detection_type == "Face Detection":
+            return self.detect_faces(frame)
+        elif detection_type == "Drone Detection":
+            return self.detect_drones(frame)
+        elif detection_type == "Person Detection":
+            return self.detect_persons(frame)
+        elif detection_type == "Vehicle Detection":
+            return self.detect_vehicles(frame)
+        else:  # All Objects
+            return self.detect_all_objects(frame)
+            
     def detect_faces(self, frame):
         # Ensure video processing is initialized
         if not self._video_initialized or self.face_cascade is None:
@@ -1107,12 +2089,6 @@ class VIPERS_UI(QMainWindow):
         detected_objects = []
         
         for (x, y, w, h) in faces:
-            # Draw rectangle around face
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            
-            # Add text label
-            cv2.putText(frame, "Face", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
             # Add to detected objects
             detected_objects.append({
                 'label': 'Face',
@@ -1138,12 +2114,6 @@ class VIPERS_UI(QMainWindow):
             width = random.randint(50, 100)
             height = random.randint(50, 100)
             
-            # Draw rectangle around drone
-            cv2.rectangle(frame, (x, y), (x + width, y + height), (0, 0, 255), 2)
-            
-            # Add text label
-            cv2.putText(frame, "Drone", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            
             # Add to detected objects
             detected_objects.append({
                 'label': 'Drone',
@@ -1171,12 +2141,6 @@ class VIPERS_UI(QMainWindow):
             if y + body_h > frame.shape[0]:
                 body_h = frame.shape[0] - y
                 
-            # Draw rectangle around person
-            cv2.rectangle(frame, (x, y), (x + w, y + body_h), (255, 0, 0), 2)
-            
-            # Add text label
-            cv2.putText(frame, "Person", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-            
             # Add to detected objects
             detected_objects.append({
                 'label': 'Person',
@@ -1202,12 +2166,6 @@ class VIPERS_UI(QMainWindow):
             width = random.randint(100, 200)
             height = random.randint(50, 100)
             
-            # Draw rectangle around vehicle
-            cv2.rectangle(frame, (x, y), (x + width, y + height), (255, 255, 0), 2)
-            
-            # Add text label
-            cv2.putText(frame, "Vehicle", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-            
             # Add to detected objects
             detected_objects.append({
                 'label': 'Vehicle',
@@ -1237,22 +2195,118 @@ class VIPERS_UI(QMainWindow):
             # Pause playback
             self.timer.stop()
             self.play_button.setText("Play")
+            
+            # Show the paused frame at full resolution
+            if self._showing_proxy and self.playback_position > 0:
+                self.playback_position -= 1
+                self.update_playback()
         else:
             # Start/resume playback
-            self.timer.start(30)  # Update every 30ms (approx. 33 fps)
+            self.timer.start(self.playback_interval())
             self.play_button.setText("Pause")
             self.log_message(f"Playing video: {os.path.basename(self.current_recording_file)}")
             
             # Make sure detection points are displayed on the slider
-            if hasattr(self, 'detection_frame_indices') and self.detection_frame_indices:
-                self.video_slider.set_detection_points(self.detection_frame_indices)
+            if len(self.detection_history):
+                self.video_slider.set_detection_points(self.detection_history.frames)
+        
+    def playback_interval(self):
+        """Timer interval for playback, throttled to the source and screen rate"""
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap else 0
+        if fps <= 0:
+            fps = config.FPS
+        
+        # Never display faster than the screen can refresh; higher speeds
+        # advance more frames per tick instead of ticking faster
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen else 60
+        display_fps = min(fps, refresh_rate if refresh_rate > 0 else 60)
+        return max(1, int(1000 / display_fps))
+        
+    def playback_speed_changed(self, index):
+        self.playback_speed = config.PLAYBACK_SPEEDS[index]
+        self.log_message(f"Playback speed set to {self.playback_speed}x")
+        
+    def next_detection_frame(self, current_frame):
+        """Return the first detection frame after current_frame, or None"""
+        return self.detection_history.next_frame_after(current_frame)
+        
+    def advance_playback(self, current_frame):
+        """Skip ahead for fast playback and return the frame index to decode next"""
+        step = self.playback_speed
+        if step <= 1:
+            return current_frame
+        
+        # Slow back down to 1x when a detection is coming up
+        next_detection = self.next_detection_frame(current_frame)
+        target_frame = playback_target(current_frame, step, self.total_frames, next_detection,
+                                       config.DETECTION_SLOWDOWN_TICKS)
+        if target_frame is None:
+            self.speed_combo.setCurrentIndex(0)
+            self.log_message(f"Approaching detection at frame {next_detection} - slowing to 1x", "detection")
+            return current_frame
+        
+        if (step < config.PLAYBACK_SEEK_SPEED and self._cap_position == current_frame
+                and not self.use_proxy_playback()):
+            # Demux the skipped frames without converting them
+            for _ in range(target_frame - current_frame):
+                if not self.cap.grab():
+                    break
+                self._cap_position += 1
+        # Otherwise read_playback_frame seeks straight to the target; MJPG
+        # recordings are all keyframes, so a seek costs a single decode
+        return target_frame
+        
+    def read_playback_frame(self, frame_index):
+        """Return the frame at frame_index, from the frame cache when possible"""
+        frame = self.frame_cache.get(frame_index)
+        if frame is None:
+            if self._cap_position != frame_index:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = self.cap.read()
+            if not ret:
+                self._cap_position = None
+                return None
+            self._cap_position = frame_index + 1
+            self.frame_cache.put(frame_index, frame)
+        
+        # Keep the window around the playhead decoded for stepping and
+        # scrubbing; fast playback moves too quickly for it to help
+        if self.frame_prefetcher and self.playback_speed == 1:
+            self.frame_prefetcher.request(frame_index)
+        return frame
+        
+    def use_proxy_playback(self):
+        """Fast playback doesn't need full resolution unless the view is zoomed in"""
+        if self.proxy_cap is None or not self.timer.isActive() or self.playback_speed <= 1:
+            return False
+        proxy_width = self.proxy_cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        return self.video_frame.width() <= proxy_width * config.PROXY_MAX_UPSCALE
+        
+    def read_proxy_frame(self, frame_index):
+        """Return the proxy frame covering frame_index of the full recording"""
+        proxy_index = int(frame_index * self.proxy_ratio)
+        
+        # At low speeds several ticks land on the same proxy frame
+        if self._proxy_frame is not None and self._proxy_frame[0] == proxy_index:
+            return self._proxy_frame[1]
+        if self._proxy_position != proxy_index:
+            self.proxy_cap.set(cv2.CAP_PROP_POS_FRAMES, proxy_index)
+        ret, frame = self.proxy_cap.read()
+        if not ret:
+            self._proxy_position = None
+            return None
+        self._proxy_position = proxy_index + 1
+        frame.flags.writeable = False  # Returned again on repeat ticks
+        self._proxy_frame = (proxy_index, frame)
+        return frame
         
     def update_playback(self):
         if not self.cap or not self.cap.isOpened():
             return
             
         # Get current position
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        current_frame = self.playback_position
         
         # Check if we reached the end
         if current_frame >= self.total_frames - 1:
@@ -1261,13 +2315,24 @@ class VIPERS_UI(QMainWindow):
             self.log_message("Playback finished")
             self.statusBar.showMessage("Playback Finished")
             return
-            
-        # Read frame
-        ret, frame = self.cap.read()
-        if not ret:
+        
+        # Skip frames when playing faster than 1x
+        if self.timer.isActive():
+            current_frame = self.advance_playback(current_frame)
+            
+        # Read frame, from the proxy when full resolution isn't needed
+        frame = None
+        self._showing_proxy = self.use_proxy_playback()
+        if self._showing_proxy:
+            frame = self.read_proxy_frame(current_frame)
+            self._showing_proxy = frame is not None
+        if frame is None:
+            frame = self.read_playback_frame(current_frame)
+        if frame is None:
             self.timer.stop()
             self.log_message("Error: Failed to read frame from video", "error")
             return
+        self.playback_position = current_frame + 1
             
         # Update slider position
         self.video_slider.setValue(current_frame)
@@ -1280,10 +2345,13 @@ class VIPERS_UI(QMainWindow):
         self.time_label.setText(f"{hours:02}:{minutes:02}:{seconds:02}")
         
         # Check if this is a detection frame
-        is_detection_frame = current_frame in self.detection_frame_indices
+        is_detection_frame = self.detection_history.contains_frame(current_frame)
         
         # Add visual indicator for detection frames
         if is_detection_frame:
+            # Cached frames are shared, draw on a copy
+            frame = frame.copy()
+            
             # Draw red border
             cv2.rectangle(frame, (0, 0), (frame.shape[1]-1, frame.shape[0]-1), (0, 0, 255), 10)
             
@@ -1291,17 +2359,21 @@ class VIPERS_UI(QMainWindow):
             cv2.putText(frame, "DETECTION FRAME", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
         
-        # Convert frame to QImage and display
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        image = QImage(rgb_frame.data, w, h, w * ch, QImage.Format_RGB888)
-        self.video_frame.setPixmap(QPixmap.fromImage(image))
+        # Display the frame, unless nobody can see it
+        if self.view_is_visible(self.video_frame):
+            self.video_frame.set_frame(frame)
         
     def stop_video(self):
         self.timer.stop()
         if self.cap:
             self.cap.release()
             self.cap = None
+        if self.live_source_id is not None:
+            self.stop_live_source()
+            self.start_stop_button.setText("Start Detection")
+        self.close_proxy_playback()
+        self.close_thumbnail_strip()
+        self.stop_frame_prefetch()
             
         # Reset UI
         self.video_frame.setText("No Video Feed")
@@ -1322,18 +2394,36 @@ class VIPERS_UI(QMainWindow):
             return
 
         # Only start playback if the position is a detection frame
-        if hasattr(self, 'detection_frame_indices') and position in self.detection_frame_indices:
+        if self.detection_history.contains_frame(position):
             # Set position
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            self.playback_position = position
             # Start playback
             if not self.timer.isActive():
                 self.play_video()
         else:
             # Set position only, do not start playback
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            self.playback_position = position
             if not self.timer.isActive():
                 self.update_playback()
 
+    def step_frame(self, delta):
+        """Step frame by frame through a paused recording"""
+        if not self.playback_mode or not self.cap or not self.cap.isOpened():
+            return
+            
+        # Pause playback first
+        if self.timer.isActive():
+            self.play_video()
+            
+        # playback_position is the next frame to show, step from the shown one
+        self.playback_position = min(max(self.playback_position - 1 + delta, 0), self.total_frames - 1)
+        self.update_playback()
+        
+    def show_frame_cache_stats(self):
+        stats = self.frame_cache.stats()
+        self.log_message(f"Frame cache: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['hit_rate']:.0%}), {stats['frames']} frames, "
+                         f"{stats['bytes'] / (1024 * 1024):.1f}/{stats['max_bytes'] / (1024 * 1024):.0f} MB")
 
         
 
@@ -1352,72 +2442,63 @@ class VIPERS_UI(QMainWindow):
             self.analyze_video()
             
     def load_date_detections(self, date):
-        """Load detections for the selected date"""
+        """Show the detection events of the selected date"""
         date_str = date.toString("yyyy-MM-dd")
-        self.log_message(f"Loading detections for {date_str}")
-        
-        # Clear current detection list
-        self.detection_list.clear()
-        
-        # Check if this date has detections (in our calendar)
-        qdate = QDate(date.year(), date.month(), date.day())
-        if qdate in self.calendar.detection_dates:
-            # Load detections from storage (in a real implementation)
-            # For now, we'll show some sample detections
+        self.filter_detection_list(day=date.toPyDate())
+        count = self.calendar.day_counts.get(date.toPyDate(), 0)
+        if count:
             self.statusBar.showMessage(f"Found detections for {date_str}")
-            
-            # Add sample detections for demonstration
-            detection_types = ["Face", "Drone", "Person", "Vehicle"]
-            for i in range(random.randint(3, 8)):  # Random number of detections
-                hour = random.randint(0, 23)
-                minute = random.randint(0, 59)
-                second = random.randint(0, 59)
-                time_str = f"{hour:02}:{minute:02}:{second:02}"
-                
-                detection_type = random.choice(detection_types)
-                count = random.randint(1, 3)
-                
-                item_text = f"{time_str} - {count} {detection_type}(s) detected"
-                item = QListWidgetItem(item_text)
-                item.setToolTip(f"Date: {date_str}, Time: {time_str}")
-                self.detection_list.addItem(item)
-                
-            self.log_message(f"Loaded {self.detection_list.count()} detections for {date_str}")
+            self.log_message(f"Showing detection events for {date_str} ({count} detections)")
         else:
             self.statusBar.showMessage(f"No detections found for {date_str}")
             self.log_message(f"No detections recorded for {date_str}")
-                
-    def jump_to_detection(self, item):
-        # This would jump to the selected detection in playback mode
-        if not self.playback_mode or not self.cap or not self.cap.isOpened():
-            self.log_message("Cannot jump to detection: Not in playback mode")
+            
+    def filter_detection_list(self, index=None, day=False):
+        """Refilter the events list by the label combo and, unless day is False, a date"""
+        label = self.detection_label_filter.currentText()
+        label = None if label == "All labels" else label
+        if day is False:
+            day = self.detection_model.day
+        self.detection_model.set_filter(label, day)
+        self.detection_filter_status.setText(f"{day:%Y-%m-%d}" if day else "All dates")
+        
+    def detection_events_backfilled(self, count):
+        self.log_message(f"Built {count} detection events from earlier detections")
+        self.filter_detection_list()
+        
+    def jump_to_detection(self, index):
+        """Open the recording a detection event was found in at its first frame"""
+        row = self.detection_model.event_at(index.row())
+        time_str = datetime.datetime.fromtimestamp(row.start_ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        if not row.recording or not os.path.exists(row.recording):
+            self.log_message(f"Detection at {time_str} was not recorded", "warning")
             return
             
-        # Get the time from the item text
-        item_text = item.text()
-        time_str = item_text.split(" - ")[0]
-        
-        # In a real implementation, you would look up the frame index for this detection
-        # For now, we'll just jump to a random position in the video
-        frame_index = random.randint(0, self.total_frames - 1)
-        
-        # Set the position and update the display
-        self.seek_video(frame_index)
-        self.log_message(f"Jumped to detection at {time_str}")
+        if self.is_recording and row.recording == self.current_recording_file:
+            self.log_message("Cannot jump to detection: its recording is still being written", "warning")
+            return
+            
+        if not self.playback_mode or self.current_recording_file != row.recording or \
+                not self.cap or not self.cap.isOpened():
+            self.open_video_file_direct(row.recording)
+            if not self.playback_mode:
+                return
+        self.seek_video(min(row.start_frame, max(self.total_frames - 1, 0)))
+        self.log_message(f"Jumped to detection at {time_str} (frame {row.start_frame})")
         
     def camera_source_changed(self, index):
         # Handle camera source change
         source_type = self.camera_source.currentText()
         self.log_message(f"Camera source changed to {source_type}")
         
-        if self.cap and self.cap.isOpened():
+        if self.live_source_id is not None:
             # Stop current capture
-            self.timer.stop()
-            self.cap.release()
-            self.cap = None
+            self.stop_live_source()
             self.start_stop_button.setText("Start Detection")
         
-        if source_type == "Video File":
+        if source_type == "Webcam":
+            self.live_source = 0
+        elif source_type == "Video File":
             self.open_video_file()
         elif source_type == "IP Camera" or source_type == "RTSP Stream":
             # Show dialog to enter IP/RTSP URL
@@ -1425,11 +2506,103 @@ class VIPERS_UI(QMainWindow):
             url, ok = QInputDialog.getText(self, "Enter Stream URL", 
                                          "Enter the IP camera URL or RTSP stream address:")
             if ok and url:
-                self.log_message(f"Connecting to stream: {url}")
-                # In a real implementation, you would connect to the stream
-                # For now, just show a message
+                self.live_source = url.strip()
+                self.log_message(f"Connecting to stream: {self.live_source}")
+                self.start_detection()
                 self.statusBar.showMessage(f"Connected to {source_type}")
         
+    def add_mosaic_source(self):
+        """Ask for another camera, video file or stream and add it to the mosaic"""
+        from PyQt5.QtWidgets import QInputDialog
+        source, ok = QInputDialog.getText(self, "Add Camera to Mosaic",
+                                          "Camera index, video file path or stream URL:")
+        if ok and source:
+            self.open_mosaic_source(source.strip())
+            
+    def open_mosaic_source(self, source):
+        self.initialize_video_processing()
+        source_id = self.capture_manager.add_source(int(source) if source.isdigit() else source)
+        self.capture_manager.get(source_id).state_changed.connect(self.capture_state_changed)
+        self.mosaic_sources.append({'name': os.path.basename(source) or source, 'source_id': source_id,
+                                    'sequence': 0, 'frame_count': 0})
+        self.mosaic_view.set_sources(item['name'] for item in self.mosaic_sources)
+        if not self.mosaic_timer.isActive():
+            self.mosaic_timer.start(max(1, 1000 // self.display_fps_spinbox.value()))
+        self.log_message(f"Added mosaic source: {source}")
+        
+    def update_mosaic(self):
+        """Pull one frame per mosaic source and upload the canvas once"""
+        if not self.view_is_visible(self.mosaic_view):
+            return
+            
+        # Detection shares the governor's latency budget across all tiles; tiles
+        # left over once it is spent keep their boxes and go first next tick
+        detection_type = self.detection_combo.currentText()
+        deadline = time.perf_counter() + self.governor.budget_ms / 1000
+        count = len(self.mosaic_sources)
+        first_skipped = None
+        for offset in range(count):
+            index = (self._mosaic_first + offset) % count
+            source = self.mosaic_sources[index]
+            sequence, frame = self.capture_manager.latest_frame(source['source_id'])
+            if frame is None or sequence == source['sequence']:
+                continue
+                
+            source['sequence'] = sequence
+            source['frame_count'] += 1
+            if (source['frame_count'] - 1) % config.MOSAIC_DETECTION_STRIDE == 0:
+                source['detection_due'] = True
+            if source.get('detection_due'):
+                if time.perf_counter() < deadline:
+                    detected_objects, _ = self.detect_objects(frame, detection_type)
+                    source['boxes'], source['labels'] = relative_boxes(detected_objects, frame.shape)
+                    source['detection_due'] = False
+                elif first_skipped is None:
+                    first_skipped = index
+            self.mosaic_view.update_tile(index, frame, source.get('boxes', []), source.get('labels', []))
+        self._mosaic_first = first_skipped if first_skipped is not None else 0
+        
+        self.mosaic_view.update()
+        
+    def promote_mosaic_source(self, index):
+        """Show a mosaic source in the main view, swapping the live camera into its tile"""
+        source = self.mosaic_sources[index]
+        self.timer.stop()
+        self.event_coalescer.flush()
+        if self.live_source_id is not None:
+            self.mosaic_sources[index] = {'name': "Main camera", 'source_id': self.live_source_id,
+                                          'sequence': 0, 'frame_count': 0}
+        else:
+            del self.mosaic_sources[index]
+        self.mosaic_view.set_sources(item['name'] for item in self.mosaic_sources)
+        if not self.mosaic_sources:
+            self.mosaic_timer.stop()
+            
+        # Run the promoted source through the full live pipeline
+        self.stop_frame_prefetch()
+        self.close_proxy_playback()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.live_source_id = source['source_id']
+        self._live_sequence = 0
+        self.playback_mode = False
+        
+        # Idle duty cycling starts over for the new camera; the old one runs at full rate in its tile
+        for item in self.mosaic_sources:
+            self.capture_manager.get(item['source_id']).set_rate_limit(None)
+        self.motion_sensor.reset()
+        self.activity_monitor.reset()
+        self.set_live_idle(False)
+        self.timer.timeout.disconnect()
+        self.timer.timeout.connect(self.update_frame)
+        self.start_time = datetime.datetime.now()
+        self.timer.start(self.live_poll_interval())
+        self.start_stop_button.setText("Stop Detection")
+        self.video_slider.setEnabled(False)
+        self.video_tabs.setCurrentWidget(self.video_frame)
+        self.log_message(f"Promoted {source['name']} to the main view")
+        
     def browse_storage_path(self):
         # Open directory selection dialog
         dir_path = QFileDialog.getExistingDirectory(self, "Select Storage Directory", 
@@ -1456,8 +2629,8 @@ class VIPERS_UI(QMainWindow):
     
     def save_current_frame(self):
         # Check if we have a frame to save
-        pixmap = self.video_frame.pixmap()
-        if pixmap and not pixmap.isNull():
+        image = self.video_frame.frame_image()
+        if image is not None and not image.isNull():
             # Generate filename with timestamp
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshots_dir = os.path.join(self.recordings_dir, "screenshots")
@@ -1468,7 +2641,7 @@ class VIPERS_UI(QMainWindow):
                 
             # Save the image
             file_path = os.path.join(screenshots_dir, f"screenshot_{timestamp}.png")
-            pixmap.save(file_path, "PNG")
+            image.save(file_path, "PNG")
             
             self.log_message(f"Screenshot saved to {file_path}")
             self.statusBar.showMessage("Screenshot saved")
@@ -1476,8 +2649,13 @@ class VIPERS_UI(QMainWindow):
             self.log_message("Cannot save screenshot: No frame available")
     
     def export_detections(self):
+        if self.export_thread is not None:
+            self.log_message("An export is already running")
+            return
+            
         # Check if we have detections to export
-        if not self.detection_timestamps:
+        self.flush_detection_store()
+        if self.detection_store.is_empty():
             self.log_message("No detections to export")
             return
             
@@ -1489,34 +2667,25 @@ class VIPERS_UI(QMainWindow):
         if not os.path.exists(exports_dir):
             os.makedirs(exports_dir)
             
-        # Prepare detection data
-        detection_data = {
-            "session_start": self.start_time.isoformat() if hasattr(self, 'start_time') else None,
-            "detection_count": len(self.detection_timestamps),
-            "detections": []
-        }
-        
-        # Add detection data
-        for i, timestamp in enumerate(self.detection_timestamps):
-            if i < len(self.detection_frame_indices):
-                frame_index = self.detection_frame_indices[i]
-                detection_data["detections"].append({
-                    "timestamp": timestamp,
-                    "frame_index": frame_index,
-                    "time_str": str(datetime.timedelta(seconds=int(timestamp)))
-                })
-        
-        # Save as JSON
+        # Rows are streamed from the store to the file on a background thread
         file_path = os.path.join(exports_dir, f"detections_{timestamp}.json")
-        with open(file_path, 'w') as f:
-            json.dump(detection_data, f, indent=4)
-            
-        self.log_message(f"Exported {len(self.detection_timestamps)} detections to {file_path}")
+        session_start = self.start_time.isoformat() if hasattr(self, 'start_time') else None
+        self.export_thread = DetectionExportThread(self.detection_store.path, file_path, session_start)
+        self.export_thread.export_finished.connect(self.detection_export_finished)
+        self.export_thread.finished.connect(self.detection_export_stopped)
+        self.export_thread.start()
+        self.statusBar.showMessage("Exporting detections...")
+        
+    def detection_export_stopped(self):
+        self.export_thread = None
+        
+    def detection_export_finished(self, file_path, count):
+        self.log_message(f"Exported {count} detections to {file_path}")
         self.statusBar.showMessage("Detections exported")
         
         # Show success message
         QMessageBox.information(self, "Export Complete", 
-                              f"Successfully exported {len(self.detection_timestamps)} detections to {file_path}")
+                              f"Successfully exported {count} detections to {file_path}")
     
     def analyze_video(self):
         """Perform comprehensive video analysis"""
@@ -1565,14 +2734,18 @@ class VIPERS_UI(QMainWindow):
                 progress.setLabelText(f"Analyzing frame {frame_idx}/{total_frames}")
                 QApplication.processEvents()
                 
-                # Read frame
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = self.cap.read()
+                # Read frame, from the proxy when the recording has one
+                if self.proxy_cap is not None:
+                    analysis_cap, analysis_idx = self.proxy_cap, int(frame_idx * self.proxy_ratio)
+                else:
+                    analysis_cap, analysis_idx = self.cap, frame_idx
+                analysis_cap.set(cv2.CAP_PROP_POS_FRAMES, analysis_idx)
+                ret, frame = analysis_cap.read()
                 if not ret:
                     continue
                 
                 # Perform detections
-                detected_objects, _ = self.detect_all_objects(frame.copy())
+                detected_objects, _ = self.detect_all_objects(frame)
                 
                 # Count detections
                 for obj in detected_objects:
@@ -1587,6 +2760,10 @@ class VIPERS_UI(QMainWindow):
                     if random.random() < 0.1:  # Simulate motion detection
                         analysis_results['motion_segments'].append(frame_idx / fps)
             
+            # Analysis moved the decoders, playback has to seek again
+            self._cap_position = None
+            self._proxy_position = None
+            
             # Calculate quality score
             analysis_results['quality_score'] = min(100, analysis_results['detection_count'] * 10)
             
@@ -1635,7 +2812,8 @@ class VIPERS_UI(QMainWindow):
         self.log_message("Generating detection report")
         
         # Check if we have detections
-        if not self.detection_timestamps:
+        self.flush_detection_store()
+        if self.detection_store.is_empty():
             QMessageBox.warning(self, "No Detections", 
                               "No detections available to generate a report.")
             return
@@ -1667,17 +2845,18 @@ class VIPERS_UI(QMainWindow):
             f.write("<body>\n")
             f.write("<h1>VIPERS Detection Report</h1>\n")
             f.write(f"<p>Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n")
-            f.write(f"<p>Total Detections: {len(self.detection_timestamps)}</p>\n")
+            f.write(f"<p>Total Detections: {self.detection_store.count()}</p>\n")
             
             # Add detection table
             f.write("<h2>Detection Events</h2>\n")
             f.write("<table>\n")
             f.write("<tr><th>No.</th><th>Time</th><th>Frame</th><th>Type</th></tr>\n")
             
-            for i, timestamp in enumerate(self.detection_timestamps):
-                time_str = str(datetime.timedelta(seconds=int(timestamp)))
-                frame_index = self.detection_frame_indices[i] if i < len(self.detection_frame_indices) else "N/A"
-                detection_type = "Object"  # In a real implementation, you would store the detection type
+            rows = self.detection_store.iter_detections()
+            for i, (time_ms, camera, recording, frame, label, *_) in enumerate(rows):
+                time_str = datetime.datetime.fromtimestamp(time_ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+                frame_index = frame if frame is not None else "N/A"
+                detection_type = label or "Object"
                 
                 f.write(f"<tr><td>{i+1}</td><td>{time_str}</td><td>{frame_index}</td><td>{detection_type}</td></tr>\n")
                 
@@ -1719,101 +2898,46 @@ class VIPERS_UI(QMainWindow):
         QMessageBox.about(self, "About VIPERS", about_text)
     
     def log_message(self, message, level="info"):
-        # Get current timestamp
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        timestamp_obj = datetime.datetime.now()
+        timestamp = datetime.datetime.now()
         
-        # Format message with timestamp and level
-        if level == "error":
-            formatted_message = f"<span style='color:#e74c3c;'>[{timestamp}] ERROR: {message}</span>"
-        elif level == "warning":
-            formatted_message = f"<span style='color:#f39c12;'>[{timestamp}] WARNING: {message}</span>"
-        elif level == "detection":
-            formatted_message = f"<span style='color:#1abc9c;'>[{timestamp}] {message}</span>"
-        else:
-            formatted_message = f"<span style='color:#bdc3c7;'>[{timestamp}] INFO: {message}</span>"
-            
-        # Add to log viewer with clickable functionality
-        cursor = self.log_viewer.textCursor()
-        cursor.movePosition(cursor.End)
-        self.log_viewer.setTextCursor(cursor)
+        # File and console output happen on the log sink's thread
+        self.log_sink.log(timestamp, level, message)
         
-        # Store the current position
-        position = cursor.position()
+        # The viewer catches up on the next log tick, so bursts cost one update
+        frame_index = self.frame_count if hasattr(self, 'frame_count') else 0
+        self._pending_log.append((timestamp, level, message, frame_index))
         
-        # Add the formatted message
-        self.log_viewer.append(formatted_message)
-        
-        # If this is a detection-related message, make it clickable
-        if ("detection" in message.lower() or "detected" in message.lower() or level == "detection"):
-            # Store the timestamp and frame info for this log entry
-            if hasattr(self, 'log_timestamps') == False:
-                self.log_timestamps = {}
+    def flush_log_view(self):
+        """Append the messages logged since the last tick to the log viewer"""
+        if not self._pending_log:
+            return
+        pending, self._pending_log = self._pending_log, []
+        scrollbar = self.log_viewer.verticalScrollBar()
+        following = scrollbar.value() == scrollbar.maximum()
+        self.log_model.append_entries(pending)
+        if following:
+            self.log_viewer.scrollToBottom()
+        
+    def log_viewer_clicked(self, index):
+        """Seek to the frame a detection log line was written at"""
+        timestamp, level, message, frame_index = self.log_model.entry(index.row())
+        if not is_detection_log(level, message):
+            return
             
-            # Store the position and timestamp for later retrieval
-            self.log_timestamps[position] = {
-                'timestamp': timestamp_obj,
-                'frame_index': self.frame_count if hasattr(self, 'frame_count') else 0
-            }
-        
-        # Write to log file
-        log_date = datetime.datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(self.logs_dir, f"vipers_{log_date}.log")
+        # Switch to playback mode if not already
+        if not self.playback_mode:
+            self.playback_radio.setChecked(True)
+            self.mode_changed()
         
-        try:
-            with open(log_file, 'a') as f:
-                f.write(f"[{timestamp}] {message}\n")
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
-            
-        # Print to console for debugging
-        print(formatted_message)
-        
-    def log_viewer_clicked(self, event):
-        # Get the cursor at the click position
-        cursor = self.log_viewer.cursorForPosition(event.pos())
-        position = cursor.position()
-        
-        # Check if we have a timestamp for this position or nearby
-        if hasattr(self, 'log_timestamps'):
-            # Find the closest log entry position
-            closest_pos = None
-            min_distance = float('inf')
-            
-            for pos in self.log_timestamps.keys():
-                distance = abs(position - pos)
-                if distance < min_distance and distance < 100:  # Within reasonable distance
-                    min_distance = distance
-                    closest_pos = pos
-            
-            if closest_pos is not None:
-                # We found a clickable log entry
-                log_data = self.log_timestamps[closest_pos]
-                
-                # Switch to playback mode if not already
-                if not self.playback_mode:
-                    self.playback_radio.setChecked(True)
-                    self.mode_changed()
-                
-                # If we have a recording loaded, seek to the frame and play
-                if self.cap and self.cap.isOpened():
-                    self.seek_video(log_data['frame_index'])
-                    # Ensure playback starts if this is a detection frame
-                    if hasattr(self, 'detection_frame_indices') and log_data['frame_index'] in self.detection_frame_indices:
-                        if not self.timer.isActive():
-                            self.play_video()
-                else:
-                    # Try to load the most recent recording
-                    self.load_most_recent_recording()
-                    # After loading, seek to the appropriate position
-                    if self.cap and self.cap.isOpened():
-                        self.seek_video(log_data['frame_index'])
-                        if hasattr(self, 'detection_frame_indices') and log_data['frame_index'] in self.detection_frame_indices:
-                            if not self.timer.isActive():
-                                self.play_video()
-        
-        # Call the original mousePressEvent
-        super(QTextEdit, self.log_viewer).mousePressEvent(event)
+        # Without a recording open, try the most recent one
+        if not (self.cap and self.cap.isOpened()):
+            self.load_most_recent_recording()
+        if self.cap and self.cap.isOpened():
+            self.seek_video(frame_index)
+            # Ensure playback starts if this is a detection frame
+            if self.detection_history.contains_frame(frame_index):
+                if not self.timer.isActive():
+                    self.play_video()
                 
     def toggle_grid(self, state):
         # Toggle grid overlay on video frame
@@ -1857,6 +2981,9 @@ class VIPERS_UI(QMainWindow):
             self.timer.stop()
             if self.cap:
                 self.cap.release()
+            if self.live_source_id is not None:
+                self.stop_live_source()
+                self.start_stop_button.setText("Start Detection")
                 
             # Open the video file
             self.cap = cv2.VideoCapture(file_path)
@@ -1867,6 +2994,11 @@ class VIPERS_UI(QMainWindow):
                 
             # Set as current recording file
             self.current_recording_file = file_path
+            self.playback_position = 0
+            self._cap_position = 0
+            self.start_frame_prefetch(file_path)
+            self.open_proxy_playback(file_path)
+            self.load_thumbnail_strip(file_path)
             
             # Get video properties
             self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -1892,97 +3024,187 @@ class VIPERS_UI(QMainWindow):
             self.timer.timeout.connect(self.update_playback)
 
             # Update detection marks on slider
-            if hasattr(self, 'detection_frame_indices'):
-                self.video_slider.set_detection_points(self.detection_frame_indices)
+            self.video_slider.set_detection_points(self.detection_history.frames)
 
             self.log_message(f"Opened video file: {os.path.basename(file_path)}")
 
-    def add_detection_to_list(self, detection_boxes, detection_labels):
-        """Add detection event to the detection list"""
-        if not detection_boxes:
+    def open_proxy_playback(self, file_path):
+        """Open the proxy of a recording, if one was written"""
+        self.close_proxy_playback()
+        proxy_file = proxy_path_for(file_path)
+        if not os.path.exists(proxy_file):
             return
             
-        # Create timestamp
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        
-        # Count detections by type
-        detection_counts = {}
-        for label in detection_labels:
-            detection_counts[label] = detection_counts.get(label, 0) + 1
-        
-        # Create summary text
-        summary_parts = []
-        for label, count in detection_counts.items():
-            summary_parts.append(f"{count} {label}")
-        
-        summary = ", ".join(summary_parts)
-        item_text = f"{timestamp} - {summary}"
-        
-        # Create list item
-        item = QListWidgetItem(item_text)
-        item.setToolTip(f"Frame: {self.frame_count}, Objects: {len(detection_boxes)}")
-        
-        # Add to the top of the list
-        self.detection_list.insertItem(0, item)
-        
-        # Limit list size to prevent memory issues
-        while self.detection_list.count() > 100:
-            self.detection_list.takeItem(self.detection_list.count() - 1)
+        self.proxy_cap = cv2.VideoCapture(proxy_file)
+        proxy_frames = int(self.proxy_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        full_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if not self.proxy_cap.isOpened() or proxy_frames <= 0 or full_frames <= 0:
+            self.close_proxy_playback()
+            return
+        self.proxy_ratio = proxy_frames / full_frames
+        self._proxy_position = 0
+        self._proxy_frame = None
+        
+    def close_proxy_playback(self):
+        if self.proxy_cap:
+            self.proxy_cap.release()
+            self.proxy_cap = None
+        self._showing_proxy = False
+        
+    def generate_thumbnail_strip(self, recording_path):
+        """Build the hover thumbnails for a recording in the background"""
+        thread = ThumbnailStripThread(recording_path, config.THUMBNAIL_INTERVAL, config.THUMBNAIL_WIDTH)
+        thread.strip_ready.connect(self.thumbnail_strip_ready)
+        thread.finished.connect(lambda: self.thumbnail_threads.remove(thread))
+        self.thumbnail_threads.append(thread)
+        thread.start()
+        
+    def thumbnail_strip_ready(self, recording_path, strip_path):
+        if self.playback_mode and recording_path == self.current_recording_file:
+            self.load_thumbnail_strip(recording_path)
+            
+    def load_thumbnail_strip(self, recording_path):
+        """Memory-map the thumbnail strip of a recording, generating it if missing or stale"""
+        self.close_thumbnail_strip()
+        strip_path = thumbnail_path_for(recording_path)
+        if not os.path.exists(strip_path) or os.path.getmtime(strip_path) < os.path.getmtime(recording_path):
+            if not any(thread.recording_path == recording_path for thread in self.thumbnail_threads):
+                self.generate_thumbnail_strip(recording_path)
+            return
+            
+        try:
+            self.thumbnail_strip = ThumbnailStrip(strip_path)
+            self.video_slider.set_thumbnail_strip(self.thumbnail_strip)
+        except Exception as e:
+            self.log_message(f"Error loading thumbnails: {e}", "warning")
+            
+    def close_thumbnail_strip(self):
+        self.video_slider.set_thumbnail_strip(None)
+        if self.thumbnail_strip:
+            self.thumbnail_strip.close()
+            self.thumbnail_strip = None
+            
+    def start_frame_prefetch(self, file_path):
+        """Start filling the frame cache for a newly opened recording"""
+        self.stop_frame_prefetch()
+        self.frame_prefetcher = FramePrefetchThread(file_path, self.frame_cache,
+                                                    config.FRAME_CACHE_BEHIND, config.FRAME_CACHE_AHEAD)
+        self.frame_prefetcher.start()
+        
+    def stop_frame_prefetch(self):
+        if self.frame_prefetcher:
+            self.frame_prefetcher.stop()
+            self.frame_prefetcher = None
+        self.frame_cache.clear()
+        
+    def store_event_frame(self, state, event):
+        """Event sink: keep the first frame of an event, then its best one"""
+        if event.best_frame is None:
+            return
+        if state == "started":
+            self.detected_frames.put(event.key, event.best_frame)
+        elif event.best_key != event.key:
+            self.detected_frames.put(event.best_key, event.best_frame)
+            
+    def store_detection_event(self, state, event):
+        """Event sink: persist events once they end"""
+        if state == "ended":
+            self.detection_store.add_detection_event(event)
+            
+    def log_detection_event(self, state, event):
+        """Event sink: a log line when an event starts and a summary when it ends"""
+        if state == "started":
+            self.log_message(f"Detected {event.label} ({event.peak_count} in view)", "detection")
+        else:
+            self.log_message(f"{event.label} detection ended after {event.duration:.1f}s: "
+                             f"peak {event.peak_count}, {event.hits} detector hits", "detection")
+            
+    def alert_detection_event(self, state, event):
+        """Event sink: alert once per event"""
+        if state == "started":
+            self.alert_panel.add_alert(f"Detection: {event.label}", "warning")
         
-        # Save detection data periodically
-        if len(self.detection_timestamps) % 10 == 0:  # Save every 10 detections
-            self.save_detection_data()
-    
     def load_detection_data(self):
-        """Load detection data from file"""
+        """Replay the detection journal, then start its writer"""
         try:
-            if os.path.exists(self.detections_data_file):
-                with open(self.detections_data_file, 'r') as f:
-                    data = json.load(f)
-                    self.detection_timestamps = [datetime.datetime.fromisoformat(ts) for ts in data.get('timestamps', [])]
-                    self.detection_frame_indices = data.get('frame_indices', [])
-                    
-                    # Add dates to calendar
-                    for timestamp in self.detection_timestamps:
-                        self.calendar.add_detection_date(timestamp.date())
-                        
-                self.log_message(f"Loaded {len(self.detection_timestamps)} detection records")
+            # One-time migration from the old full-rewrite JSON file
+            if not os.path.exists(self.detection_journal.path) and os.path.exists(self.detections_data_file):
+                write_journal(self.detection_journal.path, import_legacy_detections(self.detections_data_file))
+                self.log_message(f"Migrated {self.detections_data_file} to the detection journal")
+                
+            # Memory-mapped snapshot plus the journal written since
+            self.detection_history = self.detection_journal.replay()
+            
+            # The store starts out with whatever history the journal already has
+            if self.detection_store.is_empty() and len(self.detection_history):
+                self.detection_store.import_history(self.detection_history)
+                
+            # Mark the calendar from the store's per-day counts
+            self.calendar.set_detection_counts(self.detection_store.detection_day_counts())
+                
+            self.log_message(f"Loaded {len(self.detection_history)} detection records")
         except Exception as e:
             self.log_message(f"Error loading detection data: {e}", "error")
+            
+        self.detection_journal.compacted.connect(
+            lambda kept: self.log_message(f"Detection journal compacted to {kept} records"))
+        self.detection_journal.start()
+        self.detection_store.start()
+        self.detected_frames.start()
+    
+    def flush_detection_store(self):
+        """Give queued detections a moment to commit without stalling on a backed-up writer"""
+        if not self.detection_store.wait_for_writes(config.STORE_FLUSH_TIMEOUT):
+            self.log_message("Detection store is still writing; the newest detections may be missing",
+                             "warning")
     
     def save_detection_data(self):
-        """Save detection data to file"""
-        try:
-            data = {
-                'timestamps': [ts.isoformat() for ts in self.detection_timestamps],
-                'frame_indices': self.detection_frame_indices,
-                'last_updated': datetime.datetime.now().isoformat()
-            }
-            
-            with open(self.detections_data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            self.log_message("Detection data saved successfully")
-        except Exception as e:
-            self.log_message(f"Error saving detection data: {e}", "error")
+        """Write queued detections to the journal now instead of at the next batch"""
+        self.detection_journal.flush()
     
+    def search_logs(self):
+        """Query the log index with the panel's text, level and date range"""
+        start = datetime.datetime.combine(self.log_search_from.date().toPyDate(), datetime.time())
+        end = datetime.datetime.combine(self.log_search_to.date().toPyDate(), datetime.time()) + \
+            datetime.timedelta(days=1)
+        level = self.log_search_level.currentText() if self.log_search_level.currentIndex() else None
+        
+        began = time.perf_counter()
+        try:
+            results = self.log_index.search(self.log_search_text.text(), level, start, end,
+                                            limit=config.LOG_SEARCH_LIMIT)
+        except sqlite3.Error as e:
+            self.log_search_status.setText(f"Search failed: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - began) * 1000
+        
+        self.log_search_model.clear()
+        if results:
+            # Oldest first, like the live log
+            self.log_search_model.append_entries([(timestamp, level.lower(), message, None)
+                                                  for timestamp, level, message in reversed(results)])
+            self.log_search_results.scrollToBottom()
+        more = "+" if len(results) == config.LOG_SEARCH_LIMIT else ""
+        self.log_search_status.setText(f"{len(results)}{more} matches in {elapsed_ms:.0f} ms")
+        
+        # Lines logged since the last pass become searchable shortly
+        self.log_index.refresh()
+        
     def clear_logs(self):
-        self.log_viewer.clear()
-        if hasattr(self, 'log_timestamps'):
-            self.log_timestamps.clear()
+        self._pending_log = []
+        self.log_model.clear()
     
     def optimize_detection_data(self):
         """Optimize detection data storage"""
         # Limit the number of stored detections to prevent memory issues
         max_detections = 1000
         
-        if len(self.detection_timestamps) > max_detections:
+        if len(self.detection_history) > max_detections:
             # Keep only the most recent detections
-            self.detection_timestamps = self.detection_timestamps[-max_detections:]
-            self.detection_frame_indices = self.detection_frame_indices[-max_detections:]
+            self.detection_history.trim(max_detections)
             
-            # Save optimized data
-            self.save_detection_data()
+            # Compacting writes the trimmed history as the new snapshot
+            self.detection_journal.compact(max_detections)
     
     def initialize_video_processing(self):
         """Lazy load video processing components only when needed"""